@@ -1,12 +1,57 @@
+import json
 import requests
+import threading
+import time
 import urllib.parse
-from typing import Union
+from typing import Iterator, Union
+from requests.adapters import HTTPAdapter
 from .beacon_endpoints import BeaconEndpoints
 from .config_endpoints import ConfigEndpoints
 from .debug_endpoints import DebugEndpoints
 from .event_endpoints import EventEndpoints
 from .node_endpoints import NodeEndpoints
 from .validator_endpoints import ValidatorEndpoints
+from .utils.cache import ResponseCache, is_root, as_slot, freeze
+from .utils.committees import CommitteeCache
+from .utils.compression import TransferStats, accept_encoding, iter_decoded
+from .utils.errors import BeaconNodeError
+from .utils.instrumentation import Instrumentation, current_call, timed
+from .utils.singleflight import SingleFlight, coalesce_methods
+from .utils.ssz import SSZBytes, is_supported_version
+from .utils.store import BlockStore, StoreRoute
+from .utils.types import SECONDS_PER_SLOT, SLOTS_PER_EPOCH
+
+# bytes read from the socket at a time when decoding a body
+_CHUNK_SIZE = 64 * 1024
+
+
+class _DecodingAdapter(HTTPAdapter):
+    """
+    Reads bodies through utils.compression instead of urllib3 so the compressed size and the time spent
+    decompressing are known, and times the wait for the headers apart from the download for the current call.
+    Streamed bodies are left to BeaconChainAPI._iter_body
+    """
+
+    def __init__(self, transfer: TransferStats, **kwargs):
+        super().__init__(**kwargs)
+        self.transfer = transfer
+
+    def send(self, request, stream=False, **kwargs):
+        sent = time.perf_counter()
+        response = super().send(request, stream=True, **kwargs)
+        first_byte = time.perf_counter()
+        if not stream or response.status_code != 200:
+            chunks = response.raw.stream(_CHUNK_SIZE, decode_content=False)
+            encoding = response.headers.get("Content-Encoding")
+            body = iter_decoded(chunks, encoding, self.transfer)
+            response._content = b"".join(body)
+            response._content_consumed = True
+        record = current_call()
+        if record is not None:
+            end = time.perf_counter()
+            path = request.path_url
+            record.add_response(path, response.status_code, sent, first_byte, end)
+        return response
 
 
 class BeaconChainAPI(
@@ -17,8 +62,103 @@ class BeaconChainAPI(
     NodeEndpoints,
     ValidatorEndpoints,
 ):
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        connect_timeout: Union[float, None] = 10.0,
+        read_timeout: Union[float, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        store: Union[BlockStore, None] = None,
+        coalesce: bool = True,
+        compression: bool = True,
+        instrumentation: Union[Instrumentation, None] = None,
+    ):
+        """
+        Client for a single beacon node. Requests are sent over a persistent session so
+        connections are kept alive and reused between calls.
+        Args:
+            base_url: URL of the beacon node e.g. http://localhost:5052
+            pool_connections: Number of host connection pools to keep
+            pool_maxsize: Maximum number of connections kept open per host
+            pool_block: If true block when all connections to a host are in use instead of opening a new one
+            keep_alive: If false every request closes its connection after the response
+            connect_timeout: Seconds to wait for a connection to be established, None waits forever
+            read_timeout: Seconds to wait between bytes of the response, None waits forever
+            cache: If given, parsed responses addressed by a root, genesis or a finalized slot are kept in this cache
+            store: If given, blocks, headers and attestations addressed by a root or a finalized slot
+                are written to and served from this on-disk store
+            coalesce: If true identical get_* calls made while one is in flight share its decoded result,
+                and so do identical requests made by different calls. `inflight.deduplicated` counts the calls
+                and requests that were saved. Shared results must not be mutated
+            compression: If true ask the node for zstd, br, gzip or deflate bodies, whichever are available,
+                `transfer` counts the bytes received and the time spent decompressing, see utils.compression
+            instrumentation: If given, every get_* and compute_* call is timed and passed to its sinks,
+                see utils.instrumentation
+        """
         self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.transfer = TransferStats()
+        adapter = _DecodingAdapter(
+            self.transfer,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self.session.headers["Accept-Encoding"] = accept_encoding(compression)
+        self.cache = cache
+        self.store = store
+        self.inflight = SingleFlight() if coalesce else None
+        self._post_unsupported = set()
+        self.committee_cache = CommitteeCache()
+        self._finalized_slot = -1
+        self._finalized_checked = float("-inf")
+        self._finalized_lock = threading.Lock()
+        if self.inflight is not None:
+            coalesce_methods(self, self.inflight)
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self.session.close()
+
+    def _is_immutable(self, identifier) -> bool:
+        if identifier == "genesis" or is_root(identifier):
+            return True
+        slot = as_slot(identifier)
+        if slot is None:
+            return False
+        if slot > self._finalized_slot:
+            self._refresh_finalized_slot()
+        return slot <= self._finalized_slot
+
+    def _refresh_finalized_slot(self):
+        # finality moves at most once per slot so the node is asked at most that often
+        with self._finalized_lock:
+            now = time.monotonic()
+            if now - self._finalized_checked < SECONDS_PER_SLOT:
+                return
+            self._finalized_checked = now
+        checkpoints = self.get_finality_checkpoints_from_state("head")
+        self._finalized_slot = checkpoints.finalized.epoch * SLOTS_PER_EPOCH
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     def _query_url(
         self,
@@ -27,14 +167,110 @@ class BeaconChainAPI(
         headers: dict = {"Accept": "application/json"},
         params: Union[dict, None] = None,
     ):
-        url = urllib.parse.urljoin(self.base_url, path)
-        response = requests.get(url, stream=stream, headers=headers, params=params)
-        assert (
-            response.status_code == 200
-        ), f"Status Code: {response.status_code} | {response.text}"
+        if stream or self.inflight is None:
+            return self._fetch(path, stream, headers, params)
+        key = (path, freeze(headers), freeze(params))
+        record = current_call()
+        if record is None:
+            return self.inflight.do(
+                key, lambda: self._fetch(path, stream, headers, params)
+            )
+        # time spent waiting for another caller's request counts as queue wait
+        led = False
+
+        def lead():
+            nonlocal led
+            led = True
+            return self._fetch(path, stream, headers, params)
+
+        start = time.perf_counter()
+        try:
+            return self.inflight.do(key, lead)
+        finally:
+            if not led:
+                record.add("queue_wait", time.perf_counter() - start)
+
+    def _fetch(
+        self,
+        path: str,
+        stream: bool,
+        headers: dict,
+        params: Union[dict, None],
+    ):
+        if self.store is not None and not stream and not params:
+            route = self.store.route(path, headers["Accept"])
+            if route is not None and self._is_immutable(route.identifier):
+                return self._query_store(route, path, headers)
+        response = self._request(
+            "GET", path, stream=stream, headers=headers, params=params
+        )
+        if stream:
+            return response
         if headers["Accept"] == "application/json":
-            return response.json()
+            return timed("json_decode", response.json)
         elif headers["Accept"] == "application/octet-stream":
-            return response.text
+            return SSZBytes(
+                response.content, response.headers.get("Eth-Consensus-Version")
+            )
         else:
             return response
+
+    def _request(
+        self, method: str, path: str, stream: bool = False, **kwargs
+    ) -> requests.Response:
+        url = urllib.parse.urljoin(self.base_url, path)
+        response = self.session.request(
+            method, url, stream=stream, timeout=self.timeout, **kwargs
+        )
+        if response.status_code != 200:
+            raise BeaconNodeError(response.status_code, response.text)
+        return response
+
+    def _iter_body(
+        self, response: requests.Response, chunk_size: int
+    ) -> Iterator[bytes]:
+        """
+        Decompressed chunks of the body of a streamed response
+        """
+        chunks = response.raw.stream(chunk_size, decode_content=False)
+        encoding = response.headers.get("Content-Encoding")
+        return iter_decoded(chunks, encoding, self.transfer)
+
+    def _post_url(self, path: str, body):
+        response = self._request(
+            "POST", path, json=body, headers={"Accept": "application/json"}
+        )
+        return timed("json_decode", response.json)
+
+    def _canonical_root(self, route: StoreRoute, body: bytes) -> Union[str, None]:
+        # a block fetched by root is only stored under its slot when it is the canonical block there
+        slot = self.store.unverified_slot(
+            route.kind, route.identifier, body, self._finalized_slot
+        )
+        if slot is None:
+            return None
+        return self.get_block_root_from_block_id(slot)
+
+    def _query_store(self, route: StoreRoute, path: str, headers: dict):
+        body = self.store.get(route.kind, route.identifier)
+        if body is None:
+            response = self._request("GET", path, headers=headers)
+            body = response.content
+            if route.kind == "blocks_ssz":
+                body = SSZBytes(body, response.headers.get("Eth-Consensus-Version"))
+                if not is_supported_version(body.version):
+                    # stored ssz blocks are all of the layout utils.ssz decodes
+                    return body
+            if is_root(route.identifier):
+                # learn the finalized slot so the block can also be found by its slot later
+                self._refresh_finalized_slot()
+            self.store.put(
+                route.kind,
+                route.identifier,
+                body,
+                self._finalized_slot,
+                self._canonical_root(route, body),
+            )
+        if headers["Accept"] == "application/json":
+            return timed("json_decode", lambda: json.loads(body))
+        return body
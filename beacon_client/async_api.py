@@ -0,0 +1,326 @@
+import aiohttp
+import asyncio
+import json
+import time
+import urllib.parse
+from typing import AsyncIterator, List, Tuple, Union
+from .async_endpoints import (
+    AsyncBeaconEndpoints,
+    AsyncConfigEndpoints,
+    AsyncDebugEndpoints,
+    AsyncEventEndpoints,
+    AsyncNodeEndpoints,
+    AsyncValidatorEndpoints,
+)
+from .utils.cache import ResponseCache, is_root, as_slot, freeze
+from .utils.committees import CommitteeCache
+from .utils.compression import TransferStats, accept_encoding, aiter_decoded
+from .utils.errors import BeaconNodeError
+from .utils.instrumentation import Instrumentation, current_call, timed
+from .utils.singleflight import AsyncSingleFlight, coalesce_methods
+from .utils.ssz import SSZBytes, is_supported_version
+from .utils.store import BlockStore, StoreRoute
+from .utils.types import SECONDS_PER_SLOT, SLOTS_PER_EPOCH
+
+# bytes read from the connection at a time when decoding a body
+_CHUNK_SIZE = 64 * 1024
+
+
+def _encode_params(params: Union[dict, None]) -> List[Tuple[str, str]]:
+    # mirror requests: drop None values and repeat the key for every list element
+    encoded = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            encoded.append((key, str(item)))
+    return encoded
+
+
+def _queue_trace() -> aiohttp.TraceConfig:
+    # time requests wait for a free connection when the pool limits are reached
+    async def queued(session, context, params):
+        context.queued = time.perf_counter()
+
+    async def dequeued(session, context, params):
+        record = current_call()
+        if record is not None:
+            record.add("queue_wait", time.perf_counter() - context.queued)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_queued_start.append(queued)
+    trace.on_connection_queued_end.append(dequeued)
+    return trace
+
+
+class AsyncBeaconChainAPI(
+    AsyncBeaconEndpoints,
+    AsyncConfigEndpoints,
+    AsyncDebugEndpoints,
+    AsyncEventEndpoints,
+    AsyncNodeEndpoints,
+    AsyncValidatorEndpoints,
+):
+    def __init__(
+        self,
+        base_url: str,
+        pool_connections: int = 100,
+        pool_maxsize: int = 0,
+        keep_alive: bool = True,
+        keep_alive_timeout: float = 15.0,
+        connect_timeout: Union[float, None] = 10.0,
+        read_timeout: Union[float, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        store: Union[BlockStore, None] = None,
+        coalesce: bool = True,
+        compression: bool = True,
+        instrumentation: Union[Instrumentation, None] = None,
+    ):
+        """
+        Non-blocking client for a single beacon node. Every endpoint of BeaconChainAPI is available as a coroutine.
+        Use as an async context manager or call close() when done.
+        Args:
+            base_url: URL of the beacon node e.g. http://localhost:5052
+            pool_connections: Maximum number of simultaneous connections, 0 means unlimited
+            pool_maxsize: Maximum number of simultaneous connections per host, 0 means unlimited
+            keep_alive: If false every request closes its connection after the response
+            keep_alive_timeout: Seconds an idle connection is kept open for reuse
+            connect_timeout: Seconds to wait for a connection to be established, None waits forever
+            read_timeout: Seconds to wait between bytes of the response, None waits forever
+            cache: If given, parsed responses addressed by a root, genesis or a finalized slot are kept in this cache
+            store: If given, blocks, headers and attestations addressed by a root or a finalized slot
+                are written to and served from this on-disk store
+            coalesce: If true identical get_* calls made while one is in flight share its decoded result,
+                and so do identical requests made by different calls. `inflight.deduplicated` counts the calls
+                and requests that were saved. Shared results must not be mutated
+            compression: If true ask the node for zstd, br, gzip or deflate bodies, whichever are available,
+                `transfer` counts the bytes received and the time spent decompressing, see utils.compression
+            instrumentation: If given, every get_* and compute_* call is timed and passed to its sinks,
+                see utils.instrumentation
+        """
+        self.base_url = base_url
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.keep_alive_timeout = keep_alive_timeout
+        self.compression = compression
+        self.transfer = TransferStats()
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self._session = None
+        self.cache = cache
+        self.store = store
+        self.committee_cache = CommitteeCache()
+        self.inflight = AsyncSingleFlight() if coalesce else None
+        self._post_unsupported = set()
+        self._finalized_slot = -1
+        self._finalized_checked = float("-inf")
+        if self.inflight is not None:
+            coalesce_methods(self, self.inflight)
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # created lazily so the client can be constructed outside of a running event loop
+        if self._session is None or self._session.closed:
+            if self.keep_alive:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_connections,
+                    limit_per_host=self.pool_maxsize,
+                    keepalive_timeout=self.keep_alive_timeout,
+                )
+            else:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_connections,
+                    limit_per_host=self.pool_maxsize,
+                    force_close=True,
+                )
+            trace_configs = []
+            if self.instrumentation is not None:
+                trace_configs.append(_queue_trace())
+            # bodies are decompressed by _read_body and _iter_body
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"Accept-Encoding": accept_encoding(self.compression)},
+                auto_decompress=False,
+                trace_configs=trace_configs,
+            )
+        return self._session
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        if self._session is not None:
+            await self._session.close()
+
+    async def _is_immutable(self, identifier) -> bool:
+        if identifier == "genesis" or is_root(identifier):
+            return True
+        slot = as_slot(identifier)
+        if slot is None:
+            return False
+        if slot > self._finalized_slot:
+            await self._refresh_finalized_slot()
+        return slot <= self._finalized_slot
+
+    async def _refresh_finalized_slot(self):
+        # finality moves at most once per slot so the node is asked at most that often
+        now = time.monotonic()
+        if now - self._finalized_checked < SECONDS_PER_SLOT:
+            return
+        self._finalized_checked = now
+        checkpoints = await self.get_finality_checkpoints_from_state("head")
+        self._finalized_slot = checkpoints.finalized.epoch * SLOTS_PER_EPOCH
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _query_url(
+        self,
+        path: str,
+        stream: bool = False,
+        headers: dict = {"Accept": "application/json"},
+        params: Union[dict, None] = None,
+    ):
+        if stream or self.inflight is None:
+            return await self._fetch(path, stream, headers, params)
+        key = (path, freeze(headers), freeze(params))
+        record = current_call()
+        if record is None:
+            return await self.inflight.do(
+                key, lambda: self._fetch(path, stream, headers, params)
+            )
+        # see BeaconChainAPI._query_url
+        led = False
+
+        def lead():
+            nonlocal led
+            led = True
+            return self._fetch(path, stream, headers, params)
+
+        start = time.perf_counter()
+        try:
+            return await self.inflight.do(key, lead)
+        finally:
+            if not led:
+                record.add("queue_wait", time.perf_counter() - start)
+
+    async def _fetch(
+        self,
+        path: str,
+        stream: bool,
+        headers: dict,
+        params: Union[dict, None],
+    ):
+        if self.store is not None and not stream and not params:
+            route = self.store.route(path, headers["Accept"])
+            if route is not None and await self._is_immutable(route.identifier):
+                return await self._query_store(route, path, headers)
+        url = urllib.parse.urljoin(self.base_url, path)
+        sent = time.perf_counter()
+        response = await self.session.get(
+            url, headers=headers, params=_encode_params(params)
+        )
+        first_byte = time.perf_counter()
+        if response.status != 200:
+            async with response:
+                body = await self._read_body(response, path, sent, first_byte)
+            raise BeaconNodeError(response.status, body.decode(errors="replace"))
+        if stream:
+            return response
+        async with response:
+            body = await self._read_body(response, path, sent, first_byte)
+        if headers["Accept"] == "application/json":
+            return timed("json_decode", lambda: json.loads(body))
+        elif headers["Accept"] == "application/octet-stream":
+            return SSZBytes(body, response.headers.get("Eth-Consensus-Version"))
+        else:
+            return response
+
+    async def _read_body(
+        self,
+        response: aiohttp.ClientResponse,
+        path: str,
+        sent: float,
+        first_byte: float,
+    ) -> bytes:
+        chunks = [chunk async for chunk in self._iter_body(response, _CHUNK_SIZE)]
+        record = current_call()
+        if record is not None:
+            end = time.perf_counter()
+            record.add_response(path, response.status, sent, first_byte, end)
+        return b"".join(chunks)
+
+    def _iter_body(
+        self, response: aiohttp.ClientResponse, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Decompressed chunks of the body of a streamed response
+        """
+        chunks = response.content.iter_chunked(chunk_size)
+        encoding = response.headers.get("Content-Encoding")
+        return aiter_decoded(chunks, encoding, self.transfer)
+
+    async def _post_url(self, path: str, body):
+        url = urllib.parse.urljoin(self.base_url, path)
+        sent = time.perf_counter()
+        async with self.session.post(
+            url, json=body, headers={"Accept": "application/json"}
+        ) as response:
+            first_byte = time.perf_counter()
+            content = await self._read_body(response, path, sent, first_byte)
+        if response.status != 200:
+            raise BeaconNodeError(response.status, content.decode(errors="replace"))
+        return timed("json_decode", lambda: json.loads(content))
+
+    async def _canonical_root(self, route: StoreRoute, body: bytes) -> Union[str, None]:
+        # see BeaconChainAPI._canonical_root
+        slot = await asyncio.to_thread(
+            self.store.unverified_slot,
+            route.kind,
+            route.identifier,
+            body,
+            self._finalized_slot,
+        )
+        if slot is None:
+            return None
+        return await self.get_block_root_from_block_id(slot)
+
+    async def _query_store(self, route: StoreRoute, path: str, headers: dict):
+        # sqlite is blocking so it runs on the default executor
+        body = await asyncio.to_thread(self.store.get, route.kind, route.identifier)
+        if body is None:
+            url = urllib.parse.urljoin(self.base_url, path)
+            sent = time.perf_counter()
+            async with self.session.get(url, headers=headers) as response:
+                first_byte = time.perf_counter()
+                body = await self._read_body(response, path, sent, first_byte)
+            if response.status != 200:
+                raise BeaconNodeError(response.status, body.decode(errors="replace"))
+            if route.kind == "blocks_ssz":
+                body = SSZBytes(body, response.headers.get("Eth-Consensus-Version"))
+                if not is_supported_version(body.version):
+                    # see BeaconChainAPI._query_store
+                    return body
+            if is_root(route.identifier):
+                # learn the finalized slot so the block can also be found by its slot later
+                await self._refresh_finalized_slot()
+            await asyncio.to_thread(
+                self.store.put,
+                route.kind,
+                route.identifier,
+                body,
+                self._finalized_slot,
+                await self._canonical_root(route, body),
+            )
+        if headers["Accept"] == "application/json":
+            return timed("json_decode", lambda: json.loads(body))
+        return body
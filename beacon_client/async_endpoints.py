@@ -0,0 +1,805 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import AsyncIterator, List, Union, TYPE_CHECKING
+from sseclient import Event
+from .event_endpoints import EventEndpoints
+from .utils.cache import cache_immutable
+from .utils.committees import EpochCommittees, decision_slot
+from .utils.errors import BeaconNodeError, UnsupportedForkError
+from .utils.events import AsyncEventStream
+from .utils.params import selected, id_batches, POST_UNSUPPORTED
+from .utils.parsing import parse_json, get_decoder, TypeHooks, BinaryTransactionHooks
+from .utils.ssz import decode_signed_beacon_block
+from .utils.streaming import JSONArrayStream
+from .utils.types import (
+    StateId,
+    ValidatorId,
+    ValidatorIndex,
+    CommitteeIndex,
+    BlockId,
+    Epoch,
+    Slot,
+    Root,
+    PeerId,
+    GenesisDetails,
+    FinalityCheckpoints,
+    ValidatorSummary,
+    BalanceSummary,
+    CommitteeSummary,
+    SyncCommitteeSummary,
+    BeaconHeaderSummary,
+    SignedBeaconBlock,
+    Attestation,
+    Fork,
+    DepositContract,
+    NetworkIdentity,
+    PeerDescription,
+    PeerSummary,
+    SyncStatus,
+    SECONDS_PER_SLOT,
+    Bytes32,
+    SLOTS_PER_EPOCH,
+)
+
+if TYPE_CHECKING:
+    from .utils.columnar import ValidatorColumns
+    from .utils.shuffling import EpochShuffling
+
+
+class AsyncBeaconEndpoints:
+    async def _iter_data(self, path: str, data_class, params: dict, chunk_size: int):
+        response = await self._query_url(
+            path, stream=True, headers={"Accept": "application/json"}, params=params
+        )
+        decode = get_decoder(data_class)
+        stream = JSONArrayStream()
+        async with response:
+            async for chunk in self._iter_body(response, chunk_size):
+                for item in stream.feed(chunk):
+                    yield decode(item)
+        for item in stream.close():
+            yield decode(item)
+
+    async def _iter_validator_ids(
+        self,
+        path: str,
+        data_class,
+        validator_list: Union[List[ValidatorId], None],
+        params: dict,
+        chunk_size: int,
+    ):
+        # see BeaconEndpoints._iter_validator_ids
+        batches = id_batches(validator_list) if validator_list else [None]
+        for batch in batches:
+            async for item in self._iter_data(
+                path, data_class, {**params, "id": batch}, chunk_size
+            ):
+                yield item
+
+    async def _query_validator_ids(
+        self,
+        path: str,
+        validator_list: Union[List[ValidatorId], None],
+        params: dict,
+        post_body,
+        concurrency: int,
+    ) -> list:
+        # see BeaconEndpoints._query_validator_ids
+        if not validator_list:
+            return (await self._query_url(path, params=params))["data"]
+        batches = id_batches(validator_list)
+        endpoint = path.rsplit("/", 1)[-1]
+        post = len(batches) > 1 and endpoint not in self._post_unsupported
+        if post:
+            ids = [validator_id for batch in batches for validator_id in batch]
+            try:
+                return (await self._post_url(path, post_body(ids)))["data"]
+            except BeaconNodeError as error:
+                if error.status_code not in POST_UNSUPPORTED:
+                    raise
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(batch):
+            async with semaphore:
+                value = await self._query_url(path, params={**params, "id": batch})
+            return value["data"]
+
+        parts = await asyncio.gather(*(fetch(batch) for batch in batches))
+        if post:
+            self._post_unsupported.add(endpoint)
+        return [item for part in parts for item in part]
+
+    @cache_immutable()
+    async def get_genesis(self) -> GenesisDetails:
+        """
+        Async version of `BeaconEndpoints.get_genesis`
+        """
+        value = await self._query_url("/eth/v1/beacon/genesis")
+        return parse_json(value["data"], GenesisDetails)
+
+    @cache_immutable("state_id")
+    async def get_state_root(self, state_id: StateId) -> Root:
+        """
+        Async version of `BeaconEndpoints.get_state_root`
+        """
+        value = await self._query_url(f"/eth/v1/beacon/states/{state_id}/root")
+        return Root(value["data"]["root"])
+
+    @cache_immutable("state_id")
+    async def get_fork_from_state(self, state_id: StateId) -> Fork:
+        """
+        Async version of `BeaconEndpoints.get_fork_from_state`
+        """
+        value = await self._query_url(f"/eth/v1/beacon/states/{state_id}/fork")
+        return parse_json(value["data"], Fork)
+
+    @cache_immutable("state_id")
+    async def get_finality_checkpoints_from_state(
+        self, state_id: StateId
+    ) -> FinalityCheckpoints:
+        """
+        Async version of `BeaconEndpoints.get_finality_checkpoints_from_state`
+        """
+        value = await self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/finality_checkpoints"
+        )
+        return parse_json(value["data"], FinalityCheckpoints)
+
+    @cache_immutable("state_id")
+    async def get_validators_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        pending_initialized: bool = False,
+        pending_queued: bool = False,
+        active_ongoing: bool = False,
+        active_exiting: bool = False,
+        active_slashed: bool = False,
+        exited_unslashed: bool = False,
+        exited_slashed: bool = False,
+        withdrawal_possible: bool = False,
+        withdrawal_done: bool = False,
+        active: bool = False,
+        pending: bool = False,
+        exited: bool = False,
+        withdrawal: bool = False,
+        columnar: bool = False,
+        concurrency: int = 4,
+    ) -> Union[List[ValidatorSummary], "ValidatorColumns"]:
+        """
+        Async version of `BeaconEndpoints.get_validators_from_state`
+        """
+        status = selected(
+            pending_initialized=pending_initialized,
+            pending_queued=pending_queued,
+            active_ongoing=active_ongoing,
+            active_exiting=active_exiting,
+            active_slashed=active_slashed,
+            exited_unslashed=exited_unslashed,
+            exited_slashed=exited_slashed,
+            withdrawal_possible=withdrawal_possible,
+            withdrawal_done=withdrawal_done,
+            active=active,
+            pending=pending,
+            exited=exited,
+            withdrawal=withdrawal,
+        )
+        assert len(status) > 0, "Select at least one validator condition"
+        value = await self._query_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validators",
+            validator_list,
+            {"status": status},
+            lambda ids: {"ids": ids, "statuses": status},
+            concurrency,
+        )
+        if columnar:
+            from .utils.columnar import ValidatorColumns
+
+            return ValidatorColumns.from_json(value)
+        return parse_json(value, ValidatorSummary)
+
+    async def iter_validators_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        pending_initialized: bool = False,
+        pending_queued: bool = False,
+        active_ongoing: bool = False,
+        active_exiting: bool = False,
+        active_slashed: bool = False,
+        exited_unslashed: bool = False,
+        exited_slashed: bool = False,
+        withdrawal_possible: bool = False,
+        withdrawal_done: bool = False,
+        active: bool = False,
+        pending: bool = False,
+        exited: bool = False,
+        withdrawal: bool = False,
+        chunk_size: int = 2**16,
+    ) -> AsyncIterator[ValidatorSummary]:
+        """
+        Async iterator version of `BeaconEndpoints.iter_validators_from_state`
+        """
+        status = selected(
+            pending_initialized=pending_initialized,
+            pending_queued=pending_queued,
+            active_ongoing=active_ongoing,
+            active_exiting=active_exiting,
+            active_slashed=active_slashed,
+            exited_unslashed=exited_unslashed,
+            exited_slashed=exited_slashed,
+            withdrawal_possible=withdrawal_possible,
+            withdrawal_done=withdrawal_done,
+            active=active,
+            pending=pending,
+            exited=exited,
+            withdrawal=withdrawal,
+        )
+        assert len(status) > 0, "Select at least one validator condition"
+        async for item in self._iter_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validators",
+            ValidatorSummary,
+            validator_list,
+            {"status": status},
+            chunk_size,
+        ):
+            yield item
+
+    @cache_immutable("state_id")
+    async def get_validators_from_state_by_id(
+        self, state_id: StateId, validator_id: ValidatorId
+    ) -> ValidatorSummary:
+        """
+        Async version of `BeaconEndpoints.get_validators_from_state_by_id`
+        """
+        value = await self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/validators/{validator_id}"
+        )
+        return parse_json(value["data"], ValidatorSummary)
+
+    @cache_immutable("state_id")
+    async def get_validators_balances_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        concurrency: int = 4,
+    ) -> List[BalanceSummary]:
+        """
+        Async version of `BeaconEndpoints.get_validators_balances_from_state`
+        """
+        value = await self._query_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validator_balances",
+            validator_list,
+            {},
+            lambda ids: ids,
+            concurrency,
+        )
+        return parse_json(value, BalanceSummary)
+
+    async def iter_validators_balances_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        chunk_size: int = 2**16,
+    ) -> AsyncIterator[BalanceSummary]:
+        """
+        Async iterator version of `BeaconEndpoints.iter_validators_balances_from_state`
+        """
+        async for item in self._iter_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validator_balances",
+            BalanceSummary,
+            validator_list,
+            {},
+            chunk_size,
+        ):
+            yield item
+
+    @cache_immutable("state_id")
+    async def get_committees_from_state(
+        self,
+        state_id: StateId,
+        epoch: Union[Epoch, None] = None,
+        index: Union[ValidatorIndex, None] = None,
+        slot: Union[Slot, None] = None,
+    ) -> List[CommitteeSummary]:
+        """
+        Async version of `BeaconEndpoints.get_committees_from_state`
+        """
+        params = {"epoch": epoch, "index": index, "slot": slot}
+        value = await self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/committees", params=params
+        )
+        return parse_json(value["data"], CommitteeSummary)
+
+    async def iter_committees_from_state(
+        self,
+        state_id: StateId,
+        epoch: Union[Epoch, None] = None,
+        index: Union[ValidatorIndex, None] = None,
+        slot: Union[Slot, None] = None,
+        chunk_size: int = 2**16,
+    ) -> AsyncIterator[CommitteeSummary]:
+        """
+        Async iterator version of `BeaconEndpoints.iter_committees_from_state`
+        """
+        params = {"epoch": epoch, "index": index, "slot": slot}
+        async for item in self._iter_data(
+            f"/eth/v1/beacon/states/{state_id}/committees",
+            CommitteeSummary,
+            params,
+            chunk_size,
+        ):
+            yield item
+
+    async def get_epoch_committees(
+        self,
+        epoch: Epoch,
+        state_id: StateId = "head",
+        dependent_root: Union[Root, None] = None,
+    ) -> EpochCommittees:
+        """
+        Async version of `BeaconEndpoints.get_epoch_committees`
+        """
+        final = False
+        if dependent_root is None:
+            committees = self.committee_cache.get_final(epoch)
+            if committees is not None:
+                return committees
+            final = await self._is_immutable(decision_slot(epoch))
+        root = dependent_root or await self._attester_dependent_root(epoch)
+        committees = self.committee_cache.get(epoch, root)
+        if committees is None:
+            value = await self._query_url(
+                f"/eth/v1/beacon/states/{state_id}/committees", params={"epoch": epoch}
+            )
+            committees = EpochCommittees.from_json(value["data"], root)
+            if dependent_root is None and not final:
+                if root != await self._attester_dependent_root(epoch):
+                    return committees
+        self.committee_cache.put(committees, final)
+        return committees
+
+    async def _attester_dependent_root(self, epoch: Epoch) -> Root:
+        duties = await self.get_block_proposers_duties(max(epoch - 1, 0))
+        return Root(duties["dependent_root"])
+
+    @cache_immutable("state_id")
+    async def get_sync_committees_from_state(
+        self, state_id: StateId, epoch: Union[Epoch, None] = None
+    ) -> SyncCommitteeSummary:
+        """
+        Async version of `BeaconEndpoints.get_sync_committees_from_state`
+        """
+        params = {"epoch": epoch}
+        value = await self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/sync_committees", params=params
+        )
+        return parse_json(value["data"], SyncCommitteeSummary)
+
+    @cache_immutable("state_id")
+    async def get_randao_from_state(
+        self, state_id: StateId, epoch: Union[Epoch, None] = None
+    ) -> Bytes32:
+        """
+        Async version of `BeaconEndpoints.get_randao_from_state`
+        """
+        params = {"epoch": epoch}
+        value = await self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/randao", params=params
+        )
+        return Bytes32(value["data"]["randao"])
+
+    async def compute_epoch_shuffling(
+        self,
+        epoch: Epoch,
+        state_id: Union[StateId, None] = None,
+        fork: Union[str, None] = None,
+    ) -> "EpochShuffling":
+        """
+        Async version of `BeaconEndpoints.compute_epoch_shuffling`, the computation runs in a worker thread
+        """
+        from .utils.shuffling import compute_shuffling, fork_at_epoch, seed_epoch
+
+        if fork is None:
+            fork = fork_at_epoch(await self.get_node_specification(), epoch)
+        state_id = epoch * SLOTS_PER_EPOCH if state_id is None else state_id
+        mix = await self.get_randao_from_state(state_id, seed_epoch(epoch))
+        validators = await self.get_validators_from_state(
+            state_id, active=True, columnar=True
+        )
+        root = await self._attester_dependent_root(epoch)
+        shuffling = await asyncio.to_thread(
+            compute_shuffling, validators, mix, epoch, root, fork
+        )
+        self.committee_cache.put(shuffling.committees)
+        return shuffling
+
+    async def get_headers(
+        self, slot: Union[Slot, None] = None, parent_root: Union[Root, None] = None
+    ) -> BeaconHeaderSummary:
+        """
+        Async version of `BeaconEndpoints.get_headers`
+        """
+        params = {"slot": slot, "parent_root": parent_root}
+        value = await self._query_url("/eth/v1/beacon/headers", params=params)
+        return parse_json(value["data"], BeaconHeaderSummary)
+
+    # the canonical flag of a header by root changes with reorgs until its slot is finalized
+    @cache_immutable("block_id", slot_of=lambda header: header.header.message.slot)
+    async def get_headers_from_block_id(self, block_id: BlockId) -> BeaconHeaderSummary:
+        """
+        Async version of `BeaconEndpoints.get_headers_from_block_id`
+        """
+        value = await self._query_url(f"/eth/v1/beacon/headers/{block_id}")
+        return parse_json(value["data"], BeaconHeaderSummary)
+
+    @cache_immutable("block_id")
+    async def get_block_from_block_id(
+        self,
+        block_id: BlockId,
+        response_type: str = "json",
+        lazy: bool = False,
+        binary_transactions: bool = False,
+    ) -> Union[SignedBeaconBlock, bytes]:
+        """
+        Async version of `BeaconEndpoints.get_block_from_block_id`
+        """
+        match response_type:
+            case "json":
+                headers = {"Accept": "application/json"}
+                value = await self._query_url(
+                    f"/eth/v2/beacon/blocks/{block_id}", headers=headers
+                )
+                return parse_json(
+                    value["data"],
+                    SignedBeaconBlock,
+                    BinaryTransactionHooks if binary_transactions else TypeHooks,
+                    lazy=lazy,
+                )
+            case "ssz":
+                headers = {"Accept": "application/octet-stream"}
+                return await self._query_url(
+                    f"/eth/v2/beacon/blocks/{block_id}", headers=headers
+                )
+            case _:
+                assert False, "response_type must be in [json, ssz]"
+
+    async def get_blocks_in_range(
+        self,
+        start_slot: Slot,
+        end_slot: Slot,
+        concurrency: int = 32,
+        response_type: str = "json",
+        lazy: bool = False,
+        binary_transactions: bool = False,
+        decode: bool = True,
+    ) -> AsyncIterator[Union[SignedBeaconBlock, dict]]:
+        """
+        Async iterator version of `BeaconEndpoints.get_blocks_in_range`
+        """
+        assert concurrency > 0, "concurrency must be positive"
+        assert response_type in ["json", "ssz"], "response_type must be in [json, ssz]"
+        assert decode or response_type == "json", "only json blocks can be undecoded"
+
+        async def fetch(slot):
+            try:
+                if not decode:
+                    value = await self._query_url(f"/eth/v2/beacon/blocks/{slot}")
+                    return value["data"]
+                block = await self.get_block_from_block_id(
+                    slot,
+                    response_type=response_type,
+                    lazy=lazy,
+                    binary_transactions=binary_transactions,
+                )
+            except BeaconNodeError as error:
+                if error.status_code == 404:
+                    return None
+                raise
+            if response_type == "ssz":
+                try:
+                    return decode_signed_beacon_block(
+                        block, lazy=lazy, binary_transactions=binary_transactions
+                    )
+                except UnsupportedForkError:
+                    # no ssz layout for the fork of this block, the json api names its fields instead
+                    return await self.get_block_from_block_id(
+                        slot, lazy=lazy, binary_transactions=binary_transactions
+                    )
+            return block
+
+        slots = iter(range(start_slot, end_slot))
+        pending = deque(
+            asyncio.ensure_future(fetch(slot)) for slot in islice(slots, concurrency)
+        )
+        try:
+            while pending:
+                block = await pending.popleft()
+                for slot in islice(slots, 1):
+                    pending.append(asyncio.ensure_future(fetch(slot)))
+                if block is not None:
+                    yield block
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @cache_immutable("block_id")
+    async def get_block_root_from_block_id(self, block_id: BlockId) -> Root:
+        """
+        Async version of `BeaconEndpoints.get_block_root_from_block_id`
+        """
+        value = await self._query_url(f"/eth/v1/beacon/blocks/{block_id}/root")
+        return Root(value["data"]["root"])
+
+    @cache_immutable("block_id")
+    async def get_attestations_from_block_id(
+        self, block_id: BlockId
+    ) -> List[Attestation]:
+        """
+        Async version of `BeaconEndpoints.get_attestations_from_block_id`
+        """
+        value = await self._query_url(f"/eth/v1/beacon/blocks/{block_id}/attestations")
+        return parse_json(value["data"], Attestation)
+
+    async def get_pool_attestations(
+        self,
+        slot: Union[Slot, None] = None,
+        committee_index: Union[CommitteeIndex, None] = None,
+    ) -> List[Attestation]:
+        """
+        Async version of `BeaconEndpoints.get_pool_attestations`
+        """
+        params = {"slot": slot, "committee_index": committee_index}
+        value = await self._query_url("/eth/v1/beacon/pool/attestations", params=params)
+        return parse_json(value["data"], Attestation)
+
+    async def get_pool_attester_slashings(self) -> list:
+        """
+        Async version of `BeaconEndpoints.get_pool_attester_slashings`
+        """
+        value = await self._query_url("/eth/v1/beacon/pool/attester_slashings")
+        return value["data"]
+
+    async def get_pool_proposer_slashings(self) -> list:
+        """
+        Async version of `BeaconEndpoints.get_pool_proposer_slashings`
+        """
+        value = await self._query_url("/eth/v1/beacon/pool/proposer_slashings")
+        return value["data"]
+
+    async def get_pool_voluntary_exits(self) -> dict:
+        """
+        Async version of `BeaconEndpoints.get_pool_voluntary_exits`
+        """
+        value = await self._query_url("/eth/v1/beacon/pool/voluntary_exits")
+        return value["data"]
+
+
+class AsyncConfigEndpoints:
+    async def get_fork_schedule(self) -> List[Fork]:
+        """
+        Async version of `ConfigEndpoints.get_fork_schedule`
+        """
+        value = await self._query_url("/eth/v1/config/fork_schedule")
+        return parse_json(value["data"], Fork)
+
+    async def get_node_specification(self) -> dict:
+        """
+        Async version of `ConfigEndpoints.get_node_specification`
+        """
+        value = await self._query_url("/eth/v1/config/spec")
+        return value["data"]
+
+    async def get_deposit_contract(self) -> DepositContract:
+        """
+        Async version of `ConfigEndpoints.get_deposit_contract`
+        """
+        value = await self._query_url("/eth/v1/config/deposit_contract")
+        return parse_json(value["data"], DepositContract)
+
+
+class AsyncDebugEndpoints:
+    pass
+
+
+class AsyncEventEndpoints:
+    async def stream_events(
+        self,
+        head: bool = False,
+        block: bool = False,
+        attestation: bool = False,
+        voluntary_exit: bool = False,
+        finalized_checkpoint: bool = False,
+        chain_reorg: bool = False,
+        contribution_and_proof: bool = False,
+    ) -> AsyncIterator[Event]:
+        """
+        Async iterator version of `EventEndpoints.stream_events`.
+        Yields the same Event objects (event.event: str, event.data: str) as the blocking client
+        """
+        events = selected(
+            head=head,
+            block=block,
+            attestation=attestation,
+            voluntary_exit=voluntary_exit,
+            finalized_checkpoint=finalized_checkpoint,
+            chain_reorg=chain_reorg,
+            contribution_and_proof=contribution_and_proof,
+        )
+        assert len(events) > 0, "Must select at least one event"
+        response = await self._query_url(
+            path="/eth/v1/events",
+            stream=True,
+            headers={"Accept": "text/event-stream", "Accept-Encoding": "identity"},
+            params={"topics": events},
+        )
+        async with response:
+            async for event in iter_sse(response.content):
+                yield event
+
+    def iter_events(
+        self,
+        head: bool = False,
+        block: bool = False,
+        attestation: bool = False,
+        voluntary_exit: bool = False,
+        finalized_checkpoint: bool = False,
+        chain_reorg: bool = False,
+        workers: int = 4,
+        queue_size: int = 1024,
+        drop_when_full: bool = False,
+        max_lag: float = SECONDS_PER_SLOT / 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        executor: Union[Executor, None] = None,
+    ) -> AsyncEventStream:
+        """
+        Async version of `EventEndpoints.iter_events`, iterate with `async for`
+        """
+        topics = selected(
+            head=head,
+            block=block,
+            attestation=attestation,
+            voluntary_exit=voluntary_exit,
+            finalized_checkpoint=finalized_checkpoint,
+            chain_reorg=chain_reorg,
+        )
+        assert len(topics) > 0, "Must select at least one event"
+
+        async def connect(last_event_id):
+            # uncompressed so no event waits in the node's compressor for the next one
+            headers = {"Accept": "text/event-stream", "Accept-Encoding": "identity"}
+            if last_event_id is not None:
+                headers["Last-Event-ID"] = last_event_id
+            return await self._query_url(
+                path="/eth/v1/events",
+                stream=True,
+                headers=headers,
+                params={"topics": topics},
+            )
+
+        return AsyncEventStream(
+            connect,
+            iter_sse,
+            workers=workers,
+            queue_size=queue_size,
+            drop_when_full=drop_when_full,
+            max_lag=max_lag,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+            executor=executor,
+        )
+
+    parse_head = staticmethod(EventEndpoints.parse_head)
+    parse_block = staticmethod(EventEndpoints.parse_block)
+    parse_attestation = staticmethod(EventEndpoints.parse_attestation)
+    parse_checkpoint = staticmethod(EventEndpoints.parse_checkpoint)
+    parse_voluntary_exit = staticmethod(EventEndpoints.parse_voluntary_exit)
+    parse_chain_reorg = staticmethod(EventEndpoints.parse_chain_reorg)
+
+
+async def iter_sse(lines) -> AsyncIterator[Event]:
+    """
+    Parse a Server-Sent-Events stream from an async iterable of byte lines
+    """
+    event = Event()
+    data = []
+    async for raw in lines:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                event.data = "\n".join(data)
+                yield event
+            event = Event()
+            data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, content = line.partition(":")
+        if content.startswith(" "):
+            content = content[1:]
+        match field:
+            case "data":
+                data.append(content)
+            case "event":
+                event.event = content
+            case "id":
+                event.id = content
+            case "retry":
+                event.retry = int(content) if content.isdigit() else None
+
+
+class AsyncNodeEndpoints:
+    async def get_node_identity(self) -> NetworkIdentity:
+        """
+        Async version of `NodeEndpoints.get_node_identity`
+        """
+        value = await self._query_url("/eth/v1/node/identity")
+        return parse_json(value["data"], NetworkIdentity)
+
+    async def get_node_peers(
+        self,
+        disconnected: bool = False,
+        disconnecting: bool = False,
+        connected: bool = False,
+        connecting: bool = False,
+        inbound: bool = False,
+        outbound: bool = False,
+    ) -> List[PeerDescription]:
+        """
+        Async version of `NodeEndpoints.get_node_peers`
+        """
+        state = selected(
+            disconnected=disconnected,
+            disconnecting=disconnecting,
+            connected=connected,
+            connecting=connecting,
+        )
+        direction = selected(inbound=inbound, outbound=outbound)
+        assert (
+            len(state) > 0
+        ), "Must request at least one state in [disconnected, disconnecting, connected, connecting]"
+        assert (
+            len(direction) > 0
+        ), "Must request at least one direction in [inbound, outbound]"
+        params = {"state": state, "direction": direction}
+        value = await self._query_url("/eth/v1/node/peers", params=params)
+        return parse_json(value["data"], PeerDescription)
+
+    async def get_peer_by_id(self, peer_id: PeerId) -> PeerDescription:
+        """
+        Async version of `NodeEndpoints.get_peer_by_id`
+        """
+        value = await self._query_url(f"/eth/v1/node/peers/{peer_id}")
+        return parse_json(value["data"], PeerDescription)
+
+    async def get_peer_count(self) -> PeerSummary:
+        """
+        Async version of `NodeEndpoints.get_peer_count`
+        """
+        value = await self._query_url("/eth/v1/node/peer_count")
+        return parse_json(value["data"], PeerSummary)
+
+    async def get_node_version(self) -> str:
+        """
+        Async version of `NodeEndpoints.get_node_version`
+        """
+        value = await self._query_url("/eth/v1/node/version")
+        return value["data"]["version"]
+
+    async def get_syncing_status(self) -> SyncStatus:
+        """
+        Async version of `NodeEndpoints.get_syncing_status`
+        """
+        value = await self._query_url("/eth/v1/node/syncing")
+        return parse_json(value["data"], SyncStatus)
+
+
+class AsyncValidatorEndpoints:
+    async def get_block_proposers_duties(self, epoch: int) -> dict:
+        """
+        Async version of `ValidatorEndpoints.get_block_proposers_duties`
+        """
+        return await self._query_url(f"/eth/v1/validator/duties/proposer/{epoch}")
@@ -1,5 +1,15 @@
-from typing import Union, List
-from .utils.parsing import parse_json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from itertools import islice
+from typing import Union, List, Iterator, TYPE_CHECKING
+from .utils.cache import cache_immutable
+from .utils.committees import EpochCommittees, decision_slot
+from .utils.errors import BeaconNodeError, UnsupportedForkError
+from .utils.params import selected, id_batches, POST_UNSUPPORTED
+from .utils.parsing import parse_json, get_decoder, TypeHooks, BinaryTransactionHooks
+from .utils.streaming import iter_json_array
+from .utils.ssz import decode_signed_beacon_block
 from .utils.types import (
     StateId,
     ValidatorId,
@@ -19,10 +29,81 @@ from .utils.types import (
     SignedBeaconBlock,
     Attestation,
     Fork,
+    Bytes32,
+    SLOTS_PER_EPOCH,
 )
 
+if TYPE_CHECKING:
+    from .utils.columnar import ValidatorColumns
+    from .utils.shuffling import EpochShuffling
+
 
 class BeaconEndpoints:
+    def _iter_data(self, path: str, data_class, params: dict, chunk_size: int):
+        response = self._query_url(
+            path, stream=True, headers={"Accept": "application/json"}, params=params
+        )
+        decode = get_decoder(data_class)
+        with response:
+            for item in iter_json_array(self._iter_body(response, chunk_size)):
+                yield decode(item)
+
+    def _iter_validator_ids(
+        self,
+        path: str,
+        data_class,
+        validator_list: Union[List[ValidatorId], None],
+        params: dict,
+        chunk_size: int,
+    ):
+        # streams the url sized GET batches of validator_list one after another, so memory
+        # stays bounded by chunk_size however long the list is
+        batches = id_batches(validator_list) if validator_list else [None]
+        for batch in batches:
+            yield from self._iter_data(
+                path, data_class, {**params, "id": batch}, chunk_size
+            )
+
+    def _query_validator_ids(
+        self,
+        path: str,
+        validator_list: Union[List[ValidatorId], None],
+        params: dict,
+        post_body,
+        concurrency: int,
+    ) -> list:
+        # the json data for validator_list, in one POST when the list does not fit in a url
+        # and the node supports it, otherwise in url sized GET batches sent in parallel
+        if not validator_list:
+            return self._query_url(path, params=params)["data"]
+        batches = id_batches(validator_list)
+        endpoint = path.rsplit("/", 1)[-1]
+        post = len(batches) > 1 and endpoint not in self._post_unsupported
+        if post:
+            ids = [validator_id for batch in batches for validator_id in batch]
+            try:
+                return self._post_url(path, post_body(ids))["data"]
+            except BeaconNodeError as error:
+                if error.status_code not in POST_UNSUPPORTED:
+                    raise
+
+        def fetch(batch):
+            return self._query_url(path, params={**params, "id": batch})["data"]
+
+        if len(batches) == 1:
+            return fetch(batches[0])
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+            # each batch runs in a copy of the caller's context so its timings reach the caller's record
+            futures = [
+                executor.submit(copy_context().run, fetch, batch) for batch in batches
+            ]
+            data = [item for future in futures for item in future.result()]
+        if post:
+            # GET worked where POST did not so the node lacks the POST form
+            self._post_unsupported.add(endpoint)
+        return data
+
+    @cache_immutable()
     def get_genesis(self) -> GenesisDetails:
         """
         Retrieve details of the chain's genesis which can be used to identify chain.
@@ -31,6 +112,7 @@ class BeaconEndpoints:
         data = parse_json(value["data"], GenesisDetails)
         return data
 
+    @cache_immutable("state_id")
     def get_state_root(self, state_id: StateId) -> Root:
         """
         Calculates HashTreeRoot for state with given 'state_id'. If state_id is root, same value will be returned.
@@ -42,6 +124,7 @@ class BeaconEndpoints:
         data = Root(value["data"]["root"])
         return data
 
+    @cache_immutable("state_id")
     def get_fork_from_state(self, state_id: StateId) -> Fork:
         """
         Returns Fork object for state with given 'state_id'.
@@ -52,6 +135,7 @@ class BeaconEndpoints:
         data = parse_json(value["data"], Fork)
         return data
 
+    @cache_immutable("state_id")
     def get_finality_checkpoints_from_state(
         self, state_id: StateId
     ) -> FinalityCheckpoints:
@@ -67,6 +151,7 @@ class BeaconEndpoints:
         data = parse_json(value["data"], FinalityCheckpoints)
         return data
 
+    @cache_immutable("state_id")
     def get_validators_from_state(
         self,
         state_id: StateId,
@@ -84,7 +169,9 @@ class BeaconEndpoints:
         pending: bool = False,
         exited: bool = False,
         withdrawal: bool = False,
-    ) -> List[ValidatorSummary]:
+        columnar: bool = False,
+        concurrency: int = 4,
+    ) -> Union[List[ValidatorSummary], "ValidatorColumns"]:
         """
         Returns filterable list of validators with their balance, status and index.
         Information will be returned for all indices or public key that match known validators.
@@ -95,7 +182,9 @@ class BeaconEndpoints:
         and can be used to confirm for which inputs a response has been returned.
         Args:
             state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
-            validator_list: List of validators identified by public key or validator index
+            validator_list: List of validators identified by public key or validator index.
+                Lists too long for one url are sent in one POST request, or split into parallel GET requests
+                when the node does not support POST
             pending_initialized: If true return validators with this status
             pending_queued: If true return validators with this status
             active_ongoing: If true return validators with this status
@@ -109,6 +198,8 @@ class BeaconEndpoints:
             pending: If true return validators with this status
             exited: If true return validators with this status
             withdrawal: If true return validators with this status
+            columnar: If true return a utils.columnar.ValidatorColumns (one numpy array per field) instead of dataclasses, requires numpy
+            concurrency: Number of requests in flight at once when a long validator_list is split into batches
         """
         status = []
         if pending_initialized:
@@ -138,13 +229,87 @@ class BeaconEndpoints:
         if withdrawal:
             status.append("withdrawal")
         assert len(status) > 0, "Select at least one validator condition"
-        params = {"status": status, "id": validator_list}
-        value = self._query_url(
-            f"/eth/v1/beacon/states/{state_id}/validators", params=params
+        value = self._query_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validators",
+            validator_list,
+            {"status": status},
+            lambda ids: {"ids": ids, "statuses": status},
+            concurrency,
         )
-        data = parse_json(value["data"], ValidatorSummary)
+        if columnar:
+            from .utils.columnar import ValidatorColumns
+
+            return ValidatorColumns.from_json(value)
+        data = parse_json(value, ValidatorSummary)
         return data
 
+    def iter_validators_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        pending_initialized: bool = False,
+        pending_queued: bool = False,
+        active_ongoing: bool = False,
+        active_exiting: bool = False,
+        active_slashed: bool = False,
+        exited_unslashed: bool = False,
+        exited_slashed: bool = False,
+        withdrawal_possible: bool = False,
+        withdrawal_done: bool = False,
+        active: bool = False,
+        pending: bool = False,
+        exited: bool = False,
+        withdrawal: bool = False,
+        chunk_size: int = 2**16,
+    ) -> Iterator[ValidatorSummary]:
+        """
+        Streaming version of get_validators_from_state.
+        The response is decoded incrementally as it arrives and validators are yielded one at a time,
+        so memory use is bounded by chunk_size instead of the size of the response.
+        Args:
+            state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
+            validator_list: List of validators identified by public key or validator index.
+                Lists too long for one url are split into url sized GET requests streamed one after another
+            pending_initialized: If true return validators with this status
+            pending_queued: If true return validators with this status
+            active_ongoing: If true return validators with this status
+            active_exiting: If true return validators with this status
+            active_slashed: If true return validators with this status
+            exited_unslashed: If true return validators with this status
+            exited_slashed: If true return validators with this status
+            withdrawal_possible: If true return validators with this status
+            withdrawal_done: If true return validators with this status
+            active: If true return validators with this status
+            pending: If true return validators with this status
+            exited: If true return validators with this status
+            withdrawal: If true return validators with this status
+            chunk_size: Number of bytes read from the connection at a time
+        """
+        status = selected(
+            pending_initialized=pending_initialized,
+            pending_queued=pending_queued,
+            active_ongoing=active_ongoing,
+            active_exiting=active_exiting,
+            active_slashed=active_slashed,
+            exited_unslashed=exited_unslashed,
+            exited_slashed=exited_slashed,
+            withdrawal_possible=withdrawal_possible,
+            withdrawal_done=withdrawal_done,
+            active=active,
+            pending=pending,
+            exited=exited,
+            withdrawal=withdrawal,
+        )
+        assert len(status) > 0, "Select at least one validator condition"
+        return self._iter_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validators",
+            ValidatorSummary,
+            validator_list,
+            {"status": status},
+            chunk_size,
+        )
+
+    @cache_immutable("state_id")
     def get_validators_from_state_by_id(
         self, state_id: StateId, validator_id: ValidatorId
     ) -> ValidatorSummary:
@@ -160,8 +325,12 @@ class BeaconEndpoints:
         data = parse_json(value["data"], ValidatorSummary)
         return data
 
+    @cache_immutable("state_id")
     def get_validators_balances_from_state(
-        self, state_id: StateId, validator_list: Union[List[ValidatorId], None] = None
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        concurrency: int = 4,
     ) -> List[BalanceSummary]:
         """
         Returns filterable list of validators balances.
@@ -173,15 +342,45 @@ class BeaconEndpoints:
         and can be used to confirm for which inputs a response has been returned.
         Args:
             state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
-            validator_list: List of validators identified by public key or validator index
-        """
-        params = {"id": validator_list}
-        value = self._query_url(
-            f"/eth/v1/beacon/states/{state_id}/validator_balances", params=params
+            validator_list: List of validators identified by public key or validator index.
+                Lists too long for one url are sent in one POST request, or split into parallel GET requests
+                when the node does not support POST
+            concurrency: Number of requests in flight at once when a long validator_list is split into batches
+        """
+        value = self._query_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validator_balances",
+            validator_list,
+            {},
+            lambda ids: ids,
+            concurrency,
         )
-        data = parse_json(value["data"], BalanceSummary)
+        data = parse_json(value, BalanceSummary)
         return data
 
+    def iter_validators_balances_from_state(
+        self,
+        state_id: StateId,
+        validator_list: Union[List[ValidatorId], None] = None,
+        chunk_size: int = 2**16,
+    ) -> Iterator[BalanceSummary]:
+        """
+        Streaming version of get_validators_balances_from_state.
+        Balances are yielded one at a time as the response arrives.
+        Args:
+            state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
+            validator_list: List of validators identified by public key or validator index.
+                Lists too long for one url are split into url sized GET requests streamed one after another
+            chunk_size: Number of bytes read from the connection at a time
+        """
+        return self._iter_validator_ids(
+            f"/eth/v1/beacon/states/{state_id}/validator_balances",
+            BalanceSummary,
+            validator_list,
+            {},
+            chunk_size,
+        )
+
+    @cache_immutable("state_id")
     def get_committees_from_state(
         self,
         state_id: StateId,
@@ -204,6 +403,77 @@ class BeaconEndpoints:
         data = parse_json(value["data"], CommitteeSummary)
         return data
 
+    def iter_committees_from_state(
+        self,
+        state_id: StateId,
+        epoch: Union[Epoch, None] = None,
+        index: Union[ValidatorIndex, None] = None,
+        slot: Union[Slot, None] = None,
+        chunk_size: int = 2**16,
+    ) -> Iterator[CommitteeSummary]:
+        """
+        Streaming version of get_committees_from_state.
+        Committees are yielded one at a time as the response arrives.
+        Args:
+            state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
+            epoch: Fetch committees for the given epoch. If not present then the committees for the epoch of the state will be obtained
+            index: Restrict returned values to those matching the supplied committee index
+            slot: Restrict returned values to those matching the supplied slot
+            chunk_size: Number of bytes read from the connection at a time
+        """
+        params = {"epoch": epoch, "index": index, "slot": slot}
+        return self._iter_data(
+            f"/eth/v1/beacon/states/{state_id}/committees",
+            CommitteeSummary,
+            params,
+            chunk_size,
+        )
+
+    def get_epoch_committees(
+        self,
+        epoch: Epoch,
+        state_id: StateId = "head",
+        dependent_root: Union[Root, None] = None,
+    ) -> EpochCommittees:
+        """
+        Every committee of an epoch as an EpochCommittees index with constant time lookups from validator to
+        (slot, committee index, position) and from (slot, committee index) to members.
+        Indexes are kept in `self.committee_cache` keyed on the epoch's dependent root, so they are rebuilt
+        only when a reorg changed that epoch's shuffling. Once the block deciding that shuffling is finalized
+        the cached committees are returned without looking the dependent root up again.
+        Args:
+            epoch: Epoch of the committees
+            state_id: State to compute the committees from, use a slot of the epoch for historical epochs
+            dependent_root: Block root the committees depend on, e.g. previous_duty_dependent_root of a head event
+                for the current epoch. Looked up with get_block_proposers_duties(epoch - 1) if not given
+        """
+        final = False
+        if dependent_root is None:
+            committees = self.committee_cache.get_final(epoch)
+            if committees is not None:
+                return committees
+            final = self._is_immutable(decision_slot(epoch))
+        root = dependent_root or self._attester_dependent_root(epoch)
+        committees = self.committee_cache.get(epoch, root)
+        if committees is None:
+            value = self._query_url(
+                f"/eth/v1/beacon/states/{state_id}/committees", params={"epoch": epoch}
+            )
+            committees = EpochCommittees.from_json(value["data"], root)
+            # a reorg while the committees were fetched may have moved state_id to another fork
+            if dependent_root is None and not final:
+                if root != self._attester_dependent_root(epoch):
+                    return committees
+        self.committee_cache.put(committees, final)
+        return committees
+
+    def _attester_dependent_root(self, epoch: Epoch) -> Root:
+        # attester shuffling for epoch is decided by the last block of epoch - 2,
+        # which is the block proposer duties of epoch - 1 depend on
+        duties = self.get_block_proposers_duties(max(epoch - 1, 0))
+        return Root(duties["dependent_root"])
+
+    @cache_immutable("state_id")
     def get_sync_committees_from_state(
         self, state_id: StateId, epoch: Union[Epoch, None] = None
     ) -> SyncCommitteeSummary:
@@ -222,6 +492,53 @@ class BeaconEndpoints:
         data = parse_json(value["data"], SyncCommitteeSummary)
         return data
 
+    @cache_immutable("state_id")
+    def get_randao_from_state(
+        self, state_id: StateId, epoch: Union[Epoch, None] = None
+    ) -> Bytes32:
+        """
+        Retrieves the RANDAO mix of the given state.
+        Args:
+            state_id: Element of [head, genesis, finalized, justified] or block number (int) or string starting with 0x
+            epoch: Fetch the mix at the end of this epoch. If not present then the mix of the epoch of the state is returned
+        """
+        params = {"epoch": epoch}
+        value = self._query_url(
+            f"/eth/v1/beacon/states/{state_id}/randao", params=params
+        )
+        return Bytes32(value["data"]["randao"])
+
+    def compute_epoch_shuffling(
+        self,
+        epoch: Epoch,
+        state_id: Union[StateId, None] = None,
+        fork: Union[str, None] = None,
+    ) -> "EpochShuffling":
+        """
+        Computes the committees and proposers of an epoch locally with utils.shuffling instead of asking
+        the node for them. Requires numpy. It takes the RANDAO mix, the active validators, the proposer duties
+        of epoch - 1 for the attester dependent root and, unless fork is given, the node specification.
+        Raises UnsupportedForkError for fulu and later forks, whose proposers utils.shuffling can not compute.
+        The committees are also stored in `self.committee_cache`, see get_epoch_committees.
+        Args:
+            epoch: Epoch to compute, at least 2
+            state_id: State at the start of epoch, the first slot of epoch if not given
+            fork: Name of the fork active in epoch, looked up in the node specification if not given
+        """
+        from .utils.shuffling import compute_shuffling, fork_at_epoch, seed_epoch
+
+        if fork is None:
+            fork = fork_at_epoch(self.get_node_specification(), epoch)
+        state_id = epoch * SLOTS_PER_EPOCH if state_id is None else state_id
+        mix = self.get_randao_from_state(state_id, seed_epoch(epoch))
+        validators = self.get_validators_from_state(
+            state_id, active=True, columnar=True
+        )
+        root = self._attester_dependent_root(epoch)
+        shuffling = compute_shuffling(validators, mix, epoch, root, fork)
+        self.committee_cache.put(shuffling.committees)
+        return shuffling
+
     def get_headers(
         self, slot: Union[Slot, None] = None, parent_root: Union[Root, None] = None
     ) -> BeaconHeaderSummary:
@@ -236,6 +553,8 @@ class BeaconEndpoints:
         data = parse_json(value["data"], BeaconHeaderSummary)
         return data
 
+    # the canonical flag of a header by root changes with reorgs until its slot is finalized
+    @cache_immutable("block_id", slot_of=lambda header: header.header.message.slot)
     def get_headers_from_block_id(self, block_id: BlockId) -> BeaconHeaderSummary:
         """
         Retrieves block headers matching given query. By default it will fetch current head slot blocks.
@@ -246,16 +565,28 @@ class BeaconEndpoints:
         data = parse_json(value["data"], BeaconHeaderSummary)
         return data
 
+    @cache_immutable("block_id")
     def get_block_from_block_id(
-        self, block_id: BlockId, response_type: str = "json"
-    ) -> Union[SignedBeaconBlock, str]:
+        self,
+        block_id: BlockId,
+        response_type: str = "json",
+        lazy: bool = False,
+        binary_transactions: bool = False,
+    ) -> Union[SignedBeaconBlock, bytes]:
         """
         Retrieves block details for given block id.
         Depending on Accept header it can be returned either as json or as bytes serialized by SSZ
         response_type in [json, ssz]
+        SSZ bytes can be turned into a SignedBeaconBlock with utils.ssz.decode_signed_beacon_block,
+        they are a utils.ssz.SSZBytes whose version is the fork named by the Eth-Consensus-Version header
         Args:
             block_id: Return block matching given block id
             response_type: Element of [json, szz] that determines the return type
+            lazy: If true the json block is decoded field by field on first access instead of all at once,
+                which is much faster when only a few fields are read. See utils.lazy
+            binary_transactions: If true the execution payload transactions of a json block are decoded into
+                one utils.transactions.TransactionList buffer instead of a hex string each.
+                For ssz pass the same option to decode_signed_beacon_block
         """
         match response_type:
             case "json":
@@ -263,7 +594,12 @@ class BeaconEndpoints:
                 value = self._query_url(
                     f"/eth/v2/beacon/blocks/{block_id}", headers=headers
                 )
-                data = parse_json(value["data"], SignedBeaconBlock)
+                data = parse_json(
+                    value["data"],
+                    SignedBeaconBlock,
+                    BinaryTransactionHooks if binary_transactions else TypeHooks,
+                    lazy=lazy,
+                )
                 return data
             case "ssz":
                 headers = {"Accept": "application/octet-stream"}
@@ -273,6 +609,78 @@ class BeaconEndpoints:
             case _:
                 assert Exception("response_type must be in [json, ssz]")
 
+    def get_blocks_in_range(
+        self,
+        start_slot: Slot,
+        end_slot: Slot,
+        concurrency: int = 8,
+        response_type: str = "json",
+        lazy: bool = False,
+        binary_transactions: bool = False,
+        decode: bool = True,
+    ) -> Iterator[Union[SignedBeaconBlock, dict]]:
+        """
+        Retrieves the blocks for every slot from start_slot up to but excluding end_slot, yielded in slot order.
+        Requests are spread over a pool of worker threads and at most 2 * concurrency blocks are held at once.
+        Skipped slots (404 from the node) produce no block.
+        For concurrency above the client's pool_maxsize, raise pool_maxsize so connections are reused.
+        Args:
+            start_slot: First slot to fetch
+            end_slot: Slot to stop before
+            concurrency: Number of requests in flight at once
+            response_type: Element of [json, ssz], ssz downloads are smaller and decoded with utils.ssz.
+                Blocks of forks utils.ssz has no layout for are fetched again as json
+            lazy: If true decode the fields of each block on first access, see get_block_from_block_id
+            binary_transactions: If true decode transactions into a TransactionList, see get_block_from_block_id
+            decode: If false yield the json `data` of each block as returned by the node, without building dataclasses
+        """
+        assert concurrency > 0, "concurrency must be positive"
+        assert response_type in ["json", "ssz"], "response_type must be in [json, ssz]"
+        assert decode or response_type == "json", "only json blocks can be undecoded"
+
+        def fetch(slot):
+            try:
+                if not decode:
+                    value = self._query_url(f"/eth/v2/beacon/blocks/{slot}")
+                    return value["data"]
+                block = self.get_block_from_block_id(
+                    slot,
+                    response_type=response_type,
+                    lazy=lazy,
+                    binary_transactions=binary_transactions,
+                )
+            except BeaconNodeError as error:
+                if error.status_code == 404:
+                    return None
+                raise
+            if response_type == "ssz":
+                try:
+                    return decode_signed_beacon_block(
+                        block, lazy=lazy, binary_transactions=binary_transactions
+                    )
+                except UnsupportedForkError:
+                    # no ssz layout for the fork of this block, the json api names its fields instead
+                    return self.get_block_from_block_id(
+                        slot, lazy=lazy, binary_transactions=binary_transactions
+                    )
+            return block
+
+        slots = iter(range(start_slot, end_slot))
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            pending = deque(
+                executor.submit(fetch, slot) for slot in islice(slots, 2 * concurrency)
+            )
+            while pending:
+                block = pending.popleft().result()
+                for slot in islice(slots, 1):
+                    pending.append(executor.submit(fetch, slot))
+                if block is not None:
+                    yield block
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @cache_immutable("block_id")
     def get_block_root_from_block_id(self, block_id: BlockId) -> Root:
         """
         Retrieves hashTreeRoot of BeaconBlock/BeaconBlockHeader
@@ -282,6 +690,7 @@ class BeaconEndpoints:
         value = self._query_url(f"/eth/v1/beacon/blocks/{block_id}/root")
         return Root(value["data"]["root"])
 
+    @cache_immutable("block_id")
     def get_attestations_from_block_id(self, block_id: BlockId) -> List[Attestation]:
         """
         Retrieves attestation included in requested block.
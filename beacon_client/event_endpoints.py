@@ -1,6 +1,18 @@
+from concurrent.futures import Executor
+from typing import Union
 from sseclient import SSEClient
+from .utils.events import EventStream
+from .utils.params import selected
 from .utils.parsing import parse_json
-from .utils.types import StreamedHead, StreamedBlock, Attestation, StreamedCheckpoint
+from .utils.types import (
+    StreamedHead,
+    StreamedBlock,
+    Attestation,
+    StreamedCheckpoint,
+    StreamedChainReorg,
+    SignedVoluntaryExit,
+    SECONDS_PER_SLOT,
+)
 import json
 
 
@@ -47,12 +59,82 @@ class EventEndpoints:
         response = self._query_url(
             path="/eth/v1/events",
             stream=True,
-            headers={"Accept": "text/event-stream"},
+            headers={"Accept": "text/event-stream", "Accept-Encoding": "identity"},
             params={"topics": events},
         )
         client = SSEClient(response)
         return client.events()
 
+    def iter_events(
+        self,
+        head: bool = False,
+        block: bool = False,
+        attestation: bool = False,
+        voluntary_exit: bool = False,
+        finalized_checkpoint: bool = False,
+        chain_reorg: bool = False,
+        workers: int = 4,
+        queue_size: int = 1024,
+        drop_when_full: bool = False,
+        max_lag: float = SECONDS_PER_SLOT / 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        executor: Union[Executor, None] = None,
+    ) -> EventStream:
+        """
+        Managed version of stream_events that yields typed objects in the order the node sent them:
+        StreamedHead, StreamedBlock, Attestation, SignedVoluntaryExit, StreamedCheckpoint and StreamedChainReorg.
+        Events are read on a background thread and decoded on a worker pool while the caller consumes them.
+        Dropped connections are re-established with the Last-Event-ID of the last event and exponential backoff.
+        Use as a context manager or call close() when done, see utils.events.EventStream for the counters.
+        Args:
+            head: If true return events of type head
+            block: If true return events of type block
+            attestation: If true return events of type attestation
+            voluntary_exit: If true return events of type voluntary_exit
+            finalized_checkpoint: If true return events of type finalized_checkpoint
+            chain_reorg: If true return events of type chain_reorg
+            workers: Number of threads decoding events
+            queue_size: Maximum number of events read but not yet consumed
+            drop_when_full: If true discard new events while the queue is full instead of pausing the connection
+            max_lag: Events consumed more than this many seconds after they arrived are counted as lagging
+            initial_backoff: Seconds to wait before the first reconnection attempt
+            max_backoff: Upper bound of the doubling wait between reconnection attempts
+            executor: Executor to decode events on instead of a private thread pool of size workers
+        """
+        topics = selected(
+            head=head,
+            block=block,
+            attestation=attestation,
+            voluntary_exit=voluntary_exit,
+            finalized_checkpoint=finalized_checkpoint,
+            chain_reorg=chain_reorg,
+        )
+        assert len(topics) > 0, "Must select at least one event"
+
+        def connect(last_event_id):
+            # uncompressed so no event waits in the node's compressor for the next one
+            headers = {"Accept": "text/event-stream", "Accept-Encoding": "identity"}
+            if last_event_id is not None:
+                headers["Last-Event-ID"] = last_event_id
+            return self._query_url(
+                path="/eth/v1/events",
+                stream=True,
+                headers=headers,
+                params={"topics": topics},
+            )
+
+        return EventStream(
+            connect,
+            workers=workers,
+            queue_size=queue_size,
+            drop_when_full=drop_when_full,
+            max_lag=max_lag,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+            executor=executor,
+        )
+
     @staticmethod
     def parse_head(data):
         data = parse_json(json.loads(data), StreamedHead)
@@ -72,3 +154,13 @@ class EventEndpoints:
     def parse_checkpoint(data):
         data = parse_json(json.loads(data), StreamedCheckpoint)
         return data
+
+    @staticmethod
+    def parse_voluntary_exit(data):
+        data = parse_json(json.loads(data), SignedVoluntaryExit)
+        return data
+
+    @staticmethod
+    def parse_chain_reorg(data):
+        data = parse_json(json.loads(data), StreamedChainReorg)
+        return data
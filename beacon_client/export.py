@@ -0,0 +1,444 @@
+"""
+Export of a slot range into columnar files for analytics. Requires numpy, Parquet output requires pyarrow.
+Blocks are fetched in parallel as plain json and flattened without building dataclasses into one table each for
+blocks, attestations, deposits, voluntary exits, sync aggregates and execution payload headers.
+Rows are buffered per table and written out every row_group_size rows, so memory stays bounded however long the range.
+Parquet writes one file per table with one row group per batch, npy one file per column that grows with each batch.
+
+    python -m beacon_client.export http://localhost:5052 exports --start 4700000 --end 4710000
+"""
+import argparse
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Union
+import numpy as np
+from .api import BeaconChainAPI
+from .utils.types import Slot
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ("parquet", "npy")
+
+# numpy dtype of every column, hex fields are stored as fixed width void, not S,
+# which would drop trailing zero bytes on access, and uint256 fields as decimal
+# strings, 78 digits fit any uint256
+BLOCK_COLUMNS = {
+    "slot": "<u8",
+    "proposer_index": "<u8",
+    "parent_root": "V32",
+    "state_root": "V32",
+    "graffiti": "V32",
+    "eth1_deposit_root": "V32",
+    "eth1_deposit_count": "<u8",
+    "eth1_block_hash": "V32",
+    "proposer_slashings": "<u8",
+    "attester_slashings": "<u8",
+    "attestations": "<u8",
+    "deposits": "<u8",
+    "voluntary_exits": "<u8",
+}
+ATTESTATION_COLUMNS = {
+    "slot": "<u8",  # of the block that includes the attestation
+    "attestation_slot": "<u8",
+    "committee_index": "<u8",
+    "beacon_block_root": "V32",
+    "source_epoch": "<u8",
+    "source_root": "V32",
+    "target_epoch": "<u8",
+    "target_root": "V32",
+    "participants": "<u8",
+    # Bitlist of at most MAX_VALIDATORS_PER_COMMITTEE bits and its length bit
+    "aggregation_bits": "V257",
+}
+DEPOSIT_COLUMNS = {
+    "slot": "<u8",
+    "pubkey": "V48",
+    "withdrawal_credentials": "V32",
+    "amount": "<u8",
+}
+VOLUNTARY_EXIT_COLUMNS = {
+    "slot": "<u8",
+    "epoch": "<u8",
+    "validator_index": "<u8",
+}
+SYNC_AGGREGATE_COLUMNS = {
+    "slot": "<u8",
+    "participants": "<u8",
+    "sync_committee_bits": "V64",
+}
+EXECUTION_PAYLOAD_COLUMNS = {
+    "slot": "<u8",
+    "block_number": "<u8",
+    "block_hash": "V32",
+    "parent_hash": "V32",
+    "fee_recipient": "V20",
+    "state_root": "V32",
+    "receipts_root": "V32",
+    "prev_randao": "V32",
+    "gas_limit": "<u8",
+    "gas_used": "<u8",
+    "timestamp": "<u8",
+    "base_fee_per_gas": "<U78",
+    "extra_data": "V32",
+    # extra_data may end in zero bytes, so npy readers cut the padding at this length
+    "extra_data_length": "<u8",
+    "transactions": "<u8",
+}
+TABLES = {
+    "blocks": BLOCK_COLUMNS,
+    "attestations": ATTESTATION_COLUMNS,
+    "deposits": DEPOSIT_COLUMNS,
+    "voluntary_exits": VOLUNTARY_EXIT_COLUMNS,
+    "sync_aggregates": SYNC_AGGREGATE_COLUMNS,
+    "execution_payloads": EXECUTION_PAYLOAD_COLUMNS,
+}
+# hex fields of varying length, zero padded to the width of their dtype in npy files,
+# the last byte of a Bitlist holds its length bit and is never zero
+VARIABLE_WIDTH = {"aggregation_bits", "extra_data"}
+
+# npy header with room for any row count so it can be rewritten in place as the file grows
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_HEADER_SIZE = 128
+
+
+def _flatten(block: dict, batch: Dict[str, Dict[str, list]]):
+    # appends the raw json values, they are converted a whole column at a time when written
+    message = block["message"]
+    body = message["body"]
+    slot = message["slot"]
+    eth1_data = body["eth1_data"]
+    columns = batch["blocks"]
+    columns["slot"].append(slot)
+    columns["proposer_index"].append(message["proposer_index"])
+    columns["parent_root"].append(message["parent_root"])
+    columns["state_root"].append(message["state_root"])
+    columns["graffiti"].append(body["graffiti"])
+    columns["eth1_deposit_root"].append(eth1_data["deposit_root"])
+    columns["eth1_deposit_count"].append(eth1_data["deposit_count"])
+    columns["eth1_block_hash"].append(eth1_data["block_hash"])
+    columns["proposer_slashings"].append(len(body["proposer_slashings"]))
+    columns["attester_slashings"].append(len(body["attester_slashings"]))
+    columns["attestations"].append(len(body["attestations"]))
+    columns["deposits"].append(len(body["deposits"]))
+    columns["voluntary_exits"].append(len(body["voluntary_exits"]))
+
+    columns = batch["attestations"]
+    for attestation in body["attestations"]:
+        data = attestation["data"]
+        bits = attestation["aggregation_bits"]
+        columns["slot"].append(slot)
+        columns["attestation_slot"].append(data["slot"])
+        columns["committee_index"].append(data["index"])
+        columns["beacon_block_root"].append(data["beacon_block_root"])
+        columns["source_epoch"].append(data["source"]["epoch"])
+        columns["source_root"].append(data["source"]["root"])
+        columns["target_epoch"].append(data["target"]["epoch"])
+        columns["target_root"].append(data["target"]["root"])
+        # less the length bit of the Bitlist
+        columns["participants"].append(int(bits, 16).bit_count() - 1)
+        columns["aggregation_bits"].append(bits)
+
+    columns = batch["deposits"]
+    for deposit in body["deposits"]:
+        data = deposit["data"]
+        columns["slot"].append(slot)
+        columns["pubkey"].append(data["pubkey"])
+        columns["withdrawal_credentials"].append(data["withdrawal_credentials"])
+        columns["amount"].append(data["amount"])
+
+    columns = batch["voluntary_exits"]
+    for voluntary_exit in body["voluntary_exits"]:
+        columns["slot"].append(slot)
+        columns["epoch"].append(voluntary_exit["message"]["epoch"])
+        columns["validator_index"].append(voluntary_exit["message"]["validator_index"])
+
+    # both are absent before altair and bellatrix
+    sync_aggregate = body.get("sync_aggregate")
+    if sync_aggregate is not None:
+        bits = sync_aggregate["sync_committee_bits"]
+        columns = batch["sync_aggregates"]
+        columns["slot"].append(slot)
+        columns["participants"].append(int(bits, 16).bit_count())
+        columns["sync_committee_bits"].append(bits)
+    payload = body.get("execution_payload")
+    if payload is not None:
+        columns = batch["execution_payloads"]
+        columns["slot"].append(slot)
+        for name in ("block_number", "block_hash", "parent_hash", "fee_recipient"):
+            columns[name].append(payload[name])
+        for name in ("state_root", "receipts_root", "prev_randao", "gas_limit"):
+            columns[name].append(payload[name])
+        for name in ("gas_used", "timestamp", "base_fee_per_gas", "extra_data"):
+            columns[name].append(payload[name])
+        columns["extra_data_length"].append(len(payload["extra_data"]) // 2 - 1)
+        columns["transactions"].append(len(payload["transactions"]))
+
+
+def _to_array(name: str, values: list, dtype: str) -> np.ndarray:
+    # json values of one column as a numpy array of its dtype
+    dtype = np.dtype(dtype)
+    if dtype.kind == "U":
+        # parsed and printed again so a malformed value fails here and not in the reader
+        return np.array([str(int(value)) for value in values], dtype=dtype)
+    if dtype.kind != "V":
+        return np.fromiter(map(int, values), dtype=dtype, count=len(values))
+    if name in VARIABLE_WIDTH:
+        return np.array([bytes.fromhex(value[2:]) for value in values], dtype=dtype)
+    # one hex decode for the whole column instead of one per row
+    raw = bytes.fromhex("".join(value[2:] for value in values))
+    return np.frombuffer(raw, dtype=dtype).copy()
+
+
+class _NpyColumn:
+    __slots__ = ("dtype", "rows", "file")
+
+    def __init__(self, path: Path, dtype: str):
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.rows,),
+        }
+        text = repr(header).ljust(_NPY_HEADER_SIZE - len(_NPY_MAGIC) - 3) + "\n"
+        self.file.seek(0)
+        self.file.write(_NPY_MAGIC + struct.pack("<H", len(text)) + text.encode())
+        self.file.seek(0, 2)
+
+    def write(self, array: np.ndarray):
+        self.file.write(array.tobytes())
+        self.rows += len(array)
+        # kept up to date so the file can be loaded while the export runs
+        self._write_header()
+
+    def close(self):
+        self.file.close()
+
+
+class _NpyWriter:
+    # one <table>/<column>.npy file per column
+    def __init__(self, directory: Path, table: str, columns: Dict[str, str]):
+        path = directory / table
+        path.mkdir(parents=True, exist_ok=True)
+        self.columns = columns
+        self.files = {
+            name: _NpyColumn(path / f"{name}.npy", dtype)
+            for name, dtype in columns.items()
+        }
+
+    def write(self, values: Dict[str, list]):
+        for name, dtype in self.columns.items():
+            self.files[name].write(_to_array(name, values[name], dtype))
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+def _arrow_type(name: str, dtype: str):
+    dtype = np.dtype(dtype)
+    if dtype.kind == "U":
+        return pyarrow.string()
+    if dtype.kind != "V":
+        return pyarrow.from_numpy_dtype(dtype)
+    if name in VARIABLE_WIDTH:
+        return pyarrow.binary()
+    return pyarrow.binary(dtype.itemsize)
+
+
+class _ParquetWriter:
+    # one <table>.parquet file with a row group per write
+    def __init__(self, directory: Path, table: str, columns: Dict[str, str]):
+        self.columns = columns
+        self.schema = pyarrow.schema(
+            [(name, _arrow_type(name, dtype)) for name, dtype in columns.items()]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(
+            directory / f"{table}.parquet", self.schema
+        )
+
+    def _column(self, name: str, values: list, dtype: str):
+        kind = self.schema.field(name).type
+        if name in VARIABLE_WIDTH:
+            return pyarrow.array(
+                [bytes.fromhex(value[2:]) for value in values], type=kind
+            )
+        array = _to_array(name, values, dtype)
+        if array.dtype.kind != "V":
+            return pyarrow.array(array, type=kind)
+        buffer = pyarrow.py_buffer(array.tobytes())
+        return pyarrow.FixedSizeBinaryArray.from_buffers(
+            kind, len(array), [None, buffer]
+        )
+
+    def write(self, values: Dict[str, list]):
+        arrays = [
+            self._column(name, values[name], dtype)
+            for name, dtype in self.columns.items()
+        ]
+        table = pyarrow.Table.from_arrays(arrays, schema=self.schema)
+        self.writer.write_table(table, row_group_size=len(table))
+
+    def close(self):
+        self.writer.close()
+
+
+@dataclass(slots=True)
+class ExportStats:
+    """
+    Progress of export_slots
+    """
+
+    start_slot: Slot
+    end_slot: Slot
+    # slots scanned so far, skipped slots included
+    slots: int = 0
+    blocks: int = 0
+    # rows written per table
+    rows: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TABLES, 0))
+    started: float = field(default_factory=time.perf_counter)
+    finished: Union[float, None] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = time.perf_counter() if self.finished is None else self.finished
+        return end - self.started
+
+    @property
+    def slots_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.slots / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        total = self.end_slot - self.start_slot
+        return (
+            f"{self.slots}/{total} slots  {self.blocks} blocks  "
+            f"{self.rows['attestations']} attestations  "
+            f"{self.slots_per_second:,.1f} slots/s"
+        )
+
+
+def export_slots(
+    client: BeaconChainAPI,
+    start_slot: Slot,
+    end_slot: Slot,
+    directory: Union[str, Path],
+    file_format: Union[str, None] = None,
+    row_group_size: int = 65536,
+    concurrency: int = 8,
+    progress: Union[Callable[[ExportStats], None], None] = None,
+    progress_interval: float = 1.0,
+) -> ExportStats:
+    """
+    Write every block from start_slot up to but excluding end_slot to the tables in TABLES.
+    Memory holds at most 2 * concurrency blocks and row_group_size rows per table
+    Args:
+        client: Client the blocks are fetched with, raise its pool_maxsize to at least concurrency
+        start_slot: First slot to export
+        end_slot: Slot to stop before
+        directory: Directory the files are written to, created if missing
+        file_format: Element of FORMATS, parquet when pyarrow is installed and npy otherwise by default
+        row_group_size: Rows of a table buffered before they are written as one row group or npy chunk
+        concurrency: Number of block requests in flight at once
+        progress: Called with the stats every progress_interval seconds and once at the end
+        progress_interval: Seconds between progress calls
+    """
+    if file_format is None:
+        file_format = "npy" if pyarrow is None else "parquet"
+    assert file_format in FORMATS, f"file_format must be in {FORMATS}"
+    assert file_format != "parquet" or pyarrow is not None, "parquet requires pyarrow"
+    assert row_group_size > 0, "row_group_size must be positive"
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = _ParquetWriter if file_format == "parquet" else _NpyWriter
+    writers = {
+        table: writer(directory, table, columns) for table, columns in TABLES.items()
+    }
+    batch = {table: {name: [] for name in columns} for table, columns in TABLES.items()}
+    stats = ExportStats(start_slot, end_slot)
+
+    def flush(table: str, rows: int):
+        columns = batch[table]
+        writers[table].write({name: values[:rows] for name, values in columns.items()})
+        for values in columns.values():
+            del values[:rows]
+        stats.rows[table] += rows
+
+    reported = stats.started
+    blocks = client.get_blocks_in_range(
+        start_slot, end_slot, concurrency=concurrency, decode=False
+    )
+    try:
+        for block in blocks:
+            _flatten(block, batch)
+            stats.blocks += 1
+            stats.slots = int(block["message"]["slot"]) + 1 - start_slot
+            for table, columns in batch.items():
+                while len(columns["slot"]) >= row_group_size:
+                    flush(table, row_group_size)
+            now = time.perf_counter()
+            if progress is not None and now - reported >= progress_interval:
+                reported = now
+                progress(stats)
+        for table, columns in batch.items():
+            if columns["slot"]:
+                flush(table, len(columns["slot"]))
+        stats.slots = end_slot - start_slot
+    finally:
+        blocks.close()
+        for table_writer in writers.values():
+            table_writer.close()
+    stats.finished = time.perf_counter()
+    if progress is not None:
+        progress(stats)
+    return stats
+
+
+def load_npy(directory: Union[str, Path], table: str) -> Dict[str, np.ndarray]:
+    """
+    Memory map the columns of a table exported with file_format="npy".
+    Fixed width byte columns are numpy void, bytes(column[i]) gives the value
+    """
+    path = Path(directory) / table
+    return {
+        name: np.load(path / f"{name}.npy", mmap_mode="r") for name in TABLES[table]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m beacon_client.export")
+    parser.add_argument("url", help="base url of the beacon node")
+    parser.add_argument("directory", help="directory the tables are written to")
+    parser.add_argument("--start", type=int, required=True, help="first slot")
+    parser.add_argument("--end", type=int, required=True, help="slot to stop before")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--row-group-size", type=int, default=65536)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with BeaconChainAPI(args.url, pool_maxsize=args.concurrency) as client:
+        stats = export_slots(
+            client,
+            args.start,
+            args.end,
+            args.directory,
+            file_format=args.format,
+            row_group_size=args.row_group_size,
+            concurrency=args.concurrency,
+            progress=print,
+        )
+    print(f"done in {stats.elapsed:.1f}s, rows {stats.rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import requests
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import List, Union
+from .api import BeaconChainAPI
+from .utils.errors import BeaconNodeError
+from .utils.types import HealthStatus, SECONDS_PER_SLOT
+
+# /eth/v1/node/health answers with the status code only
+_HEALTH_CODES = {
+    200: HealthStatus.Ready,
+    206: HealthStatus.Syncing,
+    503: HealthStatus.NotInitialized,
+}
+
+# latency samples a node needs before its p95 is trusted to decide when to hedge
+_MIN_SAMPLES = 20
+
+# status below this is the node's answer to the request and not a fault of the node
+_SERVER_ERROR = 500
+
+
+class NodeState:
+    """
+    Health and observed latency of one node of a PooledBeaconChainAPI
+    """
+
+    def __init__(self, url: str, client: BeaconChainAPI, window: int):
+        self.url = url
+        self.client = client
+        self.status = HealthStatus.Unknown
+        self.head_slot = None
+        self.sync_distance = None
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        return self.status == HealthStatus.Ready
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.requests += 1
+            self._samples.append(seconds)
+            # exponentially weighted so routing follows a node that slows down
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency = 0.8 * self.latency + 0.2 * seconds
+
+    def fail(self):
+        # taken out of rotation until the next health check finds it ready again
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.status = HealthStatus.Unknown
+
+    def p95(self) -> Union[float, None]:
+        """
+        95th percentile of the recent request latencies, None until enough requests were made
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def __repr__(self) -> str:
+        return (
+            f"NodeState({self.url!r}, status={self.status!r}, latency={self.latency})"
+        )
+
+
+class PooledBeaconChainAPI(BeaconChainAPI):
+    def __init__(
+        self,
+        base_urls: List[str],
+        health_interval: float = SECONDS_PER_SLOT / 2,
+        health_timeout: float = 2.0,
+        max_sync_distance: int = 2,
+        hedge: bool = False,
+        hedge_after: float = 1.0,
+        latency_window: int = 200,
+        max_workers: int = 32,
+        **kwargs,
+    ):
+        """
+        Client for several beacon nodes serving the same chain.
+        Nodes are health checked in a background thread and every request goes to the healthy node
+        with the lowest latency, falling over to the next node on connection errors and 5xx responses.
+        Accepts every keyword argument of BeaconChainAPI.
+        Args:
+            base_urls: URLs of the beacon nodes e.g. [http://localhost:5052, http://localhost:5053]
+            health_interval: Seconds between health checks of every node
+            health_timeout: Seconds a health check may take before the node is considered unknown
+            max_sync_distance: Nodes further than this many slots behind their peers are treated as syncing
+            hedge: If true send a duplicate request to the second best node when the first has not answered
+                within its p95 latency, the first response wins
+            hedge_after: Seconds to wait before hedging while a node has too few requests for a p95
+            latency_window: Number of recent requests per node the p95 latency is computed over
+            max_workers: Threads available for health checks and hedged requests
+        """
+        assert len(base_urls) > 0, "at least one node url is required"
+        super().__init__(base_urls[0], **kwargs)
+        self.health_interval = health_interval
+        self.max_sync_distance = max_sync_distance
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.nodes = []
+        for url in base_urls:
+            # the per node clients only run health checks, they share this client's connections
+            client = BeaconChainAPI(
+                url,
+                connect_timeout=health_timeout,
+                read_timeout=health_timeout,
+                coalesce=False,
+            )
+            client.session.close()
+            client.session = self.session
+            self.nodes.append(NodeState(url, client, latency_window))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._stop = threading.Event()
+        self.check_health()
+        self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self._health_thread.start()
+
+    def close(self):
+        """
+        Stop the health checks and close all pooled connections
+        """
+        self._stop.set()
+        self._health_thread.join()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for node in self.nodes:
+            node.client.close()
+        super().close()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self):
+        """
+        Check every node now instead of waiting for the next background check
+        """
+        list(self._executor.map(self._check_node, self.nodes))
+
+    def _check_node(self, node: NodeState):
+        try:
+            start = time.monotonic()
+            response = node.client.session.get(
+                urllib.parse.urljoin(node.url, "/eth/v1/node/health"),
+                timeout=node.client.timeout,
+            )
+            elapsed = time.monotonic() - start
+            status = _HEALTH_CODES.get(response.status_code, HealthStatus.Unknown)
+            if status == HealthStatus.Ready:
+                syncing = node.client.get_syncing_status()
+                node.head_slot = syncing.head_slot
+                node.sync_distance = syncing.sync_distance
+                if syncing.is_syncing or syncing.sync_distance > self.max_sync_distance:
+                    status = HealthStatus.Syncing
+        except (requests.RequestException, BeaconNodeError, ValueError, KeyError):
+            status = HealthStatus.Unknown
+        else:
+            node.record(elapsed)
+        node.status = status
+
+    def ranked_nodes(self) -> List[NodeState]:
+        """
+        Nodes in the order requests try them: healthy nodes by latency, then the rest by latency
+        """
+
+        def rank(node):
+            latency = float("inf") if node.latency is None else node.latency
+            return (not node.healthy, latency)
+
+        return sorted(self.nodes, key=rank)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        nodes = self.ranked_nodes()
+        if self.hedge and not kwargs.get("stream") and len(nodes) > 1:
+            return self._hedged_request(nodes, method, path, kwargs)
+        return self._failover_request(nodes, method, path, kwargs)
+
+    def _node_request(
+        self, node: NodeState, method: str, path: str, kwargs: dict
+    ) -> requests.Response:
+        url = urllib.parse.urljoin(node.url, path)
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            node.fail()
+            raise
+        if response.status_code >= _SERVER_ERROR:
+            node.fail()
+        else:
+            node.record(time.monotonic() - start)
+        if response.status_code != 200:
+            raise BeaconNodeError(response.status_code, response.text)
+        return response
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, BeaconNodeError):
+            return error.status_code >= _SERVER_ERROR
+        return isinstance(error, requests.RequestException)
+
+    def _failover_request(
+        self, nodes: List[NodeState], method: str, path: str, kwargs: dict
+    ) -> requests.Response:
+        for position, node in enumerate(nodes):
+            try:
+                return self._node_request(node, method, path, kwargs)
+            except Exception as error:
+                if position == len(nodes) - 1 or not self._retryable(error):
+                    raise
+
+    def _hedged_request(
+        self, nodes: List[NodeState], method: str, path: str, kwargs: dict
+    ) -> requests.Response:
+        primary, secondary = nodes[0], nodes[1]
+        delay = primary.p95()
+        # each attempt runs in a copy of the caller's context so its timings reach the caller's record
+        futures = {
+            self._executor.submit(
+                copy_context().run, self._node_request, primary, method, path, kwargs
+            )
+        }
+        done, _ = wait(futures, timeout=self.hedge_after if delay is None else delay)
+        if not done:
+            self.hedged += 1
+            hedge = self._executor.submit(
+                copy_context().run, self._node_request, secondary, method, path, kwargs
+            )
+            futures.add(hedge)
+        tried = len(futures)
+        error = None
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as failure:
+                    if not self._retryable(failure):
+                        raise
+                    error = failure
+                    continue
+                if tried == 2 and future is hedge:
+                    self.hedge_wins += 1
+                return response
+        if tried < len(nodes):
+            return self._failover_request(nodes[tried:], method, path, kwargs)
+        raise error
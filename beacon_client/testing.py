@@ -0,0 +1,597 @@
+"""
+Local stand-ins for a beacon node used by the tests, the benchmarks and load tests.
+StandInNode serves canned response bodies keyed by path over HTTP/1.1 so that connections can be kept alive.
+RecordingNode proxies a real node and records its responses and events, ReplayNode serves a Recording
+at high rate with injected latency, jitter, errors and bandwidth caps, and replays the event stream
+at its recorded pace or faster.
+
+    python -m beacon_client.testing record http://localhost:5052 recording.json --port 5053
+    python -m beacon_client.testing replay recording.json --port 5053 --speed 10 --jitter 0.01
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+import requests
+
+EVENTS_PATH = "/eth/v1/events"
+
+# encodings a recorded body, which is stored decoded, can be compressed with again when it is replayed
+_ENCODERS = {"gzip": gzip.compress, "deflate": zlib.compress}
+
+
+class _LocalNode:
+    """
+    HTTP server on a background thread that passes every request to _respond
+    """
+
+    def __init__(self, port: int = 0):
+        self.connections = 0
+        self.requests = 0
+        self.request_headers = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _respond(self, handler: BaseHTTPRequestHandler, method: str, body: bytes):
+        raise NotImplementedError
+
+    def _handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                node.connections += 1
+
+            def dispatch(self, method: str, body: bytes):
+                node.requests += 1
+                node.request_headers.append(dict(self.headers))
+                try:
+                    node._respond(self, method, body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client went away mid response
+                    self.close_connection = True
+
+            def do_GET(self):
+                self.dispatch("GET", b"")
+
+            def do_POST(self):
+                # the body is read so the connection can be reused
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.dispatch("POST", body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        """
+        Serve on the calling thread until interrupted
+        """
+        try:
+            self._server.serve_forever(0.05)
+        finally:
+            self._server.server_close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _send_headers(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    content_type: str,
+    length: int,
+    encoding: Union[str, None] = None,
+    headers: Dict[str, str] = {},
+):
+    handler.send_response(status)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(length))
+    if encoding is not None:
+        handler.send_header("Content-Encoding", encoding)
+    for name, value in headers.items():
+        handler.send_header(name, value)
+    handler.end_headers()
+
+
+class StandInNode(_LocalNode):
+    def __init__(
+        self,
+        routes: Dict[str, Union[bytes, Tuple[int, bytes]]],
+        latency: float = 0.0,
+        content_type: str = "application/json",
+        compress: bool = False,
+        headers: Dict[str, str] = {},
+    ):
+        """
+        Args:
+            routes: Mapping of path to response body, or to (status code, body). POST routes share the GET responses
+            latency: Seconds to sleep before answering each request, can be changed while serving
+            content_type: Content-Type header sent with every response
+            compress: Gzip the body when the request accepts gzip, each body is compressed once
+            headers: Further headers sent with every response, e.g. Eth-Consensus-Version
+        """
+        super().__init__()
+        self.routes = routes
+        self.latency = latency
+        self.content_type = content_type
+        self.compress = compress
+        self.headers = headers
+        self._gzipped = {}
+
+    def _respond(self, handler: BaseHTTPRequestHandler, method: str, body: bytes):
+        if self.latency:
+            time.sleep(self.latency)
+        route = self.routes.get(urlsplit(handler.path).path)
+        if route is None:
+            status, body = 404, b'{"code":404,"message":"Not found"}'
+        elif isinstance(route, tuple):
+            status, body = route
+        else:
+            status, body = 200, route
+        encoding = None
+        if self.compress and "gzip" in handler.headers.get("Accept-Encoding", ""):
+            encoding = "gzip"
+            if body not in self._gzipped:
+                self._gzipped[body] = gzip.compress(body)
+            body = self._gzipped[body]
+        _send_headers(
+            handler, status, self.content_type, len(body), encoding, self.headers
+        )
+        handler.wfile.write(body)
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedResponse:
+    status: int
+    content_type: str
+    body: bytes  # decoded, the Content-Encoding it was sent with is kept in headers
+    # Content-Encoding and the Eth-* headers such as Eth-Consensus-Version
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _recorded_headers(headers) -> Dict[str, str]:
+    # names are normalised so replaying can look Content-Encoding up in a plain dict
+    return {
+        name.title(): value
+        for name, value in headers.items()
+        if name.lower() == "content-encoding" or name.lower().startswith("eth-")
+    }
+
+
+def _encoded(
+    handler: BaseHTTPRequestHandler, response: RecordedResponse
+) -> Tuple[bytes, Union[str, None], Dict[str, str]]:
+    # the body, encoding and headers to send for a recorded response,
+    # compressed again as it was recorded when the client accepts that encoding
+    headers = dict(response.headers)
+    encoding = headers.pop("Content-Encoding", None)
+    if encoding in _ENCODERS and encoding in handler.headers.get("Accept-Encoding", ""):
+        return _ENCODERS[encoding](response.body), encoding, headers
+    return response.body, None, headers
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedEvent:
+    offset: float  # seconds since the first recorded event
+    event: str
+    data: str
+    id: Union[str, None] = None
+
+
+class Recording:
+    """
+    Responses keyed by method, path with query and request body, and the events of the event stream in arrival order
+    """
+
+    def __init__(self):
+        self.events: List[RecordedEvent] = []
+        self._responses = {}
+        # fallbacks for requests that were not recorded exactly, latest response wins
+        self._by_target = {}
+        self._by_path = {}
+        self._origin = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def add_response(
+        self, method: str, target: str, request_body: bytes, response: RecordedResponse
+    ):
+        with self._lock:
+            self._responses[method, target, request_body] = response
+            self._by_target[method, target] = response
+            self._by_path[method, urlsplit(target).path] = response
+
+    def add_event(
+        self,
+        event: str,
+        data: str,
+        id: Union[str, None] = None,
+        received: Union[float, None] = None,
+    ):
+        """
+        Args:
+            event: Event type
+            data: Event data, lines joined by newlines
+            id: Event id if the node sent one
+            received: time.monotonic() when the event arrived, defaults to now
+        """
+        received = time.monotonic() if received is None else received
+        with self._lock:
+            if self._origin is None:
+                self._origin = received
+            self.events.append(RecordedEvent(received - self._origin, event, data, id))
+
+    def lookup(
+        self, method: str, target: str, request_body: bytes = b""
+    ) -> Union[RecordedResponse, None]:
+        """
+        The response recorded for a request, falling back to the same path with another body or query
+        """
+        response = self._responses.get((method, target, request_body))
+        if response is None:
+            response = self._by_target.get((method, target))
+        if response is None:
+            response = self._by_path.get((method, urlsplit(target).path))
+        return response
+
+    def save(self, path: str):
+        responses = []
+        for (method, target, request_body), response in self._responses.items():
+            entry = {
+                "method": method,
+                "target": target,
+                "request_body": request_body.decode(),
+                "status": response.status,
+                "content_type": response.content_type,
+                "headers": response.headers,
+            }
+            try:
+                entry["body"] = response.body.decode()
+            except UnicodeDecodeError:
+                entry["body_base64"] = base64.b64encode(response.body).decode()
+            responses.append(entry)
+        events = [
+            {"offset": e.offset, "event": e.event, "data": e.data, "id": e.id}
+            for e in self.events
+        ]
+        with open(path, "w") as f:
+            json.dump({"responses": responses, "events": events}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path) as f:
+            saved = json.load(f)
+        recording = cls()
+        for entry in saved["responses"]:
+            if "body" in entry:
+                body = entry["body"].encode()
+            else:
+                body = base64.b64decode(entry["body_base64"])
+            recording.add_response(
+                entry["method"],
+                entry["target"],
+                entry["request_body"].encode(),
+                RecordedResponse(
+                    entry["status"],
+                    entry["content_type"],
+                    body,
+                    # recordings saved before headers were kept have none
+                    entry.get("headers", {}),
+                ),
+            )
+        recording.events = [RecordedEvent(**event) for event in saved["events"]]
+        return recording
+
+
+def _topics(target: str) -> set:
+    # requests repeats the parameter for a list, some clients send one comma separated value
+    values = parse_qs(urlsplit(target).query).get("topics", [])
+    return {topic for value in values for topic in value.split(",") if topic}
+
+
+def _sse(event: RecordedEvent, id: str) -> bytes:
+    data = "".join(f"data: {line}\n" for line in event.data.split("\n"))
+    return f"event: {event.event}\nid: {id}\n{data}\n".encode()
+
+
+def _start_stream(handler: BaseHTTPRequestHandler):
+    # the stream has no length so it ends by closing the connection
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/event-stream")
+    handler.send_header("Cache-Control", "no-cache")
+    handler.send_header("Connection", "close")
+    handler.end_headers()
+    handler.close_connection = True
+
+
+class RecordingNode(_LocalNode):
+    """
+    Proxy in front of a beacon node that records every response and the events streamed through it.
+    Point a client at url, exercise the endpoints and save the recording for ReplayNode.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        recording: Union[Recording, None] = None,
+        port: int = 0,
+        timeout: float = 60.0,
+    ):
+        """
+        Args:
+            upstream: Base url of the beacon node to proxy
+            recording: Recording to add to, a new one by default
+            port: Port to listen on, any free port by default
+            timeout: Seconds to wait for the upstream node
+        """
+        super().__init__(port)
+        self.upstream = upstream.rstrip("/")
+        self.recording = Recording() if recording is None else recording
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # one session per serving thread, requests.Session is not thread safe
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _respond(self, handler: BaseHTTPRequestHandler, method: str, body: bytes):
+        headers = {
+            name: handler.headers[name]
+            for name in ("Accept", "Content-Type", "Last-Event-ID")
+            if name in handler.headers
+        }
+        streaming = urlsplit(handler.path).path == EVENTS_PATH
+        upstream = self._session().request(
+            method,
+            self.upstream + handler.path,
+            data=body or None,
+            headers=headers,
+            stream=streaming,
+            timeout=self.timeout,
+        )
+        if streaming and upstream.ok:
+            self._relay_events(handler, upstream)
+            return
+        response = RecordedResponse(
+            upstream.status_code,
+            upstream.headers.get("Content-Type", "application/json"),
+            upstream.content,
+            _recorded_headers(upstream.headers),
+        )
+        self.recording.add_response(method, handler.path, body, response)
+        content, encoding, headers = _encoded(handler, response)
+        _send_headers(
+            handler,
+            response.status,
+            response.content_type,
+            len(content),
+            encoding,
+            headers,
+        )
+        handler.wfile.write(content)
+
+    def _relay_events(
+        self, handler: BaseHTTPRequestHandler, upstream: requests.Response
+    ):
+        _start_stream(handler)
+        upstream.raw.decode_content = True
+        event, data, event_id = "message", [], None
+        try:
+            for line in iter(upstream.raw.readline, b""):
+                handler.wfile.write(line)
+                line = line.rstrip(b"\r\n").decode()
+                if not line:
+                    if data:
+                        self.recording.add_event(event, "\n".join(data), event_id)
+                    event, data, event_id = "message", [], None
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+                elif field == "id":
+                    event_id = value
+        finally:
+            upstream.close()
+
+
+class ReplayNode(_LocalNode):
+    """
+    Serves a Recording. Every fault setting can be changed while serving.
+    Events are sent with their recorded spacing divided by speed, starting after the Last-Event-ID
+    of a reconnecting client, and the connection is closed after the last event.
+    Recorded events without an id are numbered by their position so resuming works for them too.
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        bandwidth: Union[int, None] = None,
+        speed: float = 1.0,
+        seed: Union[int, None] = None,
+    ):
+        """
+        Args:
+            recording: Responses and events to serve
+            port: Port to listen on, any free port by default
+            latency: Seconds to sleep before answering each request
+            jitter: Upper bound of a uniformly random number of seconds added to latency
+            error_rate: Fraction of requests answered with error_status instead of the recording
+            error_status: Status code of the injected errors
+            bandwidth: Bytes per second each response is written at, unlimited if None
+            speed: Replay speed of the event stream, 1 is the recorded pace and float("inf") sends without pauses
+            seed: Seed of the random jitter and errors
+        """
+        assert speed > 0, "speed must be positive"
+        super().__init__(port)
+        self.recording = recording
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.bandwidth = bandwidth
+        self.speed = speed
+        self.errors = 0
+        self.events_sent = 0
+        self._random = random.Random(seed)
+
+    def _write(self, handler: BaseHTTPRequestHandler, data: bytes):
+        bandwidth = self.bandwidth
+        if not bandwidth:
+            handler.wfile.write(data)
+            return
+        # pieces of about 50ms keep the rate smooth without a syscall per byte
+        size = max(1, min(64 * 1024, bandwidth // 20))
+        for start in range(0, len(data), size):
+            end = start + size
+            piece = data[start:end]
+            handler.wfile.write(piece)
+            time.sleep(len(piece) / bandwidth)
+
+    def _respond(self, handler: BaseHTTPRequestHandler, method: str, body: bytes):
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            message = json.dumps(
+                {"code": self.error_status, "message": "Injected error"}
+            ).encode()
+            _send_headers(handler, self.error_status, "application/json", len(message))
+            self._write(handler, message)
+            return
+        if urlsplit(handler.path).path == EVENTS_PATH:
+            self._replay_events(handler)
+            return
+        response = self.recording.lookup(method, handler.path, body)
+        if response is None:
+            response = RecordedResponse(
+                404, "application/json", b'{"code":404,"message":"Not recorded"}'
+            )
+        content, encoding, headers = _encoded(handler, response)
+        _send_headers(
+            handler,
+            response.status,
+            response.content_type,
+            len(content),
+            encoding,
+            headers,
+        )
+        self._write(handler, content)
+
+    def _replay_events(self, handler: BaseHTTPRequestHandler):
+        topics = _topics(handler.path)
+        events = [
+            (event.id if event.id is not None else str(position), event)
+            for position, event in enumerate(self.recording.events)
+            if not topics or event.event in topics
+        ]
+        last_event_id = handler.headers.get("Last-Event-ID")
+        ids = [event_id for event_id, _ in events]
+        if last_event_id in ids:
+            resume = ids.index(last_event_id) + 1
+            events = events[resume:]
+        _start_stream(handler)
+        if not events:
+            return
+        start = time.monotonic()
+        first = events[0][1].offset
+        for event_id, event in events:
+            due = start + (event.offset - first) / self.speed
+            pause = due - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            self._write(handler, _sse(event, event_id))
+            self.events_sent += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m beacon_client.testing")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="proxy a node and record it")
+    record.add_argument("upstream", help="base url of the beacon node")
+    record.add_argument("output", help="file the recording is saved to on exit")
+    record.add_argument("--port", type=int, default=5053)
+    replay = commands.add_parser("replay", help="serve a recording")
+    replay.add_argument("recording")
+    replay.add_argument("--port", type=int, default=5053)
+    replay.add_argument("--latency", type=float, default=0.0)
+    replay.add_argument("--jitter", type=float, default=0.0)
+    replay.add_argument("--error-rate", type=float, default=0.0)
+    replay.add_argument("--error-status", type=int, default=503)
+    replay.add_argument("--bandwidth", type=int, help="bytes per second")
+    replay.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        node = RecordingNode(args.upstream, port=args.port)
+        print(f"recording {args.upstream} at {node.url}, ctrl-c saves and exits")
+        try:
+            node.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        node.recording.save(args.output)
+        recording = node.recording
+        print(f"saved {len(recording)} responses, {len(recording.events)} events")
+    else:
+        node = ReplayNode(
+            Recording.load(args.recording),
+            port=args.port,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            bandwidth=args.bandwidth,
+            speed=args.speed,
+        )
+        print(f"replaying {args.recording} at {node.url}")
+        try:
+            node.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
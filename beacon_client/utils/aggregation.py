@@ -0,0 +1,170 @@
+"""
+Aggregation of the attestation event stream into one record per committee per slot.
+Events are grouped on their raw AttestationData and their aggregation bits are combined as python integers,
+so each OR, AND and popcount runs over whole machine words instead of one bit at a time.
+"""
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Union
+from .bitfields import Bitlist
+from .parsing import get_decoder
+from .types import AttestationData, CommitteeIndex, Slot
+
+
+@dataclass(slots=True)
+class CommitteeAggregate:
+    slot: Slot
+    index: CommitteeIndex
+    committee_size: int
+    aggregation_bits: Bitlist  # union of every vote of the committee
+    participants: int
+    votes: Dict[AttestationData, int]  # participants per distinct AttestationData
+    unique: int  # attestations that added at least one participant
+    redundant: int  # attestations whose participants were all seen before
+
+
+@dataclass(slots=True)
+class SlotAttestations:
+    slot: Slot
+    committees: List[CommitteeAggregate]
+    unique: int
+    redundant: int
+
+
+class _Vote:
+    __slots__ = ("data", "bits", "unique", "redundant")
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.bits = 0
+        self.unique = 0
+        self.redundant = 0
+
+
+def _bitlist_int(value: str) -> int:
+    # bit i of an SSZ bitfield is bit i % 8 of byte i // 8, which is bit i of the little endian integer
+    return int.from_bytes(bytes.fromhex(value[2:]), "little")
+
+
+def _bitlist(bits: int) -> Bitlist:
+    # strip the length bit, which is the highest set bit
+    length = bits.bit_length() - 1
+    return Bitlist(bits ^ 1 << length, length)
+
+
+class AttestationAggregator:
+    """
+    Collects attestation events per slot. A slot is emitted as a SlotAttestations once an attestation
+    more than slot_lag slots newer arrives, attestations for a slot that was already emitted are counted in `late`.
+    """
+
+    def __init__(self, slot_lag: int = 1):
+        """
+        Args:
+            slot_lag: Number of slots an attestation may arrive after its own slot and still be aggregated
+        """
+        assert slot_lag >= 0, "slot_lag can not be negative"
+        self.slot_lag = slot_lag
+        self.late = 0
+        self._slots = {}
+        self._emitted = -1
+        self._decode_data = get_decoder(AttestationData)
+
+    def add(self, attestation: Union[str, bytes, dict]) -> List[SlotAttestations]:
+        """
+        Add one attestation, given as the event data or its parsed json, and return the slots it completed
+        """
+        if not isinstance(attestation, dict):
+            attestation = json.loads(attestation)
+        data = attestation["data"]
+        slot = int(data["slot"])
+        if slot <= self._emitted:
+            self.late += 1
+            return []
+        source = data["source"]
+        target = data["target"]
+        key = (
+            data["index"],
+            data["beacon_block_root"],
+            source["epoch"],
+            source["root"],
+            target["epoch"],
+            target["root"],
+        )
+        votes = self._slots.setdefault(slot, {})
+        vote = votes.get(key)
+        if vote is None:
+            vote = votes[key] = _Vote(data)
+        bits = _bitlist_int(attestation["aggregation_bits"])
+        if bits & ~vote.bits:
+            vote.unique += 1
+            vote.bits |= bits
+        else:
+            vote.redundant += 1
+        if slot - self.slot_lag - 1 > self._emitted:
+            return self._emit(slot - self.slot_lag - 1)
+        return []
+
+    def flush(self) -> List[SlotAttestations]:
+        """
+        Emit every slot still being collected
+        """
+        if not self._slots:
+            return []
+        return self._emit(max(self._slots))
+
+    def _emit(self, last_slot: int) -> List[SlotAttestations]:
+        self._emitted = last_slot
+        completed = []
+        for slot in sorted(s for s in self._slots if s <= last_slot):
+            completed.append(self._summarize(slot, self._slots.pop(slot)))
+        return completed
+
+    def _summarize(self, slot: int, votes: Dict[tuple, _Vote]) -> SlotAttestations:
+        committees = {}
+        for vote in votes.values():
+            committees.setdefault(int(vote.data["index"]), []).append(vote)
+        aggregates = []
+        for index in sorted(committees):
+            committee = committees[index]
+            bits = 0
+            for vote in committee:
+                bits |= vote.bits
+            # the highest set bit of a Bitlist marks its length and is not a participant
+            aggregates.append(
+                CommitteeAggregate(
+                    slot=Slot(slot),
+                    index=CommitteeIndex(index),
+                    committee_size=bits.bit_length() - 1,
+                    aggregation_bits=_bitlist(bits),
+                    participants=bits.bit_count() - 1,
+                    votes={
+                        self._decode_data(vote.data): vote.bits.bit_count() - 1
+                        for vote in committee
+                    },
+                    unique=sum(vote.unique for vote in committee),
+                    redundant=sum(vote.redundant for vote in committee),
+                )
+            )
+        return SlotAttestations(
+            slot=Slot(slot),
+            committees=aggregates,
+            unique=sum(aggregate.unique for aggregate in aggregates),
+            redundant=sum(aggregate.redundant for aggregate in aggregates),
+        )
+
+
+def aggregate_attestations(
+    events: Iterable, slot_lag: int = 1
+) -> Iterator[SlotAttestations]:
+    """
+    Aggregate the attestation events of `stream_events(attestation=True)` and yield each slot once it is complete
+    Args:
+        events: Events with the attestation json in event.data, other event types are skipped
+        slot_lag: See AttestationAggregator
+    """
+    aggregator = AttestationAggregator(slot_lag)
+    for event in events:
+        if event.event == "attestation":
+            yield from aggregator.add(event.data)
+    yield from aggregator.flush()
@@ -0,0 +1,166 @@
+"""
+Immutable SSZ bitfields. Bits are held in a python integer where bit i of the field is bit i of the integer,
+which is the little endian reading of the SSZ bytes, so OR, AND and popcount run over machine words.
+"""
+from functools import reduce
+from typing import Iterable, Iterator, List, Type, TypeVar, Union
+
+# positions of the set bits of every byte value, used to list the set bits of a field a byte at a time
+_BYTE_BITS = [tuple(b for b in range(8) if value >> b & 1) for value in range(256)]
+
+B = TypeVar("B", bound="Bitfield")
+
+
+class Bitfield:
+    __slots__ = ("value", "length")
+
+    def __init__(self, value: int, length: int):
+        """
+        Args:
+            value: Integer whose bit i is bit i of the field
+            length: Number of bits in the field
+        """
+        assert 0 <= value < 1 << length, "value does not fit in length bits"
+        self.value = value
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> bool:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("bit index out of range")
+        return bool(self.value >> index & 1)
+
+    def __iter__(self) -> Iterator[bool]:
+        value = self.value
+        return (bool(value >> index & 1) for index in range(self.length))
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.value == other.value and self.length == other.length
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.value, self.length))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.hex()!r})"
+
+    def __str__(self) -> str:
+        return self.hex()
+
+    def _combine(self: B, other: B, value: int) -> B:
+        if type(other) is not type(self) or other.length != self.length:
+            raise ValueError("bitfields must have the same type and length")
+        return type(self)(value, self.length)
+
+    def __or__(self: B, other: B) -> B:
+        return self._combine(other, self.value | other.value)
+
+    def __and__(self: B, other: B) -> B:
+        return self._combine(other, self.value & other.value)
+
+    def count(self, value: bool = True) -> int:
+        """
+        Number of bits set to value, the popcount for the default of True
+        """
+        ones = self.value.bit_count()
+        return ones if value else self.length - ones
+
+    def indices(self) -> List[int]:
+        """
+        Positions of the set bits in increasing order
+        """
+        data = self.value.to_bytes((self.length + 7) // 8, "little")
+        return [
+            position * 8 + bit
+            for position, byte in enumerate(data)
+            if byte
+            for bit in _BYTE_BITS[byte]
+        ]
+
+    def to_bytes(self) -> bytes:
+        raise NotImplementedError
+
+    def hex(self) -> str:
+        """
+        0x prefixed hex of the SSZ encoding, as used by the beacon api
+        """
+        return "0x" + self.to_bytes().hex()
+
+    @classmethod
+    def union(cls: Type[B], fields: Iterable[B]) -> B:
+        """
+        OR of every field, which must all have the same length
+        """
+        return _reduce(cls, fields, int.__or__)
+
+    @classmethod
+    def intersection(cls: Type[B], fields: Iterable[B]) -> B:
+        """
+        AND of every field, which must all have the same length
+        """
+        return _reduce(cls, fields, int.__and__)
+
+
+def _reduce(cls, fields, operator):
+    fields = list(fields)
+    assert fields, "at least one bitfield is required"
+    length = fields[0].length
+    assert all(
+        type(field) is cls and field.length == length for field in fields
+    ), f"fields must all be {cls.__name__} of length {length}"
+    return cls(reduce(operator, (field.value for field in fields)), length)
+
+
+class Bitvector(Bitfield):
+    """
+    Fixed length bitfield, encoded as exactly ceil(length / 8) bytes
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, bytearray, memoryview], length: Union[int, None] = None
+    ) -> "Bitvector":
+        """
+        Args:
+            data: SSZ encoding of the bitvector
+            length: Number of bits, every bit of data if not given
+        """
+        length = len(data) * 8 if length is None else length
+        assert len(data) == (length + 7) // 8, "invalid bitvector length"
+        return cls(int.from_bytes(data, "little"), length)
+
+    @classmethod
+    def from_hex(cls, value: str, length: Union[int, None] = None) -> "Bitvector":
+        return cls.from_bytes(bytes.fromhex(value[2:]), length)
+
+    def to_bytes(self) -> bytes:
+        return self.value.to_bytes((self.length + 7) // 8, "little")
+
+
+class Bitlist(Bitfield):
+    """
+    Variable length bitfield. The SSZ encoding has one extra set bit after the last bit marking the length
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> "Bitlist":
+        value = int.from_bytes(data, "little")
+        assert value, "bitlist is missing its length bit"
+        length = value.bit_length() - 1
+        return cls(value ^ 1 << length, length)
+
+    @classmethod
+    def from_hex(cls, value: str) -> "Bitlist":
+        return cls.from_bytes(bytes.fromhex(value[2:]))
+
+    def to_bytes(self) -> bytes:
+        return (self.value | 1 << self.length).to_bytes(self.length // 8 + 1, "little")
@@ -0,0 +1,198 @@
+"""
+In-process cache for responses that can never change: anything addressed by a block or state root,
+by the genesis identifier or by a slot at or before the last finalized checkpoint.
+"""
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Callable, Union
+
+_MISSING = object()
+# lists longer than this are sized from a sample of their elements
+_SAMPLE_SIZE = 64
+
+
+def approximate_size(value) -> int:
+    """
+    Rough number of bytes held by a parsed response, following lists, dicts, dataclass fields and
+    the source of lazy objects
+    """
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if item is None or isinstance(item, (bool, Enum)):
+            continue
+        nbytes = getattr(item, "nbytes", None)
+        if isinstance(nbytes, int):
+            size += nbytes
+            continue
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            if len(item) > _SAMPLE_SIZE:
+                step = len(item) // _SAMPLE_SIZE
+                sample = item[::step][:_SAMPLE_SIZE]
+                size += approximate_size(sample) * len(item) // len(sample)
+            else:
+                stack.extend(item)
+        elif is_dataclass(item):
+            # a lazy object is sized from its undecoded source, reading its fields would decode them
+            source = getattr(item, "_source", _MISSING)
+            if source is not _MISSING:
+                stack.append(source)
+            else:
+                stack.extend(getattr(item, field.name) for field in fields(item))
+        else:
+            slots = getattr(type(item), "__slots__", ())
+            stack.extend(getattr(item, name, None) for name in slots)
+    return size
+
+
+class ResponseCache:
+    """
+    Thread safe LRU cache of parsed responses, bounded by their approximate size in bytes.
+    Cached objects are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        """
+        Args:
+            max_bytes: Approximate number of bytes of parsed objects kept before the least recently used are evicted
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def is_root(identifier) -> bool:
+    return isinstance(identifier, str) and identifier.startswith("0x")
+
+
+def as_slot(identifier) -> Union[int, None]:
+    """
+    The slot an identifier refers to, or None for named identifiers and roots
+    """
+    if isinstance(identifier, int) and not isinstance(identifier, bool):
+        return identifier
+    if isinstance(identifier, str) and identifier.isdigit():
+        return int(identifier)
+    return None
+
+
+def freeze(value):
+    """
+    Hashable equivalent of a value made of lists, tuples and dicts
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cache_immutable(*id_args: str, slot_of: Union[Callable, None] = None):
+    """
+    Decorator for endpoint methods whose result is cached in `self.cache` when every argument named in
+    id_args refers to data that can not change (checked with `self._is_immutable`).
+    Works for both blocking and coroutine methods and does nothing when the client has no cache.
+    Args:
+        id_args: Names of the arguments that identify the requested data
+        slot_of: For results that can change even when requested by root, a function returning the slot
+            of a result, which is then only cached once that slot is finalized
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def cache_key(self, args, kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            key = (func.__name__,) + tuple(
+                freeze(value) for name, value in arguments.items() if name != "self"
+            )
+            return key, [arguments[name] for name in id_args]
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                cache = getattr(self, "cache", None)
+                if cache is None:
+                    return await func(self, *args, **kwargs)
+                key, ids = cache_key(self, args, kwargs)
+                for identifier in ids:
+                    if not await self._is_immutable(identifier):
+                        return await func(self, *args, **kwargs)
+                value = cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await func(self, *args, **kwargs)
+                    if slot_of is None or await self._is_immutable(slot_of(value)):
+                        cache.put(key, value)
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return func(self, *args, **kwargs)
+            key, ids = cache_key(self, args, kwargs)
+            if not all(self._is_immutable(identifier) for identifier in ids):
+                return func(self, *args, **kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(self, *args, **kwargs)
+                if slot_of is None or self._is_immutable(slot_of(value)):
+                    cache.put(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
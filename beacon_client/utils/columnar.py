@@ -0,0 +1,178 @@
+"""
+Struct-of-arrays representation of the validator registry. Requires numpy.
+"""
+from typing import List, Sequence, Union
+import numpy as np
+from .types import (
+    ValidatorStatus,
+    ValidatorSummary,
+    Validator,
+    ValidatorIndex,
+    Gwei,
+    Epoch,
+    BLSPubkey,
+    Bytes32,
+)
+
+# status codes stored in ValidatorColumns.status, in ValidatorStatus declaration order
+STATUSES = list(ValidatorStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_STATUS_CODES_BY_VALUE = {status.value: code for status, code in STATUS_CODES.items()}
+
+_COLUMNS = {
+    "index": np.uint64,
+    "balance": np.uint64,
+    "status": np.uint8,
+    "pubkey": "S48",
+    "withdrawal_credentials": "S32",
+    "effective_balance": np.uint64,
+    "slashed": np.bool_,
+    "activation_eligibility_epoch": np.uint64,
+    "activation_epoch": np.uint64,
+    "exit_epoch": np.uint64,
+    "withdrawable_epoch": np.uint64,
+}
+
+
+def _fixed_bytes(values: List[str], dtype: str) -> np.ndarray:
+    # one hex decode for the whole column instead of one per validator
+    raw = bytes.fromhex("".join(value[2:] for value in values))
+    return np.frombuffer(raw, dtype=dtype).copy()
+
+
+def _hex_at(column: np.ndarray, position: int) -> str:
+    # read through a uint8 view since numpy strips trailing zero bytes from S elements
+    rows = column.view(np.uint8).reshape(len(column), column.dtype.itemsize)
+    return "0x" + rows[position].tobytes().hex()
+
+
+class ValidatorColumns:
+    """
+    Validators stored as one contiguous array per field.
+    Amounts are in Gwei, epochs are uint64 (FAR_FUTURE_EPOCH is 2**64 - 1),
+    status holds the codes in STATUS_CODES and pubkey/withdrawal_credentials are fixed width bytes.
+    Arrays can be combined into boolean masks and passed to filter, e.g.
+    `columns.filter(columns.status_mask(ValidatorStatus.ActiveOngoing) & (columns.balance < 31_900_000_000))`
+    """
+
+    __slots__ = tuple(_COLUMNS)
+
+    def __init__(self, **columns: np.ndarray):
+        assert set(columns) == set(_COLUMNS), "every column must be given"
+        lengths = {len(column) for column in columns.values()}
+        assert len(lengths) == 1, "columns must have the same length"
+        for name, dtype in _COLUMNS.items():
+            setattr(self, name, np.asarray(columns[name], dtype=dtype))
+
+    @classmethod
+    def from_json(cls, data: List[dict]) -> "ValidatorColumns":
+        """
+        Build the columns from the json `data` list of the validators endpoint
+        Args:
+            data: List of validator summaries as returned by the node
+        """
+        count = len(data)
+        validators = [d["validator"] for d in data]
+
+        def ints(values):
+            return np.fromiter(map(int, values), dtype=np.uint64, count=count)
+
+        return cls(
+            index=ints(d["index"] for d in data),
+            balance=ints(d["balance"] for d in data),
+            status=np.fromiter(
+                (_STATUS_CODES_BY_VALUE[d["status"]] for d in data),
+                dtype=np.uint8,
+                count=count,
+            ),
+            pubkey=_fixed_bytes([v["pubkey"] for v in validators], "S48"),
+            withdrawal_credentials=_fixed_bytes(
+                [v["withdrawal_credentials"] for v in validators], "S32"
+            ),
+            effective_balance=ints(v["effective_balance"] for v in validators),
+            slashed=np.fromiter(
+                (v["slashed"] for v in validators), dtype=np.bool_, count=count
+            ),
+            activation_eligibility_epoch=ints(
+                v["activation_eligibility_epoch"] for v in validators
+            ),
+            activation_epoch=ints(v["activation_epoch"] for v in validators),
+            exit_epoch=ints(v["exit_epoch"] for v in validators),
+            withdrawable_epoch=ints(v["withdrawable_epoch"] for v in validators),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["ValidatorColumns"]) -> "ValidatorColumns":
+        """
+        Join several column sets into one, in the given order
+        """
+        if not parts:
+            return cls(**{name: np.empty(0, dtype) for name, dtype in _COLUMNS.items()})
+        return cls(
+            **{
+                name: np.concatenate([getattr(part, name) for part in parts])
+                for name in _COLUMNS
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def status_mask(self, *statuses: ValidatorStatus) -> np.ndarray:
+        """
+        Boolean mask of validators that have any of the given statuses
+        """
+        return np.isin(self.status, [STATUS_CODES[status] for status in statuses])
+
+    def is_active(self, epoch: Epoch) -> np.ndarray:
+        """
+        Boolean mask of validators active at epoch, activation_epoch <= epoch < exit_epoch
+        """
+        return (self.activation_epoch <= epoch) & (epoch < self.exit_epoch)
+
+    def filter(self, selection: Union[np.ndarray, slice]) -> "ValidatorColumns":
+        """
+        Returns the validators selected by a boolean mask, an array of positions or a slice
+        """
+        return ValidatorColumns(
+            **{name: getattr(self, name)[selection] for name in _COLUMNS}
+        )
+
+    def position_of(self, index: ValidatorIndex) -> int:
+        """
+        Position of the row holding validator index, raises KeyError if it is not present
+        """
+        positions = np.flatnonzero(self.index == index)
+        if len(positions) == 0:
+            raise KeyError(index)
+        return int(positions[0])
+
+    def row(self, position: int) -> ValidatorSummary:
+        """
+        The validator stored at position as a ValidatorSummary
+        """
+        return ValidatorSummary(
+            index=ValidatorIndex(int(self.index[position])),
+            balance=Gwei(int(self.balance[position])),
+            status=STATUSES[self.status[position]],
+            validator=Validator(
+                pubkey=BLSPubkey(_hex_at(self.pubkey, position)),
+                withdrawal_credentials=Bytes32(
+                    _hex_at(self.withdrawal_credentials, position)
+                ),
+                effective_balance=Gwei(int(self.effective_balance[position])),
+                slashed=bool(self.slashed[position]),
+                activation_eligibility_epoch=Epoch(
+                    int(self.activation_eligibility_epoch[position])
+                ),
+                activation_epoch=Epoch(int(self.activation_epoch[position])),
+                exit_epoch=Epoch(int(self.exit_epoch[position])),
+                withdrawable_epoch=Epoch(int(self.withdrawable_epoch[position])),
+            ),
+        )
+
+    def to_summaries(self) -> List[ValidatorSummary]:
+        """
+        Every row as a ValidatorSummary
+        """
+        return [self.row(position) for position in range(len(self))]
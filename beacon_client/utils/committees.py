@@ -0,0 +1,229 @@
+"""
+Index of the attestation committees of one epoch for constant time lookups in both directions:
+validator -> (slot, committee index, position) and (slot, committee index) -> members.
+Members are stored once in a flat array in (slot, index) order with arrays mapping into it,
+so an epoch of a million validators takes a few megabytes and no per-validator objects.
+"""
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple, Union
+from .types import (
+    CommitteeIndex,
+    CommitteeSummary,
+    Epoch,
+    Root,
+    Slot,
+    ValidatorIndex,
+    SLOTS_PER_EPOCH,
+)
+
+# marks validators without a committee in EpochCommittees._position_of
+_UNASSIGNED = -1
+
+
+def decision_slot(epoch: Epoch) -> Slot:
+    """
+    Last slot of epoch - 2, whose block decides the attester shuffling of epoch.
+    Once it is finalized the dependent root of epoch can no longer change
+    """
+    return Slot(max((epoch - 1) * SLOTS_PER_EPOCH - 1, 0))
+
+
+@dataclass(frozen=True, slots=True)
+class CommitteeAssignment:
+    slot: Slot
+    index: CommitteeIndex
+    position: int  # position in the committee, which is the validator's bit in aggregation_bits
+    committee_size: int
+
+
+class EpochCommittees:
+    """
+    Every committee of an epoch, built from the response of get_committees_from_state for a whole epoch
+    """
+
+    __slots__ = (
+        "epoch",
+        "dependent_root",
+        "committees_per_slot",
+        "members",
+        "starts",
+        "_committee_of",
+        "_position_of",
+    )
+
+    def __init__(
+        self,
+        committees: Iterable[Tuple[int, int, Sequence[int]]],
+        dependent_root: Union[Root, None] = None,
+    ):
+        """
+        Args:
+            committees: (slot, committee index, validator indices) of every committee of one epoch
+            dependent_root: Block root the committees were computed from, see get_epoch_committees
+        """
+        committees = sorted(committees, key=lambda committee: committee[:2])
+        assert committees, "an epoch has at least one committee per slot"
+        self.epoch = Epoch(committees[0][0] // SLOTS_PER_EPOCH)
+        self.dependent_root = dependent_root
+        self.committees_per_slot = len(committees) // SLOTS_PER_EPOCH
+        start_slot = self.epoch * SLOTS_PER_EPOCH
+        expected = [
+            (start_slot + slot, index)
+            for slot in range(SLOTS_PER_EPOCH)
+            for index in range(self.committees_per_slot)
+        ]
+        assert [
+            (int(slot), int(index)) for slot, index, _ in committees
+        ] == expected, "committees must cover every slot and index of one epoch"
+        self.members = array("Q")
+        self.starts = array("Q", [0])
+        self._committee_of = array("H")
+        for number, (_, _, validators) in enumerate(committees):
+            self.members.extend(validators)
+            size = len(self.members) - self.starts[-1]
+            self.starts.append(len(self.members))
+            self._committee_of.extend(array("H", [number]) * size)
+        count = max(self.members, default=-1) + 1
+        self._position_of = array("l", [_UNASSIGNED]) * count
+        for position, validator in enumerate(self.members):
+            self._position_of[validator] = position
+
+    @classmethod
+    def from_json(
+        cls, data: List[dict], dependent_root: Union[Root, None] = None
+    ) -> "EpochCommittees":
+        """
+        Build the index from the json `data` list of the committees endpoint without parsing every committee
+        """
+        return cls(
+            (
+                (
+                    int(committee["slot"]),
+                    int(committee["index"]),
+                    map(int, committee["validators"]),
+                )
+                for committee in data
+            ),
+            dependent_root,
+        )
+
+    @classmethod
+    def from_summaries(
+        cls,
+        committees: List[CommitteeSummary],
+        dependent_root: Union[Root, None] = None,
+    ) -> "EpochCommittees":
+        return cls(
+            ((c.slot, c.index, c.validators) for c in committees), dependent_root
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def __contains__(self, validator_index: ValidatorIndex) -> bool:
+        return self._position(validator_index) != _UNASSIGNED
+
+    def _position(self, validator_index: int) -> int:
+        if 0 <= validator_index < len(self._position_of):
+            return self._position_of[validator_index]
+        return _UNASSIGNED
+
+    def assignment(
+        self, validator_index: ValidatorIndex
+    ) -> Union[CommitteeAssignment, None]:
+        """
+        The committee of a validator in this epoch, None for validators that are not active
+        """
+        position = self._position(validator_index)
+        if position == _UNASSIGNED:
+            return None
+        number = self._committee_of[position]
+        start = self.starts[number]
+        slot, index = divmod(number, self.committees_per_slot)
+        return CommitteeAssignment(
+            slot=Slot(self.epoch * SLOTS_PER_EPOCH + slot),
+            index=CommitteeIndex(index),
+            position=position - start,
+            committee_size=self.starts[number + 1] - start,
+        )
+
+    def committee(self, slot: Slot, index: CommitteeIndex) -> memoryview:
+        """
+        Validator indices of a committee in committee order, as a view into the flat members array
+        """
+        offset = slot - self.epoch * SLOTS_PER_EPOCH
+        assert 0 <= offset < SLOTS_PER_EPOCH, f"slot is not in epoch {self.epoch}"
+        assert 0 <= index < self.committees_per_slot, "committee index out of range"
+        number = offset * self.committees_per_slot + index
+        start = self.starts[number]
+        end = self.starts[number + 1]
+        return memoryview(self.members)[start:end]
+
+
+class CommitteeCache:
+    """
+    EpochCommittees of recent epochs keyed on (epoch, dependent root).
+    A reorg changes the dependent root of only the epochs whose shuffling it changed,
+    so only those are fetched again. Epochs stored as final have a finalized dependent root
+    and are returned by get_final without checking it.
+    """
+
+    def __init__(self, max_epochs: int = 8):
+        """
+        Args:
+            max_epochs: Number of epochs kept, the least recently used epoch is dropped first
+        """
+        assert max_epochs > 0, "max_epochs must be positive"
+        self.max_epochs = max_epochs
+        self.hits = 0
+        self.misses = 0
+        self._epochs = OrderedDict()
+        self._final = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+    def get(self, epoch: Epoch, dependent_root: Root) -> Union[EpochCommittees, None]:
+        with self._lock:
+            committees = self._epochs.get(epoch)
+            if committees is None or committees.dependent_root != dependent_root:
+                self.misses += 1
+                return None
+            self._epochs.move_to_end(epoch)
+            self.hits += 1
+            return committees
+
+    def get_final(self, epoch: Epoch) -> Union[EpochCommittees, None]:
+        with self._lock:
+            if epoch not in self._final:
+                return None
+            self._epochs.move_to_end(epoch)
+            self.hits += 1
+            return self._epochs[epoch]
+
+    def put(self, committees: EpochCommittees, final: bool = False):
+        """
+        Args:
+            committees: Committees to store, an entry with another dependent root is from an abandoned fork
+                and is replaced
+            final: Whether the dependent root of the committees is finalized, see decision_slot
+        """
+        with self._lock:
+            self._epochs[committees.epoch] = committees
+            self._epochs.move_to_end(committees.epoch)
+            if final:
+                self._final.add(committees.epoch)
+            else:
+                self._final.discard(committees.epoch)
+            while len(self._epochs) > self.max_epochs:
+                epoch, _ = self._epochs.popitem(last=False)
+                self._final.discard(epoch)
+
+    def invalidate(self, epoch: Epoch):
+        with self._lock:
+            self._epochs.pop(epoch, None)
+            self._final.discard(epoch)
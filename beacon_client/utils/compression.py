@@ -0,0 +1,190 @@
+"""
+Negotiation and streaming decompression of compressed response bodies.
+gzip and deflate are always offered, br when brotli (or brotlicffi) is installed and zstd when zstandard is.
+Bodies are decompressed chunk by chunk as they arrive so incremental parsing starts before the download ends,
+and the bytes read from the socket and the time spent decompressing are counted per client and per call.
+"""
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Union
+from .instrumentation import current_call
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# best ratio first, servers pick the first encoding they support when the client states no weights
+PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+
+def available_encodings() -> List[str]:
+    supported = {"gzip", "deflate"}
+    if brotli is not None:
+        supported.add("br")
+    if zstandard is not None:
+        supported.add("zstd")
+    return [encoding for encoding in PREFERENCE if encoding in supported]
+
+
+def accept_encoding(compression: bool) -> str:
+    """
+    Value of the Accept-Encoding header, identity asks the node not to compress
+    """
+    return ", ".join(available_encodings()) if compression else "identity"
+
+
+class Decompressor:
+    """
+    Incremental decoder for one Content-Encoding
+    """
+
+    def __init__(self, encoding: Union[str, None]):
+        self.encoding = (encoding or "identity").strip().lower()
+        self._raw_deflate = False
+        if self.encoding == "identity":
+            self._decoder = None
+        elif self.encoding in ("gzip", "x-gzip"):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._decoder = zlib.decompressobj()
+        elif self.encoding == "br" and brotli is not None:
+            self._decoder = brotli.Decompressor()
+        elif self.encoding == "zstd" and zstandard is not None:
+            self._decoder = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise ValueError(f"unsupported Content-Encoding: {encoding}")
+
+    @property
+    def identity(self) -> bool:
+        return self._decoder is None
+
+    def decompress(self, chunk: bytes) -> bytes:
+        if self._decoder is None:
+            return chunk
+        if self.encoding == "br":
+            # brotli calls it process, brotlicffi decompress
+            process = getattr(self._decoder, "process", None)
+            return process(chunk) if process else self._decoder.decompress(chunk)
+        try:
+            return self._decoder.decompress(chunk)
+        except zlib.error:
+            # some servers send deflate without the zlib header, retry the first chunk as raw deflate
+            if self.encoding != "deflate" or self._raw_deflate:
+                raise
+            self._raw_deflate = True
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(chunk)
+
+    def flush(self) -> bytes:
+        if self._decoder is None or self.encoding in ("br", "zstd"):
+            return b""
+        return self._decoder.flush()
+
+
+@dataclass(slots=True)
+class TransferStats:
+    """
+    Totals over every response body a client decoded itself
+    """
+
+    responses: int = 0
+    wire_bytes: int = 0  # as received, before decompression
+    decoded_bytes: int = 0
+    decompress: float = 0.0  # seconds spent decompressing
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def ratio(self) -> float:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+    def add(self, wire_bytes: int, decoded_bytes: int, decompress: float):
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+            self.decompress += decompress
+
+
+class _Decoding:
+    # one body: decompresses chunks and counts them into the stats and the current call when it ends
+    __slots__ = ("decompressor", "stats", "wire_bytes", "decoded_bytes", "seconds")
+
+    def __init__(self, encoding: Union[str, None], stats: TransferStats):
+        self.decompressor = Decompressor(encoding)
+        self.stats = stats
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.seconds = 0.0
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.wire_bytes += len(chunk)
+        if self.decompressor.identity:
+            data = chunk
+        else:
+            start = time.perf_counter()
+            data = self.decompressor.decompress(chunk)
+            self.seconds += time.perf_counter() - start
+        self.decoded_bytes += len(data)
+        return data
+
+    def finish(self) -> bytes:
+        tail = self.decompressor.flush()
+        self.decoded_bytes += len(tail)
+        self.stats.add(self.wire_bytes, self.decoded_bytes, self.seconds)
+        record = current_call()
+        if record is not None:
+            record.add_body(self.wire_bytes, self.decoded_bytes, self.seconds)
+        return tail
+
+
+def iter_decoded(
+    chunks: Iterable[bytes], encoding: Union[str, None], stats: TransferStats
+) -> Iterator[bytes]:
+    """
+    Decompressed chunks of a body received as chunks with the given Content-Encoding
+    """
+    decoding = _Decoding(encoding, stats)
+    for chunk in chunks:
+        data = decoding.feed(chunk)
+        if data:
+            yield data
+    tail = decoding.finish()
+    if tail:
+        yield tail
+
+
+async def aiter_decoded(
+    chunks: AsyncIterable[bytes], encoding: Union[str, None], stats: TransferStats
+) -> AsyncIterator[bytes]:
+    """
+    Async version of iter_decoded
+    """
+    decoding = _Decoding(encoding, stats)
+    async for chunk in chunks:
+        data = decoding.feed(chunk)
+        if data:
+            yield data
+    tail = decoding.finish()
+    if tail:
+        yield tail
+
+
+def decode_body(body: bytes, encoding: Union[str, None], stats: TransferStats) -> bytes:
+    """
+    Decompress a body that was read whole
+    """
+    decoding = _Decoding(encoding, stats)
+    data = decoding.feed(body)
+    return data + decoding.finish()
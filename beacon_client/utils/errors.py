@@ -0,0 +1,34 @@
+class BeaconNodeError(AssertionError):
+    """
+    Raised when the beacon node responds with a status code other than 200.
+    Subclasses AssertionError which is what the client raised before this type existed
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Status Code: {status_code} | {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class MissingFieldError(ValueError):
+    """
+    Raised when a json object is missing a field required by the dataclass it is parsed into
+    """
+
+    def __init__(self, data_class, field_name: str):
+        super().__init__(
+            f"missing value for field '{field_name}' of {data_class.__name__}"
+        )
+        self.data_class = data_class
+        self.field_name = field_name
+
+
+class UnsupportedForkError(ValueError):
+    """
+    Raised for data of a fork the client has no implementation for,
+    e.g. SSZ blocks of a layout utils.ssz does not describe or the proposer selection of utils.shuffling
+    """
+
+    def __init__(self, version: str):
+        super().__init__(f"the {version} fork is not supported")
+        self.version = version
@@ -0,0 +1,312 @@
+"""
+Managed Server-Sent-Events streams that yield typed objects.
+A reader keeps the connection open, reconnecting with Last-Event-ID and exponential backoff,
+while event payloads are decoded on a worker pool and handed over through a bounded queue.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterator, Union
+from sseclient import SSEClient
+from .errors import BeaconNodeError
+from .parsing import get_decoder
+from .types import (
+    Attestation,
+    SignedVoluntaryExit,
+    StreamedBlock,
+    StreamedChainReorg,
+    StreamedCheckpoint,
+    StreamedHead,
+    SECONDS_PER_SLOT,
+)
+
+# dataclass of the payload of every topic that can be streamed as typed objects
+EVENT_TYPES = {
+    "head": StreamedHead,
+    "block": StreamedBlock,
+    "attestation": Attestation,
+    "voluntary_exit": SignedVoluntaryExit,
+    "finalized_checkpoint": StreamedCheckpoint,
+    "chain_reorg": StreamedChainReorg,
+}
+
+# seconds between checks of the closed flag while blocked on the queue
+_POLL_INTERVAL = 0.1
+
+
+def parse_event(topic: str, data: str):
+    """
+    Decode the data of an event into the dataclass of its topic, see EVENT_TYPES
+    """
+    return get_decoder(EVENT_TYPES[topic])(json.loads(data))
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _fatal(error: Exception) -> bool:
+    # a request the node rejects will be rejected again, anything else is worth a reconnect
+    return isinstance(error, BeaconNodeError) and error.status_code < 500
+
+
+class _StreamStats:
+    def _init_stats(
+        self,
+        queue_size: int,
+        drop_when_full: bool,
+        max_lag: float,
+        initial_backoff: float,
+        max_backoff: float,
+    ):
+        assert queue_size > 0, "queue_size must be positive"
+        self.queue_size = queue_size
+        self.drop_when_full = drop_when_full
+        self.max_lag = max_lag
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.lagging = 0
+        self.reconnects = 0
+        self.last_event_id = None
+        self.last_error = None
+        # events are dropped by the reader when the queue is full and by the consumer when they fail to decode
+        self._dropped_lock = threading.Lock()
+
+    def _drop(self):
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def _delivered(self, arrived: float):
+        self.delivered += 1
+        if time.monotonic() - arrived > self.max_lag:
+            self.lagging += 1
+
+
+class EventStream(_StreamStats):
+    """
+    Iterable of typed events from the beacon node, created by `BeaconChainAPI.iter_events`.
+    Counters: `received` events read from the node, `delivered` events yielded, `dropped` events discarded
+    because the queue was full or their data could not be decoded, `lagging` events yielded more than
+    `max_lag` seconds after they arrived and `reconnects` connections re-established after a failure.
+    """
+
+    def __init__(
+        self,
+        connect: Callable,
+        workers: int = 4,
+        queue_size: int = 1024,
+        drop_when_full: bool = False,
+        max_lag: float = SECONDS_PER_SLOT / 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        executor: Union[Executor, None] = None,
+    ):
+        self._init_stats(
+            queue_size, drop_when_full, max_lag, initial_backoff, max_backoff
+        )
+        self._connect = connect
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = threading.Event()
+        self._response = None
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        backoff = self.initial_backoff
+        while not self._closed.is_set():
+            self._response = None
+            try:
+                self._response = self._connect(self.last_event_id)
+                for event in SSEClient(self._response).events():
+                    backoff = self.initial_backoff
+                    if event.id:
+                        self.last_event_id = event.id
+                    self.received += 1
+                    self._enqueue(event)
+                    if self._closed.is_set():
+                        return
+            except Exception as error:
+                if self._closed.is_set():
+                    return
+                self.last_error = error
+                if _fatal(error):
+                    self._put(_Failure(error))
+                    return
+            finally:
+                if self._response is not None:
+                    self._response.close()
+            # the node ended the stream or the connection failed
+            self.reconnects += 1
+            if self._closed.wait(backoff):
+                return
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _enqueue(self, event):
+        future = self._executor.submit(parse_event, event.event, event.data)
+        item = (time.monotonic(), future)
+        if not self.drop_when_full:
+            self._put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            future.cancel()
+            self._drop()
+
+    def _put(self, item):
+        # a full queue holds the reader back, which in turn slows the node down
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator:
+        while not self._closed.is_set():
+            try:
+                item = self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if isinstance(item, _Failure):
+                raise item.error
+            arrived, future = item
+            try:
+                value = future.result()
+            except Exception:
+                self._drop()
+                continue
+            self._delivered(arrived)
+            yield value
+
+    def close(self):
+        """
+        Stop reading events and close the connection
+        """
+        self._closed.set()
+        response = self._response
+        if response is not None:
+            response.close()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class AsyncEventStream(_StreamStats):
+    """
+    Async iterable version of EventStream, created by `AsyncBeaconChainAPI.iter_events`
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[Union[str, None]], Awaitable],
+        iter_sse: Callable,
+        workers: int = 4,
+        queue_size: int = 1024,
+        drop_when_full: bool = False,
+        max_lag: float = SECONDS_PER_SLOT / 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        executor: Union[Executor, None] = None,
+    ):
+        self._init_stats(
+            queue_size, drop_when_full, max_lag, initial_backoff, max_backoff
+        )
+        self._connect = connect
+        self._iter_sse = iter_sse
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self._queue = None
+        self._reader = None
+
+    async def _read(self):
+        loop = asyncio.get_running_loop()
+        backoff = self.initial_backoff
+        while True:
+            try:
+                response = await self._connect(self.last_event_id)
+                async with response:
+                    async for event in self._iter_sse(response.content):
+                        backoff = self.initial_backoff
+                        if event.id:
+                            self.last_event_id = event.id
+                        self.received += 1
+                        future = loop.run_in_executor(
+                            self._executor, parse_event, event.event, event.data
+                        )
+                        item = (time.monotonic(), future)
+                        if not self.drop_when_full:
+                            await self._queue.put(item)
+                        elif self._queue.full():
+                            future.cancel()
+                            self._drop()
+                        else:
+                            self._queue.put_nowait(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                self.last_error = error
+                if _fatal(error):
+                    await self._queue.put(_Failure(error))
+                    return
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if self._reader is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._reader = asyncio.ensure_future(self._read())
+        try:
+            while True:
+                item = await self._queue.get()
+                if isinstance(item, _Failure):
+                    raise item.error
+                arrived, future = item
+                try:
+                    value = await future
+                except Exception:
+                    self._drop()
+                    continue
+                self._delivered(arrived)
+                yield value
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stop reading events and close the connection
+        """
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
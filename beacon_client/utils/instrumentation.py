@@ -0,0 +1,404 @@
+"""
+Per call timings of the client: every get_* and compute_* method of a client constructed with an
+Instrumentation produces one CallRecord, passed to each sink when the call returns or raises.
+Clients without one are not wrapped, the remaining cost is a context variable lookup per request and parse.
+
+    metrics = PrometheusSink()
+    client = BeaconChainAPI("http://localhost:5052", instrumentation=Instrumentation(metrics))
+    client.get_validators_from_state("head")
+    print(metrics.render())
+"""
+import bisect
+import functools
+import inspect
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+_current: ContextVar[Union["CallRecord", None]] = ContextVar(
+    "beacon_client_call", default=None
+)
+# records can be updated from the worker threads of a call that fetches in parallel
+_lock = threading.Lock()
+_span_ids = itertools.count(1)
+
+# path segments followed by a parameter, see endpoint_template
+_PARAMETERS = {
+    "states": "state_id",
+    "blocks": "block_id",
+    "headers": "block_id",
+    "validators": "validator_id",
+    "peers": "peer_id",
+    "attester": "epoch",
+    "proposer": "epoch",
+    "sync": "epoch",
+}
+_INSTRUMENTED = ("get_", "compute_")
+
+
+def endpoint_template(path: str) -> str:
+    """
+    The Beacon API route of a request path, e.g. /eth/v1/beacon/states/head/validators
+    becomes /eth/v1/beacon/states/{state_id}/validators
+    """
+    segments = path.split("?", 1)[0].split("/")
+    for position in range(1, len(segments)):
+        name = _PARAMETERS.get(segments[position - 1])
+        if name is not None:
+            segments[position] = "{" + name + "}"
+    return "/".join(segments)
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """
+    Timings in seconds of one client call. A call that sends several requests sums their phases,
+    calls made inside it (e.g. get_epoch_committees asking for the dependent root) get records of their own.
+    """
+
+    name: str  # client method
+    start: float  # time.time() when the call began
+    # route of the first request, None if no request was sent
+    endpoint: Union[str, None] = None
+    duration: float = 0.0
+    # waiting for an identical request in flight or, in the async client, for a pooled connection
+    queue_wait: float = 0.0
+    # sending the request until the response headers arrived
+    time_to_first_byte: float = 0.0
+    download: float = 0.0  # reading the response body, including decompress
+    decompress: float = 0.0
+    json_decode: float = 0.0
+    dataclass_decode: float = 0.0  # parse_json
+    response_bytes: int = 0  # decompressed
+    wire_bytes: int = 0  # as received
+    requests: int = 0
+    status: Union[int, None] = None  # status code of the last response
+    outcome: str = "ok"  # ok, cached (no request sent), http_error or error
+    parent: Union[str, None] = None  # name of the call this one was made from
+    span_id: int = 0
+    parent_span_id: Union[int, None] = None
+
+    def add_response(
+        self, path: str, status: int, sent: float, first_byte: float, end: float
+    ):
+        """
+        Add one request given the time.perf_counter() readings when it was sent, when its headers arrived and
+        when its body was read
+        """
+        with _lock:
+            if self.endpoint is None:
+                self.endpoint = endpoint_template(path)
+            self.requests += 1
+            self.status = status
+            self.time_to_first_byte += first_byte - sent
+            self.download += end - first_byte
+
+    def add_body(self, wire_bytes: int, response_bytes: int, decompress: float):
+        with _lock:
+            self.wire_bytes += wire_bytes
+            self.response_bytes += response_bytes
+            self.decompress += decompress
+
+    def add(self, phase: str, seconds: float):
+        with _lock:
+            setattr(self, phase, getattr(self, phase) + seconds)
+
+
+def current_call() -> Union[CallRecord, None]:
+    """
+    Record of the instrumented call running in this context, None outside of one
+    """
+    return _current.get()
+
+
+def timed(phase: str, fn: Callable[[], T]) -> T:
+    """
+    fn(), with its duration added to phase of the current call if there is one
+    """
+    record = _current.get()
+    if record is None:
+        return fn()
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        record.add(phase, time.perf_counter() - start)
+
+
+class Instrumentation:
+    """
+    Wraps the get_* and compute_* methods of a client so every call produces a CallRecord.
+    Methods returning iterators or streams are left as they are.
+    """
+
+    def __init__(self, *sinks: Callable[[CallRecord], None]):
+        """
+        Args:
+            sinks: Callables receiving every finished CallRecord, e.g. PrometheusSink() or SpanSink(callback)
+        """
+        self.sinks = list(sinks)
+
+    def attach(self, client):
+        for name in dir(type(client)):
+            if not name.startswith(_INSTRUMENTED):
+                continue
+            method = getattr(client, name)
+            if inspect.isgeneratorfunction(method) or inspect.isasyncgenfunction(
+                method
+            ):
+                continue
+            if inspect.iscoroutinefunction(method):
+                setattr(client, name, self._wrap_async(name, method))
+            else:
+                setattr(client, name, self._wrap(name, method))
+
+    def _begin(self, name: str) -> CallRecord:
+        parent = _current.get()
+        record = CallRecord(name=name, start=time.time(), span_id=next(_span_ids))
+        if parent is not None:
+            record.parent = parent.name
+            record.parent_span_id = parent.span_id
+        return record
+
+    def _finish(self, record: CallRecord, error: Union[BaseException, None]):
+        if error is not None:
+            status = getattr(error, "status_code", None)
+            record.outcome = "error" if status is None else "http_error"
+            record.status = status if status is not None else record.status
+        elif record.requests == 0:
+            record.outcome = "cached"
+        for sink in self.sinks:
+            sink(record)
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def instrumented(*args, **kwargs):
+            record = self._begin(name)
+            token = _current.set(record)
+            start = time.perf_counter()
+            error = None
+            try:
+                return method(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record.duration = time.perf_counter() - start
+                _current.reset(token)
+                self._finish(record, error)
+
+        return instrumented
+
+    def _wrap_async(self, name: str, method):
+        @functools.wraps(method)
+        async def instrumented(*args, **kwargs):
+            record = self._begin(name)
+            token = _current.set(record)
+            start = time.perf_counter()
+            error = None
+            try:
+                return await method(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record.duration = time.perf_counter() - start
+                _current.reset(token)
+                self._finish(record, error)
+
+        return instrumented
+
+
+_PHASES = (
+    "queue_wait",
+    "time_to_first_byte",
+    "download",
+    "decompress",
+    "json_decode",
+    "dataclass_decode",
+)
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+class PrometheusSink:
+    """
+    Aggregates CallRecords into counters and histograms labelled by method, endpoint and outcome,
+    render() returns them in the Prometheus text exposition format
+    """
+
+    def __init__(self, prefix: str = "beacon_client", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._calls: Dict[tuple, int] = {}
+        self._bytes: Dict[str, Dict[tuple, int]] = {"response": {}, "wire": {}}
+        self._histograms: Dict[str, Dict[tuple, _Histogram]] = {
+            name: {} for name in ("duration",) + _PHASES
+        }
+        self._lock = threading.Lock()
+
+    def __call__(self, record: CallRecord):
+        call = (("method", record.name), ("endpoint", record.endpoint or ""))
+        outcome = call + (("outcome", record.outcome),)
+        with self._lock:
+            self._calls[outcome] = self._calls.get(outcome, 0) + 1
+            for kind, size in (
+                ("response", record.response_bytes),
+                ("wire", record.wire_bytes),
+            ):
+                self._bytes[kind][call] = self._bytes[kind].get(call, 0) + size
+            self._observe("duration", outcome, record.duration)
+            if record.requests:
+                for phase in _PHASES:
+                    self._observe(phase, call, getattr(record, phase))
+
+    def _observe(self, name: str, labels: tuple, value: float):
+        histogram = self._histograms[name].get(labels)
+        if histogram is None:
+            histogram = self._histograms[name][labels] = _Histogram(len(self.buckets))
+        position = bisect.bisect_left(self.buckets, value)
+        if position < len(self.buckets):
+            histogram.counts[position] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            name = f"{self.prefix}_calls_total"
+            lines.append(f"# HELP {name} Client calls by outcome")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in self._calls.items():
+                lines.append(f"{name}{{{_labels(labels)}}} {value}")
+            for kind, description in (
+                ("response", "Bytes of response bodies after decompression"),
+                ("wire", "Bytes of response bodies as received"),
+            ):
+                name = f"{self.prefix}_{kind}_bytes_total"
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in self._bytes[kind].items():
+                    lines.append(f"{name}{{{_labels(labels)}}} {value}")
+            for phase, histograms in self._histograms.items():
+                name = f"{self.prefix}_{phase}_seconds"
+                lines.append(f"# HELP {name} Seconds per call spent in {phase}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in histograms.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        bucket = _labels(labels + (("le", repr(bound)),))
+                        lines.append(f"{name}_bucket{{{bucket}}} {cumulative}")
+                    bucket = _labels(labels + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{{{bucket}}} {histogram.count}")
+                    lines.append(f"{name}_sum{{{_labels(labels)}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{_labels(labels)}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+@dataclass(frozen=True, slots=True)
+class Span:
+    """
+    A finished call in the shape of an OpenTelemetry span, attribute names follow the http semantic conventions
+    """
+
+    name: str
+    span_id: int
+    parent_span_id: Union[int, None]
+    start_time_unix_nano: int
+    end_time_unix_nano: int
+    status: str  # OK or ERROR
+    attributes: dict
+
+
+def to_span(record: CallRecord) -> Span:
+    attributes = {
+        "beacon_client.outcome": record.outcome,
+        "beacon_client.requests": record.requests,
+        "http.response.body.size": record.wire_bytes,
+        "beacon_client.response_bytes": record.response_bytes,
+    }
+    if record.endpoint is not None:
+        attributes["http.route"] = record.endpoint
+    if record.status is not None:
+        attributes["http.response.status_code"] = record.status
+    for phase in _PHASES:
+        attributes[f"beacon_client.{phase}"] = getattr(record, phase)
+    start = int(record.start * 1e9)
+    return Span(
+        name=record.name,
+        span_id=record.span_id,
+        parent_span_id=record.parent_span_id,
+        start_time_unix_nano=start,
+        end_time_unix_nano=start + int(record.duration * 1e9),
+        status="ERROR" if record.outcome in ("error", "http_error") else "OK",
+        attributes=attributes,
+    )
+
+
+class SpanSink:
+    """
+    Calls callback with a Span for every CallRecord
+    """
+
+    def __init__(self, callback: Callable[[Span], None]):
+        self.callback = callback
+
+    def __call__(self, record: CallRecord):
+        self.callback(to_span(record))
+
+
+def tracer_callback(tracer) -> Callable[[Span], None]:
+    """
+    SpanSink callback that exports every Span through an opentelemetry Tracer, e.g.
+    SpanSink(tracer_callback(trace.get_tracer("beacon_client")))
+    """
+
+    def export(span: Span):
+        otel_span = tracer.start_span(
+            span.name,
+            start_time=span.start_time_unix_nano,
+            attributes=span.attributes,
+        )
+        if span.status == "ERROR":
+            otel_span.set_attribute(
+                "error.type", span.attributes["beacon_client.outcome"]
+            )
+        otel_span.end(end_time=span.end_time_unix_nano)
+
+    return export
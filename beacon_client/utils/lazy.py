@@ -0,0 +1,106 @@
+"""
+Lazily decoded dataclasses. A lazy class is a subclass of a slotted dataclass that keeps the undecoded
+source of the object and decodes each field on first access, storing the value in the dataclass's own slot
+so later reads cost the same as on an eagerly decoded object. The source is released once every field is decoded.
+Lazy objects can be shared between threads: a field decoded by two threads at once is decoded twice into equal values.
+The source is a mapping of field name to raw value: the json dict, or the field views of an SSZ container.
+"""
+from dataclasses import fields
+from typing import Any, Callable, Dict
+from .errors import MissingFieldError
+
+
+def _field_property(data_class, name: str, slot, load: Callable, release: Callable):
+    get_slot = slot.__get__
+    set_slot = slot.__set__
+
+    def getter(self):
+        try:
+            return get_slot(self)
+        except AttributeError:
+            pass
+        try:
+            source = self._source
+        except AttributeError:
+            # another thread decoded the last missing field and released the source since the slot was read
+            return get_slot(self)
+        try:
+            value = load(source)
+        except KeyError as error:
+            raise MissingFieldError(data_class, error.args[0]) from None
+        set_slot(self, value)
+        release(self)
+        return value
+
+    # the dataclass __init__ assigns through the property, so values passed to the constructor land in the slot
+    return property(getter, set_slot)
+
+
+def lazy_constructor(data_class, loaders: Dict[str, Callable[[Any], Any]]) -> Callable:
+    """
+    Returns a function that wraps a source in a lazy subclass of data_class
+    Args:
+        data_class: Slotted dataclass to subclass, instances compare equal to decoded instances of it
+        loaders: For every field, the function decoding that field from the source
+    """
+    assert "__slots__" in vars(data_class), f"{data_class.__name__} must be slotted"
+    names = [field.name for field in fields(data_class)]
+    assert set(loaders) == set(names), "every field needs a loader"
+
+    def __eq__(self, other):
+        # the dataclass __eq__ requires identical classes, as a subclass this is tried first on either side
+        if not isinstance(other, data_class):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in names)
+
+    def __reduce__(self):
+        return data_class, tuple(getattr(self, name) for name in names)
+
+    namespace = {
+        "__slots__": ("_source",),
+        "__qualname__": data_class.__qualname__,
+        "__module__": data_class.__module__,
+        "__eq__": __eq__,
+        # defining __eq__ would otherwise remove the hash of frozen dataclasses
+        "__hash__": data_class.__hash__,
+        "__reduce__": __reduce__,
+    }
+    getters = [vars(data_class)[name].__get__ for name in names]
+
+    def release(self):
+        # the source is dropped once every field is decoded so the object does not hold both
+        for get in getters:
+            try:
+                get(self)
+            except AttributeError:
+                return
+        try:
+            del_source(self)
+        except AttributeError:
+            # released by another thread that decoded a field at the same time
+            pass
+
+    for name in names:
+        slot = vars(data_class)[name]
+        namespace[name] = _field_property(
+            data_class, name, slot, loaders[name], release
+        )
+    lazy_class = type(data_class.__name__, (data_class,), namespace)
+    new = object.__new__
+    set_source = lazy_class._source.__set__
+    del_source = lazy_class._source.__delete__
+
+    def construct(source):
+        value = new(lazy_class)
+        set_source(value, source)
+        return value
+
+    construct.lazy_class = lazy_class
+    return construct
+
+
+def is_lazy(value) -> bool:
+    """
+    True for objects created by a lazy decoder
+    """
+    return hasattr(type(value), "_source")
@@ -0,0 +1,39 @@
+from typing import Iterable, List
+
+# characters of `id=...&id=...` allowed in one request, well below the 8KiB request line limit
+# common to beacon nodes and reverse proxies once the rest of the url is added
+MAX_ID_QUERY_LENGTH = 4096
+
+# status codes of a node that does not implement the POST form of an endpoint
+POST_UNSUPPORTED = (404, 405, 415, 501)
+
+
+def selected(**flags: bool) -> List[str]:
+    """
+    Names of the flags that are true, in the order they were given
+    """
+    return [name for name, flag in flags.items() if flag]
+
+
+def id_batches(ids: Iterable, max_length: int = MAX_ID_QUERY_LENGTH) -> List[List[str]]:
+    """
+    Split validator ids into batches whose repeated `id=` query parameters stay below max_length characters.
+    Duplicate ids are dropped so batches never overlap.
+    Args:
+        ids: Validator indices or public keys
+        max_length: Maximum length of the id part of one query string
+    """
+    batches = []
+    batch = []
+    length = 0
+    for validator_id in dict.fromkeys(str(i) for i in ids):
+        size = len(validator_id) + len("&id=")
+        if batch and length + size > max_length:
+            batches.append(batch)
+            batch = []
+            length = 0
+        batch.append(validator_id)
+        length += size
+    if batch:
+        batches.append(batch)
+    return batches
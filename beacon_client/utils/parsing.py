@@ -4,32 +4,51 @@ from .types import (
     CommitteeIndex,
     Slot,
     Epoch,
-    Validator,
-    SignedBeaconBlockHeader,
-    BeaconBlockHeader,
-    BeaconBlock,
-    BeaconBlockBody,
-    Eth1Data,
     ValidatorStatus,
     PeerState,
     ConnectionOrientation,
     ChainId,
     Wei,
+    Transaction,
+    JustificationBits,
+    SyncCommitteeBits,
+    AttestationSubnets,
+    JUSTIFICATION_BITS_LENGTH,
+    SYNC_COMMITTEE_SIZE,
+    ATTESTATION_SUBNET_COUNT,
+    Validator,
+    SignedBeaconBlockHeader,
+    BeaconBlock,
 )
-from dacite import from_dict, Config
-from bitstring import BitArray
+from .bitfields import Bitlist, Bitvector
+from .errors import MissingFieldError
+from .instrumentation import current_call, timed
+from .lazy import lazy_constructor
+from .transactions import TransactionList
 from multiaddr import Multiaddr
+from dataclasses import is_dataclass, fields, MISSING
+from enum import Enum
+from functools import partial
+from typing import get_type_hints, get_origin, get_args, Any, Union, List
+from types import UnionType
+import threading
+import warnings
 
+# NewType is the identity function at runtime so converting with int gives the same value
 SimpleTypeHooks = {
-    Gwei: lambda x: Gwei(int(x)),
-    Wei: lambda x: Wei(int(x)),
-    ValidatorIndex: lambda x: ValidatorIndex(int(x)),
-    CommitteeIndex: lambda x: CommitteeIndex(int(x)),
-    Slot: lambda x: Slot(int(x)),
-    Epoch: lambda x: Epoch(int(x)),
-    ChainId: lambda x: ChainId(int(x)),
+    Gwei: int,
+    Wei: int,
+    ValidatorIndex: int,
+    CommitteeIndex: int,
+    Slot: int,
+    Epoch: int,
+    ChainId: int,
     int: int,
-    BitArray: BitArray,
+    Bitlist: Bitlist.from_hex,
+    Bitvector: Bitvector.from_hex,
+    JustificationBits: partial(Bitvector.from_hex, length=JUSTIFICATION_BITS_LENGTH),
+    SyncCommitteeBits: partial(Bitvector.from_hex, length=SYNC_COMMITTEE_SIZE),
+    AttestationSubnets: partial(Bitvector.from_hex, length=ATTESTATION_SUBNET_COUNT),
     Multiaddr: Multiaddr,
     ValidatorStatus: ValidatorStatus,
     PeerState: PeerState,
@@ -37,47 +56,246 @@ SimpleTypeHooks = {
 }
 
 
-def _nested_hook(beacon_class, sub_classes: dict = {}, SimpleTypeHooks=SimpleTypeHooks):
-    return lambda x: from_dict(
-        data_class=beacon_class,
-        data=x,
-        config=Config(type_hooks={**SimpleTypeHooks, **sub_classes}),
-    )
-
-
-NestedTypeHooks = {
-    Validator: _nested_hook(Validator),
-    SignedBeaconBlockHeader: _nested_hook(
-        SignedBeaconBlockHeader, {BeaconBlockHeader: _nested_hook(BeaconBlockHeader)}
-    ),
-    BeaconBlock: _nested_hook(
-        BeaconBlock,
-        {
-            BeaconBlockBody: _nested_hook(
-                BeaconBlockBody, {Eth1Data: _nested_hook(Eth1Data)}
-            )
-        },
-    ),
-}
+TypeHooks = {**SimpleTypeHooks}
+
+# decodes execution payload transactions into one contiguous buffer instead of a hex string each
+BinaryTransactionHooks = {**TypeHooks, List[Transaction]: TransactionList.from_hex}
+
+# classes that had a dacite hook of their own in NestedTypeHooks
+_NESTED_TYPES = (Validator, SignedBeaconBlockHeader, BeaconBlock)
+
+
+def __getattr__(name: str):
+    if name == "NestedTypeHooks":
+        warnings.warn(
+            "NestedTypeHooks is deprecated, nested dataclasses are decoded by parse_json and get_decoder",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return {data_class: get_decoder(data_class) for data_class in _NESTED_TYPES}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# frozenset of the type_hooks items -> (copy of type_hooks, {(data_class, lazy): decoder})
+# keyed on the contents so equal mappings share decoders and a mutated mapping gets its own
+_decoders = {}
+# the least recently added hook sets are dropped beyond this, so fresh hooks on every call can not grow it forever
+_MAX_HOOK_SETS = 64
+# held while decoders are built, reentrant since building one dataclass builds the dataclasses of its fields
+_build_lock = threading.RLock()
+# forwarding stubs of the decoders being built, only seen by the thread holding _build_lock
+_pending = {}
+
+
+class _DecoderBuilder:
+    """
+    Generates the source of a single function per dataclass that converts a json dict into the dataclass.
+    Field conversions are inlined as expressions so decoding a value costs no reflection at all.
+    """
+
+    def __init__(self, data_class, type_hooks: dict, lazy: bool = False):
+        self.data_class = data_class
+        self.type_hooks = type_hooks
+        self.lazy = lazy
+        self.namespace = {"MissingFieldError": MissingFieldError}
+
+    def _name(self, value) -> str:
+        name = f"_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def expression(self, field_type, var: str, depth: int = 0) -> str:
+        """
+        Returns a python expression converting the json value named var into field_type
+        """
+        if field_type in self.type_hooks:
+            hook = self.type_hooks[field_type]
+            if isinstance(hook, type) and issubclass(hook, Enum):
+                members = self._name(hook._value2member_map_)
+                return f"({members}[{var}] if {var} in {members} else {self._name(hook)}({var}))"
+            return f"{self._name(hook)}({var})"
+        if is_dataclass(field_type):
+            decoder = get_decoder(field_type, self.type_hooks, self.lazy)
+            return f"{self._name(decoder)}({var})"
+        supertype = getattr(field_type, "__supertype__", None)
+        if supertype is not None:
+            return self.expression(supertype, var, depth)
+        origin = get_origin(field_type)
+        if origin is list or field_type is List or field_type is list:
+            args = get_args(field_type)
+            if not args or args[0] is Any:
+                return f"list({var})"
+            item = f"x{depth}"
+            element = self.expression(args[0], item, depth + 1)
+            if element == item:
+                return f"list({var})"
+            return f"[{element} for {item} in {var}]"
+        if origin is Union or origin is UnionType:
+            args = get_args(field_type)
+            options = [arg for arg in args if arg is not type(None)]
+            if len(options) == 1:
+                element = self.expression(options[0], var, depth)
+                return f"(None if {var} is None else {element})"
+            converters = [self._compile_function(option, depth) for option in options]
+            return f"{self._name(_first_matching(converters))}({var})"
+        if isinstance(field_type, type) and issubclass(field_type, Enum):
+            return f"{self._name(field_type)}({var})"
+        return var
 
+    def _compile_function(self, field_type, depth: int):
+        source = (
+            f"def convert(v):\n    return {self.expression(field_type, 'v', depth)}\n"
+        )
+        exec(source, self.namespace)
+        return self.namespace.pop("convert")
+
+    def build_lazy(self):
+        hints = get_type_hints(self.data_class)
+        loaders = {}
+        for field in fields(self.data_class):
+            convert = self._compile_function(hints[field.name], 0)
+            loaders[field.name] = _loader(field, convert)
+        return lazy_constructor(self.data_class, loaders)
+
+    def build(self):
+        if self.lazy and "__slots__" in vars(self.data_class):
+            return self.build_lazy()
+        cls = self._name(self.data_class)
+        hints = get_type_hints(self.data_class)
+        values = []
+        for field in fields(self.data_class):
+            if not field.init:
+                continue
+            key = repr(field.name)
+            value = self.expression(hints[field.name], f"d[{key}]")
+            if field.default is not MISSING or field.default_factory is not MISSING:
+                value = f"({value} if {key} in d else {self._name(_default(field))}())"
+            values.append((field.name, value))
+        if _fills_slots(self.data_class):
+            # the generated __init__ of frozen dataclasses goes through object.__setattr__ for every field,
+            # setting the slot descriptors directly is several times faster and gives an equal object
+            new = self._name(object.__new__)
+            body = f"        o = {new}({cls})\n"
+            for name, value in values:
+                setter = self._name(vars(self.data_class)[name].__set__)
+                body += f"        {setter}(o, {value})\n"
+            body += "        return o\n"
+        else:
+            arguments = ", ".join(f"{name}={value}" for name, value in values)
+            body = f"        return {cls}({arguments})\n"
+        source = (
+            "def decode(d):\n"
+            "    try:\n"
+            f"{body}"
+            "    except KeyError as error:\n"
+            f"        raise MissingFieldError({cls}, error.args[0]) from None\n"
+        )
+        exec(source, self.namespace)
+        return self.namespace["decode"]
+
+
+def _fills_slots(data_class) -> bool:
+    # slots can be filled directly when __init__ would do nothing but assign every field
+    if "__slots__" not in vars(data_class):
+        return False
+    if hasattr(data_class, "__post_init__"):
+        return False
+    return all(field.init for field in fields(data_class))
+
+
+def _default(field):
+    if field.default is not MISSING:
+        return lambda: field.default
+    return field.default_factory
+
+
+def _loader(field, convert):
+    name = field.name
+    if field.default is MISSING and field.default_factory is MISSING:
+        return lambda d: convert(d[name])
+    default = _default(field)
+    return lambda d: convert(d[name]) if name in d else default()
 
-TypeHooks = {**SimpleTypeHooks, **NestedTypeHooks}
 
+def _first_matching(converters):
+    def convert(value):
+        for converter in converters:
+            try:
+                return converter(value)
+            except (TypeError, ValueError, KeyError):
+                continue
+        raise ValueError(f"{value!r} does not match any type in the union")
 
-def parse_json(data, data_class, TypeHooks=TypeHooks):
+    return convert
+
+
+def get_decoder(data_class, type_hooks: dict = TypeHooks, lazy: bool = False):
+    """
+    Returns the compiled decoder for data_class, building and caching it on first use.
+    Decoders are cached per contents of type_hooks, so a mapping changed after use gets new decoders
+    Args:
+        data_class: Dataclass the decoder produces
+        type_hooks: Mapping of type to the callable that converts a json value into that type,
+            keys and values must be hashable
+        lazy: If true the decoder wraps the json in a subclass of data_class that decodes each field
+            on first access, see utils.lazy. Only slotted dataclasses are decoded lazily
+    """
+    snapshot = frozenset(type_hooks.items())
+    entry = _decoders.get(snapshot)
+    if entry is not None:
+        decoder = entry[1].get((data_class, lazy))
+        if decoder is not None:
+            return decoder
+    with _build_lock:
+        return _build_decoder(snapshot, data_class, type_hooks, lazy)
+
+
+def _build_decoder(snapshot: frozenset, data_class, type_hooks: dict, lazy: bool):
+    entry = _decoders.get(snapshot)
+    if entry is None:
+        entry = _decoders[snapshot] = (dict(type_hooks), {})
+        if len(_decoders) > _MAX_HOOK_SETS:
+            del _decoders[next(iter(_decoders))]
+    hooks, cache = entry
+    key = (data_class, lazy)
+    decoder = cache.get(key, _pending.get((snapshot, key)))
+    if decoder is not None:
+        return decoder
+    # a forwarding stub lets self referencing dataclasses terminate
+    _pending[(snapshot, key)] = lambda d: cache[key](d)
+    built = set(cache)
+    try:
+        decoder = _DecoderBuilder(data_class, hooks, lazy).build()
+    except BaseException:
+        # decoders of the fields built meanwhile may forward to this one, they are built again on next use
+        for other in set(cache) - built:
+            del cache[other]
+        raise
+    finally:
+        del _pending[(snapshot, key)]
+    cache[key] = decoder
+    return decoder
+
+
+def parse_json(data, data_class, TypeHooks=TypeHooks, lazy: bool = False):
+    """
+    Decode a json object, or a list of them, into data_class.
+    Values are converted by TypeHooks but, unlike the dacite based decoding this replaced,
+    not checked against the field types: a value of the wrong type fails only where its conversion does.
+    Args:
+        data: json object or list of json objects
+        data_class: Dataclass to decode into
+        TypeHooks: Conversions applied to fields of the types they are keyed by
+        lazy: If true large nested fields are decoded on first access, see utils.lazy
+    """
+    decode = get_decoder(data_class, TypeHooks, lazy)
+    if current_call() is not None:
+        return timed("dataclass_decode", lambda: _parse(data, decode))
+    return _parse(data, decode)
+
+
+def _parse(data, decode):
     if isinstance(data, list):
-        result = [
-            from_dict(
-                data_class=data_class,
-                data=d,
-                config=Config(type_hooks=TypeHooks),
-            )
-            for d in data
-        ]
-        return result
+        return [decode(d) for d in data]
     else:
-        return from_dict(
-            data_class=data_class,
-            data=data,
-            config=Config(type_hooks=TypeHooks),
-        )
+        return decode(data)
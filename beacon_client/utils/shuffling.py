@@ -0,0 +1,283 @@
+"""
+Local computation of attestation committees and block proposers, following the phase0 spec
+(compute_shuffled_index, compute_committee, compute_proposer_index) and the electra change to proposer
+selection. Requires numpy.
+The committee shuffle runs every swap-or-not round over the whole index array at once instead of
+shuffling one index at a time, so an epoch costs 90 vectorized rounds and a few hundred thousand hashes.
+"""
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import List, Union
+import numpy as np
+from .columnar import ValidatorColumns
+from .committees import EpochCommittees
+from .errors import UnsupportedForkError
+from .types import (
+    Epoch,
+    Root,
+    Slot,
+    ValidatorIndex,
+    DOMAIN_BEACON_ATTESTER,
+    DOMAIN_BEACON_PROPOSER,
+    MAX_COMMITTEES_PER_SLOT,
+    MAX_EFFECTIVE_BALANCE,
+    MAX_EFFECTIVE_BALANCE_ELECTRA,
+    MIN_SEED_LOOKAHEAD,
+    SHUFFLE_ROUND_COUNT,
+    SLOTS_PER_EPOCH,
+    TARGET_COMMITTEE_SIZE,
+)
+
+MAX_RANDOM_BYTE = 2**8 - 1
+MAX_RANDOM_VALUE = 2**16 - 1
+# in activation order, forks a node does not know of come after these
+FORKS = ("phase0", "altair", "bellatrix", "capella", "deneb", "electra", "fulu")
+
+
+def _bytes(value: Union[str, bytes]) -> bytes:
+    return bytes.fromhex(value[2:]) if isinstance(value, str) else value
+
+
+def get_seed(randao_mix: Union[str, bytes], epoch: Epoch, domain_type: str) -> bytes:
+    """
+    Seed of an epoch for a domain
+    Args:
+        randao_mix: Randao mix at the end of epoch - MIN_SEED_LOOKAHEAD - 1, see seed_epoch
+        epoch: Epoch the seed is for
+        domain_type: DOMAIN_BEACON_ATTESTER or DOMAIN_BEACON_PROPOSER
+    """
+    data = _bytes(domain_type) + int(epoch).to_bytes(8, "little") + _bytes(randao_mix)
+    return sha256(data).digest()
+
+
+def seed_epoch(epoch: Epoch) -> Epoch:
+    """
+    Epoch whose final randao mix seeds the shuffling of epoch
+    """
+    assert epoch > MIN_SEED_LOOKAHEAD, "seeds of the first epochs use the genesis mixes"
+    return Epoch(epoch - MIN_SEED_LOOKAHEAD - 1)
+
+
+def compute_shuffled_index(index: int, index_count: int, seed: bytes) -> int:
+    """
+    Position index moves to in the shuffled list, one index at a time as written in the spec
+    """
+    assert index < index_count
+    for current_round in range(SHUFFLE_ROUND_COUNT):
+        round_seed = seed + bytes([current_round])
+        pivot = int.from_bytes(sha256(round_seed).digest()[:8], "little") % index_count
+        flip = (pivot + index_count - index) % index_count
+        position = max(index, flip)
+        source = sha256(round_seed + (position // 256).to_bytes(4, "little")).digest()
+        byte = source[(position % 256) // 8]
+        if (byte >> (position % 8)) % 2:
+            index = flip
+    return index
+
+
+def _round_bits(round_seed: bytes, chunks: range) -> np.ndarray:
+    # the hash of chunk position // 256 holds the bit of position at bit position % 256,
+    # so the concatenated hashes read as one little endian bitfield indexed by position
+    source = b"".join(
+        sha256(round_seed + chunk.to_bytes(4, "little")).digest() for chunk in chunks
+    )
+    return np.unpackbits(np.frombuffer(source, dtype=np.uint8), bitorder="little")
+
+
+def shuffled_indices(index_count: int, seed: bytes) -> np.ndarray:
+    """
+    compute_shuffled_index(i, index_count, seed) for every i in range(index_count) at once
+    """
+    dtype = np.int32 if index_count < 2**31 else np.int64
+    values = np.arange(index_count, dtype=dtype)
+    if index_count <= 1:
+        return values
+    chunks = range((index_count + 255) // 256)
+    # a round swaps position i with flip(i) = (pivot - i) % index_count, which mirrors [0, pivot] and
+    # [pivot + 1, index_count) onto themselves. Applying the rounds to the list in reverse order leaves
+    # values[i] = compute_shuffled_index(i), with every round as two reversed slices and no gathers
+    for current_round in reversed(range(SHUFFLE_ROUND_COUNT)):
+        round_seed = seed + bytes([current_round])
+        pivot = int.from_bytes(sha256(round_seed).digest()[:8], "little") % index_count
+        # 0 where the pair keeps its order, all ones where it swaps
+        swaps = -_round_bits(round_seed, chunks).astype(dtype)
+        for start, end in ((0, pivot + 1), (pivot + 1, index_count)):
+            half = (end - start) // 2
+            middle = start + half
+            mirror = end - half
+            lower = values[start:middle]
+            # position end - 1 - k pairs with start + k and is the larger of the two, so its bit decides
+            upper = values[mirror:end][::-1]
+            difference = np.bitwise_xor(lower, upper)
+            difference &= swaps[mirror:end][::-1]
+            lower ^= difference
+            upper ^= difference
+    return values
+
+
+def committee_count_per_slot(active_count: int) -> int:
+    return max(
+        1,
+        min(
+            MAX_COMMITTEES_PER_SLOT,
+            active_count // SLOTS_PER_EPOCH // TARGET_COMMITTEE_SIZE,
+        ),
+    )
+
+
+def compute_committees(
+    active_indices: np.ndarray,
+    seed: bytes,
+    epoch: Epoch,
+    dependent_root: Union[Root, None] = None,
+) -> EpochCommittees:
+    """
+    Every committee of epoch
+    Args:
+        active_indices: Indices of the validators active in epoch in increasing order
+        seed: get_seed(mix, epoch, DOMAIN_BEACON_ATTESTER)
+        epoch: Epoch of the committees
+        dependent_root: Passed on to the EpochCommittees
+    """
+    count = len(active_indices)
+    members = np.asarray(active_indices)[shuffled_indices(count, seed)].tolist()
+    per_slot = committee_count_per_slot(count)
+    total = per_slot * SLOTS_PER_EPOCH
+    committees = []
+    for number in range(total):
+        slot, index = divmod(number, per_slot)
+        start = count * number // total
+        end = count * (number + 1) // total
+        committees.append((epoch * SLOTS_PER_EPOCH + slot, index, members[start:end]))
+    return EpochCommittees(committees, dependent_root)
+
+
+def fork_at_epoch(spec: dict, epoch: Epoch) -> str:
+    """
+    Name of the fork active in epoch
+    Args:
+        spec: Configuration of the node as returned by get_node_specification, only the *_FORK_EPOCH values are read
+        epoch: Epoch to look up
+    """
+    order = {fork: number for number, fork in enumerate(FORKS)}
+    scheduled = [("phase0", 0)]
+    for key, value in spec.items():
+        if key.endswith("_FORK_EPOCH") and int(value) <= epoch:
+            scheduled.append((key.removesuffix("_FORK_EPOCH").lower(), int(value)))
+    # forks scheduled at the same epoch, as on test networks, activate in fork order
+    fork, _ = max(scheduled, key=lambda item: (item[1], order.get(item[0], len(FORKS))))
+    return fork
+
+
+def _proposer_sampling(fork: str):
+    # (bytes per random value, largest random value, largest effective balance) of the proposer selection of fork
+    fork = fork.lower()
+    if fork in ("phase0", "altair", "bellatrix", "capella", "deneb"):
+        return 1, MAX_RANDOM_BYTE, MAX_EFFECTIVE_BALANCE
+    if fork == "electra":
+        return 2, MAX_RANDOM_VALUE, MAX_EFFECTIVE_BALANCE_ELECTRA
+    # from fulu on the proposers of an epoch are fixed an epoch in advance from the balances of an earlier state
+    raise UnsupportedForkError(fork)
+
+
+def compute_proposer_index(
+    active_indices: np.ndarray,
+    effective_balances: np.ndarray,
+    seed: bytes,
+    fork: str = "phase0",
+) -> ValidatorIndex:
+    """
+    Proposer sampled with probability proportional to effective balance.
+    Raises UnsupportedForkError for fulu and later forks
+    Args:
+        active_indices: Indices of the active validators in increasing order
+        effective_balances: Effective balance of every validator in active_indices
+        seed: sha256(get_seed(mix, epoch, DOMAIN_BEACON_PROPOSER) + slot as uint64)
+        fork: Fork of the slot, up to deneb a random byte is drawn per candidate, from electra a random uint16
+    """
+    size, max_random, max_balance = _proposer_sampling(fork)
+    per_hash = 32 // size
+    total = len(active_indices)
+    assert total > 0, "no active validators"
+    i = 0
+    while True:
+        position = compute_shuffled_index(i % total, total, seed)
+        random_bytes = sha256(seed + (i // per_hash).to_bytes(8, "little")).digest()
+        start = i % per_hash * size
+        end = start + size
+        random_value = int.from_bytes(random_bytes[start:end], "little")
+        balance = int(effective_balances[position])
+        if balance * max_random >= max_balance * random_value:
+            return ValidatorIndex(int(active_indices[position]))
+        i += 1
+
+
+def compute_proposers(
+    active_indices: np.ndarray,
+    effective_balances: np.ndarray,
+    randao_mix: Union[str, bytes],
+    epoch: Epoch,
+    fork: str = "phase0",
+) -> List[ValidatorIndex]:
+    """
+    Proposer of every slot of epoch, see compute_proposer_index
+    """
+    epoch_seed = get_seed(randao_mix, epoch, DOMAIN_BEACON_PROPOSER)
+    start = epoch * SLOTS_PER_EPOCH
+    return [
+        compute_proposer_index(
+            active_indices,
+            effective_balances,
+            sha256(epoch_seed + slot.to_bytes(8, "little")).digest(),
+            fork,
+        )
+        for slot in range(start, start + SLOTS_PER_EPOCH)
+    ]
+
+
+@dataclass(slots=True)
+class EpochShuffling:
+    epoch: Epoch
+    committees: EpochCommittees
+    proposers: List[ValidatorIndex]  # proposer of every slot of the epoch in slot order
+
+    def proposer(self, slot: Slot) -> ValidatorIndex:
+        offset = slot - self.epoch * SLOTS_PER_EPOCH
+        assert 0 <= offset < SLOTS_PER_EPOCH, f"slot is not in epoch {self.epoch}"
+        return self.proposers[offset]
+
+
+def compute_shuffling(
+    validators: ValidatorColumns,
+    randao_mix: Union[str, bytes],
+    epoch: Epoch,
+    dependent_root: Union[Root, None] = None,
+    fork: str = "phase0",
+) -> EpochShuffling:
+    """
+    Committees and proposers of epoch
+    Args:
+        validators: Validators from a state at the start of epoch, as returned by
+            get_validators_from_state(columnar=True). Only those active in epoch are used
+        randao_mix: Randao mix at the end of seed_epoch(epoch)
+        epoch: Epoch to compute
+        dependent_root: Attester dependent root of epoch, stored on the EpochCommittees
+        fork: Fork active in epoch, see fork_at_epoch and compute_proposer_index
+    """
+    _proposer_sampling(fork)
+    active = validators.filter(validators.is_active(epoch))
+    order = np.argsort(active.index, kind="stable")
+    active_indices = active.index[order]
+    effective_balances = active.effective_balance[order]
+    return EpochShuffling(
+        epoch=epoch,
+        committees=compute_committees(
+            active_indices,
+            get_seed(randao_mix, epoch, DOMAIN_BEACON_ATTESTER),
+            epoch,
+            dependent_root,
+        ),
+        proposers=compute_proposers(
+            active_indices, effective_balances, randao_mix, epoch, fork
+        ),
+    )
@@ -0,0 +1,172 @@
+"""
+Coalescing of identical concurrent requests: while a call for a key is in flight every other caller
+for the same key waits for it and receives the same result instead of sending its own request.
+coalesce_methods applies this to the get_* methods of a client, so the decoded result is shared as well.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from typing import Awaitable, Callable, Hashable, TypeVar, Union
+from .cache import freeze
+from .instrumentation import current_call
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread safe coalescing for blocking callables.
+    `calls` counts callers, `deduplicated` counts those that were served by another caller's fetch.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.deduplicated = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run fn unless a call with the same key is already in flight, in which case wait for its result.
+        Exceptions are raised in every waiter.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.deduplicated += 1
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as error:
+                call.error = error
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing for coroutines running on one event loop, see SingleFlight
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.deduplicated = 0
+        self._calls = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            # shield so a cancelled waiter does not cancel the fetch shared with the others
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(fn())
+        self._calls[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+
+def _key(name: str, args: tuple, kwargs: dict) -> Union[Hashable, None]:
+    key = (name, freeze(args), freeze(kwargs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _coalesced(name: str, method, inflight: SingleFlight):
+    @functools.wraps(method)
+    def coalesced(*args, **kwargs):
+        key = _key(name, args, kwargs)
+        if key is None:
+            return method(*args, **kwargs)
+        record = current_call()
+        if record is None:
+            return inflight.do(key, lambda: method(*args, **kwargs))
+        # time spent waiting for another caller's call counts as queue wait
+        led = False
+
+        def lead():
+            nonlocal led
+            led = True
+            return method(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return inflight.do(key, lead)
+        finally:
+            if not led:
+                record.add("queue_wait", time.perf_counter() - start)
+
+    return coalesced
+
+
+def _coalesced_async(name: str, method, inflight: AsyncSingleFlight):
+    @functools.wraps(method)
+    async def coalesced(*args, **kwargs):
+        key = _key(name, args, kwargs)
+        if key is None:
+            return await method(*args, **kwargs)
+        record = current_call()
+        if record is None:
+            return await inflight.do(key, lambda: method(*args, **kwargs))
+        led = False
+
+        def lead():
+            nonlocal led
+            led = True
+            return method(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return await inflight.do(key, lead)
+        finally:
+            if not led:
+                record.add("queue_wait", time.perf_counter() - start)
+
+    return coalesced
+
+
+def coalesce_methods(client, inflight: Union[SingleFlight, AsyncSingleFlight]):
+    """
+    Wrap the get_* methods of a client so identical concurrent calls share one call and its decoded result.
+    Methods returning iterators are left as they are. Shared results must not be mutated.
+    """
+    for name in dir(type(client)):
+        if not name.startswith("get_"):
+            continue
+        method = getattr(client, name)
+        if inspect.isgeneratorfunction(method) or inspect.isasyncgenfunction(method):
+            continue
+        if inspect.iscoroutinefunction(method):
+            setattr(client, name, _coalesced_async(name, method, inflight))
+        else:
+            setattr(client, name, _coalesced(name, method, inflight))
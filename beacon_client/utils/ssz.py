@@ -0,0 +1,747 @@
+"""
+Minimal SSZ (Simple Serialize) support for the containers in types.py.
+Values are decoded straight from a memoryview over the response buffer and produce the same dataclasses,
+hex strings and ints as the json path so both representations compare equal.
+Only the bellatrix block layout is described since that is the layout the dataclasses in types.py follow,
+blocks of other forks are rejected with UnsupportedForkError.
+Like utils.parsing one decode function is generated per container, reading every fixed size basic field,
+nested fixed size containers included, with a single struct unpack.
+"""
+import struct
+from dataclasses import fields
+from typing import Union
+from . import bitfields
+from .errors import UnsupportedForkError
+from .lazy import lazy_constructor
+from .parsing import _fills_slots
+from .transactions import TransactionList, _offset_table
+from .types import (
+    MAX_PROPOSER_SLASHINGS,
+    MAX_ATTESTER_SLASHINGS,
+    MAX_ATTESTATIONS,
+    MAX_DEPOSITS,
+    MAX_VOLUNTARY_EXITS,
+    MAX_VALIDATORS_PER_COMMITTEE,
+    SYNC_COMMITTEE_SIZE,
+    Checkpoint,
+    AttestationData,
+    IndexedAttestation,
+    Eth1Data,
+    DepositData,
+    BeaconBlockHeader,
+    AttesterSlashing,
+    Attestation,
+    Deposit,
+    VoluntaryExit,
+    SignedBeaconBlockHeader,
+    ProposerSlashing,
+    SignedVoluntaryExit,
+    SyncAggregate,
+    ExecutionPayload,
+    BeaconBlockBody,
+    BeaconBlock,
+    SignedBeaconBlock,
+)
+
+BYTES_PER_LENGTH_OFFSET = 4
+DEPOSIT_CONTRACT_TREE_DEPTH = 32
+MAX_BYTES_PER_TRANSACTION = 2**30
+MAX_TRANSACTIONS_PER_PAYLOAD = 2**20
+MAX_EXTRA_DATA_BYTES = 32
+# values of the Eth-Consensus-Version header whose block layout is described here
+SSZ_VERSIONS = frozenset({"bellatrix"})
+
+
+class SSZBytes(bytes):
+    """
+    SSZ response body together with the fork named by its Eth-Consensus-Version header,
+    version is None when the node sent no header
+    """
+
+    def __new__(cls, data: Union[bytes, bytearray, memoryview], version=None):
+        value = super().__new__(cls, data)
+        value.version = version
+        return value
+
+
+def is_supported_version(version: Union[str, None]) -> bool:
+    """
+    Whether blocks of the fork named by an Eth-Consensus-Version header can be decoded,
+    a missing header is taken to mean the bellatrix layout
+    """
+    return version is None or version.lower() in SSZ_VERSIONS
+
+
+def _offset(view: memoryview, position: int) -> int:
+    end = position + BYTES_PER_LENGTH_OFFSET
+    return int.from_bytes(view[position:end], "little")
+
+
+def _offsets(view: memoryview):
+    # offsets of the elements of a list of variable size elements followed by its end
+    first = _offset(view, 0)
+    assert first % BYTES_PER_LENGTH_OFFSET == 0, "invalid offset"
+    assert 0 < first <= len(view), "invalid offset"
+    offsets = _offset_table(view[:first])
+    offsets.append(len(view))
+    assert all(
+        start <= end for start, end in zip(offsets, offsets[1:])
+    ), "invalid offset"
+    return offsets
+
+
+def _split_fixed(decode, size: int, view: memoryview) -> list:
+    bounds = zip(range(0, len(view), size), range(size, len(view) + 1, size))
+    return [decode(view[start:end]) for start, end in bounds]
+
+
+class _DecoderSource:
+    """
+    Namespace of a generated decode function, the counterpart of utils.parsing._DecoderBuilder for SSZ
+    """
+
+    def __init__(self):
+        self.namespace = {"_from_bytes": int.from_bytes, "_offsets": _offsets}
+        self.locals = 0
+        # (position, struct format) of the fields read by the unpack at the top of the function
+        self.layout = []
+
+    def local(self) -> str:
+        self.locals += 1
+        return f"c{self.locals}"
+
+    def unpack(self, position: int, struct_format: str) -> str:
+        """
+        Expression for the value of struct_format at position in v, positions must be given in order
+        """
+        self.layout.append((position, struct_format))
+        return f"t[{len(self.layout) - 1}]"
+
+    def unpack_statement(self) -> str:
+        if not self.layout:
+            return ""
+        layout = "<"
+        end = 0
+        for position, struct_format in self.layout:
+            if position > end:
+                layout += f"{position - end}x"
+            layout += struct_format
+            end = position + struct.calcsize("<" + struct_format)
+        return f"    t = {self.name(struct.Struct(layout).unpack_from)}(v)\n"
+
+    def name(self, value) -> str:
+        name = f"_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def compile(self, source: str):
+        exec(source, self.namespace)
+        return self.namespace["decode"]
+
+
+class SSZType:
+    # number of bytes for fixed size types, None for variable size types
+    fixed_size: Union[int, None] = None
+    # struct format of basic types that generated decoders read with struct instead of slicing
+    struct_format: Union[str, None] = None
+    _decoder = None
+
+    def decode(self, view: memoryview):
+        raise NotImplementedError
+
+    def decode_lazy(self, view: memoryview):
+        """
+        Like decode but containers are returned as lazy objects over view, see utils.lazy
+        """
+        return self.decode(view)
+
+    def encode(self, value) -> bytes:
+        raise NotImplementedError
+
+    def compiled(self):
+        """
+        Function decoding a memoryview into this type, generated on first use for composite types
+        """
+        if self._decoder is None:
+            self._decoder = self._build(_DecoderSource())
+        return self._decoder
+
+    def _build(self, source: _DecoderSource):
+        return self.decode
+
+    def expression(self, var: str, source: _DecoderSource) -> str:
+        """
+        Python expression decoding the view named var, inlined into the decoder of the enclosing type.
+        var is evaluated exactly once and its length is already checked against fixed_size
+        """
+        return f"{source.name(self.compiled())}({var})"
+
+    def unpacked(self, var: str) -> str:
+        """
+        Python expression converting var, the value read with struct_format, into this type
+        """
+        return var
+
+
+class Uint(SSZType):
+    def __init__(self, size: int):
+        self.fixed_size = size
+        self.struct_format = {1: "B", 2: "H", 4: "I", 8: "Q"}.get(size, f"{size}s")
+
+    def decode(self, view: memoryview) -> int:
+        assert len(view) == self.fixed_size, "invalid uint length"
+        return int.from_bytes(view, "little")
+
+    def unpacked(self, var: str) -> str:
+        if self.struct_format.endswith("s"):
+            return f"_from_bytes({var}, 'little')"
+        return var
+
+    def encode(self, value: int) -> bytes:
+        return int(value).to_bytes(self.fixed_size, "little")
+
+
+class Boolean(SSZType):
+    fixed_size = 1
+
+    def decode(self, view: memoryview) -> bool:
+        assert view[0] in (0, 1), "invalid boolean"
+        return view[0] == 1
+
+    def encode(self, value: bool) -> bytes:
+        return b"\x01" if value else b"\x00"
+
+
+class ByteVector(SSZType):
+    """
+    Fixed length bytes, decoded as a 0x prefixed hex string like the json api
+    """
+
+    def __init__(self, size: int):
+        self.fixed_size = size
+        self.struct_format = f"{size}s"
+
+    def decode(self, view: memoryview) -> str:
+        assert len(view) == self.fixed_size, "invalid byte vector length"
+        return "0x" + view.hex()
+
+    def unpacked(self, var: str) -> str:
+        return f"('0x' + {var}.hex())"
+
+    def encode(self, value: str) -> bytes:
+        return bytes.fromhex(value[2:])
+
+
+class ByteList(SSZType):
+    """
+    Variable length bytes, decoded as a 0x prefixed hex string like the json api
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def decode(self, view: memoryview) -> str:
+        assert len(view) <= self.limit, "byte list exceeds limit"
+        return "0x" + view.hex()
+
+    def encode(self, value: str) -> bytes:
+        return bytes.fromhex(value[2:])
+
+
+class Bitvector(SSZType):
+    def __init__(self, length: int):
+        self.length = length
+        self.fixed_size = (length + 7) // 8
+
+    def decode(self, view: memoryview) -> bitfields.Bitvector:
+        return bitfields.Bitvector.from_bytes(view, self.length)
+
+    def encode(self, value: bitfields.Bitvector) -> bytes:
+        return value.to_bytes()
+
+
+class Bitlist(SSZType):
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def decode(self, view: memoryview) -> bitfields.Bitlist:
+        return self.compiled()(view)
+
+    def encode(self, value: bitfields.Bitlist) -> bytes:
+        return value.to_bytes()
+
+    def _build(self, source: _DecoderSource):
+        bitlist = source.name(bitfields.Bitlist)
+        return source.compile(
+            "def decode(v):\n"
+            "    assert len(v) > 0 and v[-1] != 0, 'bitlist is missing its length bit'\n"
+            "    value = _from_bytes(v, 'little')\n"
+            "    length = value.bit_length() - 1\n"
+            f"    assert length <= {self.limit}, 'bitlist exceeds limit'\n"
+            f"    return {bitlist}(value ^ 1 << length, length)\n"
+        )
+
+
+def _fixed_items(element: SSZType, length, source: _DecoderSource) -> str:
+    # list comprehension decoding v, length bytes of back to back fixed size elements
+    if element.struct_format is not None:
+        items = source.name(struct.Struct("<" + element.struct_format).iter_unpack)
+        return f"[{element.unpacked('x')} for x, in {items}(v)]"
+    size = element.fixed_size
+    decode = element.expression(f"v[i:i + {size}]", source)
+    return f"[{decode} for i in range(0, {length}, {size})]"
+
+
+class Vector(SSZType):
+    def __init__(self, element: SSZType, length: int):
+        assert element.fixed_size is not None, "only fixed size vector elements"
+        self.element = element
+        self.length = length
+        self.fixed_size = element.fixed_size * length
+
+    def decode(self, view: memoryview, lazy: bool = False) -> list:
+        if not lazy:
+            return self.compiled()(view)
+        assert len(view) == self.fixed_size, "invalid vector length"
+        return _split_fixed(self.element.decode_lazy, self.element.fixed_size, view)
+
+    def _build(self, source: _DecoderSource):
+        items = _fixed_items(self.element, self.fixed_size, source)
+        return source.compile(
+            "def decode(v):\n"
+            f"    assert len(v) == {self.fixed_size}, 'invalid vector length'\n"
+            f"    return {items}\n"
+        )
+
+    def decode_lazy(self, view: memoryview) -> list:
+        return self.decode(view, lazy=True)
+
+    def encode(self, value: list) -> bytes:
+        assert len(value) == self.length, "invalid vector length"
+        return b"".join(self.element.encode(item) for item in value)
+
+
+class List(SSZType):
+    def __init__(self, element: SSZType, limit: int):
+        self.element = element
+        self.limit = limit
+
+    def decode(self, view: memoryview, lazy: bool = False) -> list:
+        if not lazy:
+            return self.compiled()(view)
+        if len(view) == 0:
+            return []
+        decode = self.element.decode_lazy
+        size = self.element.fixed_size
+        if size is not None:
+            assert len(view) % size == 0, "invalid list length"
+            items = _split_fixed(decode, size, view)
+        else:
+            offsets = _offsets(view)
+            items = [
+                decode(view[start:end]) for start, end in zip(offsets, offsets[1:])
+            ]
+        assert len(items) <= self.limit, "list exceeds limit"
+        return items
+
+    def _build(self, source: _DecoderSource):
+        size = self.element.fixed_size
+        if size is not None:
+            return source.compile(
+                "def decode(v):\n"
+                "    n = len(v)\n"
+                f"    assert n % {size} == 0, 'invalid list length'\n"
+                f"    assert n <= {size * self.limit}, 'list exceeds limit'\n"
+                f"    return {_fixed_items(self.element, 'n', source)}\n"
+            )
+        element = self.element.expression("v[s:e]", source)
+        return source.compile(
+            "def decode(v):\n"
+            "    if len(v) == 0:\n"
+            "        return []\n"
+            "    o = _offsets(v)\n"
+            f"    assert len(o) <= {self.limit + 1}, 'list exceeds limit'\n"
+            f"    return [{element} for s, e in zip(o, o[1:])]\n"
+        )
+
+    def decode_lazy(self, view: memoryview) -> list:
+        return self.decode(view, lazy=True)
+
+    def encode(self, value: list) -> bytes:
+        parts = [self.element.encode(item) for item in value]
+        if self.element.fixed_size is not None:
+            return b"".join(parts)
+        offsets = []
+        position = len(parts) * BYTES_PER_LENGTH_OFFSET
+        for part in parts:
+            offsets.append(position.to_bytes(BYTES_PER_LENGTH_OFFSET, "little"))
+            position += len(part)
+        return b"".join(offsets + parts)
+
+
+class Transactions(List):
+    """
+    The transactions of an execution payload, decoded as hex strings like the json api
+    or with binary as a TransactionList that shares the input buffer
+    """
+
+    def __init__(self, binary: bool = False):
+        super().__init__(
+            ByteList(MAX_BYTES_PER_TRANSACTION), MAX_TRANSACTIONS_PER_PAYLOAD
+        )
+        self.binary = binary
+
+    def decode(self, view: memoryview, lazy: bool = False):
+        if not self.binary:
+            return super().decode(view, lazy)
+        return self._decode_binary(view)
+
+    def _decode_binary(self, view: memoryview) -> TransactionList:
+        transactions = TransactionList.from_ssz(view)
+        assert len(transactions) <= self.limit, "list exceeds limit"
+        return transactions
+
+    def _build(self, source: _DecoderSource):
+        if self.binary:
+            return self._decode_binary
+        return super()._build(source)
+
+    def encode(self, value) -> bytes:
+        if isinstance(value, TransactionList):
+            return value.to_ssz()
+        return super().encode(value)
+
+
+class Container(SSZType):
+    """
+    SSZ layout of a dataclass. Field types are given in the same order as the dataclass fields
+    """
+
+    def __init__(self, data_class, **field_types: SSZType):
+        assert list(field_types) == [
+            field.name for field in fields(data_class)
+        ], f"field order must match {data_class.__name__}"
+        self.data_class = data_class
+        self.field_types = list(field_types.items())
+        sizes = [ssz_type.fixed_size for ssz_type in field_types.values()]
+        if None not in sizes:
+            self.fixed_size = sum(sizes)
+        self._fixed_part_size = sum(
+            BYTES_PER_LENGTH_OFFSET if size is None else size for size in sizes
+        )
+        self._lazy = None
+
+    def _field_views(self, view: memoryview) -> dict:
+        # splits the container into the bytes of each field, reading only the offsets
+        assert len(view) >= self._fixed_part_size, "container is too short"
+        position = 0
+        views = {}
+        variable = []
+        for name, ssz_type in self.field_types:
+            if ssz_type.fixed_size is None:
+                variable.append((name, _offset(view, position)))
+                position += BYTES_PER_LENGTH_OFFSET
+            else:
+                end = position + ssz_type.fixed_size
+                views[name] = view[position:end]
+                position = end
+        ends = [offset for _, offset in variable[1:]] + [len(view)]
+        for (name, start), end in zip(variable, ends):
+            assert position <= start <= end <= len(view), "invalid offset"
+            views[name] = view[start:end]
+        return views
+
+    def decode(self, view: memoryview):
+        return self.compiled()(view)
+
+    def _build(self, source: _DecoderSource):
+        fixed_part = self._fixed_part_size
+        if self.fixed_size is not None:
+            check = f"    assert len(v) == {fixed_part}, 'invalid container length'\n"
+            body = self._inline(source, 0, "c")
+            return source.compile(
+                f"def decode(v):\n{check}{source.unpack_statement()}{body}    return c\n"
+            )
+        check = (
+            "    n = len(v)\n"
+            f"    assert n >= {fixed_part}, 'container is too short'\n"
+        )
+        body = ""
+        position = 0
+        variable = []
+        values = {}
+        for name, ssz_type in self.field_types:
+            if ssz_type.fixed_size is None:
+                offset = f"o{len(variable)}"
+                body += f"    {offset} = {source.unpack(position, 'I')}\n"
+                variable.append((name, ssz_type, offset))
+                position += BYTES_PER_LENGTH_OFFSET
+            else:
+                body += self._field(source, name, ssz_type, position, values)
+                position += ssz_type.fixed_size
+        # the first variable field starts right after the fixed part and each one ends where the next starts
+        offsets = [offset for _, _, offset in variable]
+        chain = " <= ".join(offsets + ["n"])
+        body += f"    assert o0 == {fixed_part} and {chain}, 'invalid offset'\n"
+        for (name, ssz_type, start), end in zip(variable, offsets[1:] + ["n"]):
+            values[name] = ssz_type.expression(f"v[{start}:{end}]", source)
+        body += self._construct(source, values, "c")
+        return source.compile(
+            f"def decode(v):\n{check}{source.unpack_statement()}{body}    return c\n"
+        )
+
+    def _field(self, source, name: str, ssz_type: SSZType, position: int, values):
+        # fixed size containers are decoded by statements inlined into the enclosing decoder
+        if isinstance(ssz_type, Container):
+            target = source.local()
+            values[name] = target
+            return ssz_type._inline(source, position, target)
+        if ssz_type.struct_format is not None:
+            values[name] = ssz_type.unpacked(
+                source.unpack(position, ssz_type.struct_format)
+            )
+            return ""
+        end = position + ssz_type.fixed_size
+        values[name] = ssz_type.expression(f"v[{position}:{end}]", source)
+        return ""
+
+    def _inline(self, source: _DecoderSource, position: int, target: str) -> str:
+        """
+        Statements decoding this fixed size container from v at position into the local named target
+        """
+        body = ""
+        values = {}
+        for name, ssz_type in self.field_types:
+            body += self._field(source, name, ssz_type, position, values)
+            position += ssz_type.fixed_size
+        return body + self._construct(source, values, target)
+
+    def _construct(self, source: _DecoderSource, values: dict, target: str) -> str:
+        cls = source.name(self.data_class)
+        if not _fills_slots(self.data_class):
+            arguments = ", ".join(f"{name}={value}" for name, value in values.items())
+            return f"    {target} = {cls}({arguments})\n"
+        # see utils.parsing, setting the slots directly skips the frozen dataclass __init__
+        body = f"    {target} = {source.name(object.__new__)}({cls})\n"
+        for name, value in values.items():
+            setter = source.name(vars(self.data_class)[name].__set__)
+            body += f"    {setter}({target}, {value})\n"
+        return body
+
+    def decode_lazy(self, view: memoryview):
+        if self._lazy is None:
+            self._lazy = lazy_constructor(
+                self.data_class,
+                {
+                    name: _field_loader(name, ssz_type)
+                    for name, ssz_type in self.field_types
+                },
+            )
+        return self._lazy(self._field_views(view))
+
+    def encode(self, value) -> bytes:
+        fixed = []
+        variable = []
+        for name, ssz_type in self.field_types:
+            encoded = ssz_type.encode(getattr(value, name))
+            if ssz_type.fixed_size is None:
+                fixed.append(None)
+                variable.append(encoded)
+            else:
+                fixed.append(encoded)
+        position = self._fixed_part_size
+        parts = []
+        remaining = iter(variable)
+        for part in fixed:
+            if part is None:
+                parts.append(position.to_bytes(BYTES_PER_LENGTH_OFFSET, "little"))
+                position += len(next(remaining))
+            else:
+                parts.append(part)
+        return b"".join(parts + variable)
+
+
+def _field_loader(name: str, ssz_type: SSZType):
+    decode = ssz_type.decode_lazy
+    return lambda views: decode(views[name])
+
+
+uint64 = Uint(8)
+uint256 = Uint(32)
+Bytes20 = ByteVector(20)
+Bytes32 = ByteVector(32)
+Bytes48 = ByteVector(48)
+Bytes96 = ByteVector(96)
+
+CheckpointSSZ = Container(Checkpoint, epoch=uint64, root=Bytes32)
+AttestationDataSSZ = Container(
+    AttestationData,
+    slot=uint64,
+    index=uint64,
+    beacon_block_root=Bytes32,
+    source=CheckpointSSZ,
+    target=CheckpointSSZ,
+)
+IndexedAttestationSSZ = Container(
+    IndexedAttestation,
+    attesting_indices=List(uint64, MAX_VALIDATORS_PER_COMMITTEE),
+    data=AttestationDataSSZ,
+    signature=Bytes96,
+)
+Eth1DataSSZ = Container(
+    Eth1Data, deposit_root=Bytes32, deposit_count=uint64, block_hash=Bytes32
+)
+DepositDataSSZ = Container(
+    DepositData,
+    pubkey=Bytes48,
+    withdrawal_credentials=Bytes32,
+    amount=uint64,
+    signature=Bytes96,
+)
+BeaconBlockHeaderSSZ = Container(
+    BeaconBlockHeader,
+    slot=uint64,
+    proposer_index=uint64,
+    parent_root=Bytes32,
+    state_root=Bytes32,
+    body_root=Bytes32,
+)
+SignedBeaconBlockHeaderSSZ = Container(
+    SignedBeaconBlockHeader, message=BeaconBlockHeaderSSZ, signature=Bytes96
+)
+ProposerSlashingSSZ = Container(
+    ProposerSlashing,
+    signed_header_1=SignedBeaconBlockHeaderSSZ,
+    signed_header_2=SignedBeaconBlockHeaderSSZ,
+)
+AttesterSlashingSSZ = Container(
+    AttesterSlashing,
+    attestation_1=IndexedAttestationSSZ,
+    attestation_2=IndexedAttestationSSZ,
+)
+AttestationSSZ = Container(
+    Attestation,
+    aggregation_bits=Bitlist(MAX_VALIDATORS_PER_COMMITTEE),
+    data=AttestationDataSSZ,
+    signature=Bytes96,
+)
+DepositSSZ = Container(
+    Deposit,
+    proof=Vector(Bytes32, DEPOSIT_CONTRACT_TREE_DEPTH + 1),
+    data=DepositDataSSZ,
+)
+VoluntaryExitSSZ = Container(VoluntaryExit, epoch=uint64, validator_index=uint64)
+SignedVoluntaryExitSSZ = Container(
+    SignedVoluntaryExit, message=VoluntaryExitSSZ, signature=Bytes96
+)
+SyncAggregateSSZ = Container(
+    SyncAggregate,
+    sync_committee_bits=Bitvector(SYNC_COMMITTEE_SIZE),
+    sync_committee_signature=Bytes96,
+)
+
+
+def _block_containers(transactions: SSZType):
+    execution_payload = Container(
+        ExecutionPayload,
+        parent_hash=Bytes32,
+        fee_recipient=Bytes20,
+        state_root=Bytes32,
+        receipts_root=Bytes32,
+        logs_bloom=ByteVector(256),
+        prev_randao=Bytes32,
+        block_number=uint64,
+        gas_limit=uint64,
+        gas_used=uint64,
+        timestamp=uint64,
+        extra_data=ByteList(MAX_EXTRA_DATA_BYTES),
+        base_fee_per_gas=uint256,
+        block_hash=Bytes32,
+        transactions=transactions,
+    )
+    body = Container(
+        BeaconBlockBody,
+        randao_reveal=Bytes96,
+        eth1_data=Eth1DataSSZ,
+        graffiti=Bytes32,
+        proposer_slashings=List(ProposerSlashingSSZ, MAX_PROPOSER_SLASHINGS),
+        attester_slashings=List(AttesterSlashingSSZ, MAX_ATTESTER_SLASHINGS),
+        attestations=List(AttestationSSZ, MAX_ATTESTATIONS),
+        deposits=List(DepositSSZ, MAX_DEPOSITS),
+        voluntary_exits=List(SignedVoluntaryExitSSZ, MAX_VOLUNTARY_EXITS),
+        sync_aggregate=SyncAggregateSSZ,
+        execution_payload=execution_payload,
+    )
+    block = Container(
+        BeaconBlock,
+        slot=uint64,
+        proposer_index=uint64,
+        parent_root=Bytes32,
+        state_root=Bytes32,
+        body=body,
+    )
+    signed_block = Container(SignedBeaconBlock, message=block, signature=Bytes96)
+    return execution_payload, body, block, signed_block
+
+
+(
+    ExecutionPayloadSSZ,
+    BeaconBlockBodySSZ,
+    BeaconBlockSSZ,
+    SignedBeaconBlockSSZ,
+) = _block_containers(Transactions())
+# the same layout with the transactions wrapped in a TransactionList over the input buffer
+SignedBeaconBlockBinarySSZ = _block_containers(Transactions(binary=True))[-1]
+
+
+def decode_signed_beacon_block(
+    data: Union[bytes, bytearray, memoryview],
+    lazy: bool = False,
+    binary_transactions: bool = False,
+    version: Union[str, None] = None,
+) -> SignedBeaconBlock:
+    """
+    Decode a SSZ encoded bellatrix SignedBeaconBlock, e.g. the body returned by
+    get_block_from_block_id(block_id, response_type="ssz")
+    Raises UnsupportedForkError for blocks of any other fork
+    Args:
+        data: SSZ bytes of the block
+        lazy: If true only the offsets are read and each field is decoded on first access, see utils.lazy.
+            The block then keeps data alive
+        binary_transactions: If true the execution payload transactions are a utils.transactions.TransactionList
+            over data instead of a list of hex strings, which copies none of the transaction bytes
+        version: Fork of the block as named by the Eth-Consensus-Version header,
+            taken from data when it is the SSZBytes returned by the client
+    """
+    if version is None:
+        version = getattr(data, "version", None)
+    if not is_supported_version(version):
+        raise UnsupportedForkError(version)
+    container = (
+        SignedBeaconBlockBinarySSZ if binary_transactions else SignedBeaconBlockSSZ
+    )
+    if lazy:
+        return container.decode_lazy(memoryview(data))
+    return container.decode(memoryview(data))
+
+
+def encode_signed_beacon_block(block: SignedBeaconBlock) -> bytes:
+    """
+    SSZ encode a bellatrix SignedBeaconBlock
+    Args:
+        block: The block to serialize
+    """
+    return SignedBeaconBlockSSZ.encode(block)
+
+
+def signed_beacon_block_slot(data: Union[bytes, bytearray, memoryview]) -> int:
+    """
+    The slot of a SSZ encoded SignedBeaconBlock without decoding the rest of the block
+    Args:
+        data: SSZ bytes of the block
+    """
+    view = memoryview(data)
+    # the message is the only variable size field so the first offset points at it and slot comes first
+    start = _offset(view, 0)
+    end = start + uint64.fixed_size
+    return uint64.decode(view[start:end])
@@ -0,0 +1,225 @@
+"""
+Persistent on-disk store for finalized blocks, headers and attestations.
+Raw response bodies are kept in a SQLite database keyed by slot and by root so a restarted
+process can answer historical queries without asking the beacon node again.
+Reads go through SQLite's memory-mapped I/O.
+"""
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Union
+from .cache import as_slot, is_root
+from .ssz import SSZBytes, signed_beacon_block_slot
+
+_ROUTES = [
+    ("blocks", re.compile(r"^/eth/v2/beacon/blocks/([^/]+)$")),
+    ("headers", re.compile(r"^/eth/v1/beacon/headers/([^/]+)$")),
+    ("attestations", re.compile(r"^/eth/v1/beacon/blocks/([^/]+)/attestations$")),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    body BLOB NOT NULL,
+    version TEXT
+);
+CREATE TABLE IF NOT EXISTS keys (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    body_id INTEGER NOT NULL REFERENCES bodies(id),
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+
+class StoreRoute(NamedTuple):
+    kind: str
+    identifier: str
+
+
+def _slot_key(slot: int) -> str:
+    return f"slot:{slot}"
+
+
+class BlockStore:
+    """
+    Write-through store used by BeaconChainAPI(store=BlockStore(path)).
+    Only responses for roots and finalized slots are written.
+    """
+
+    def __init__(self, path: Union[str, Path], mmap_size: int = 2**30):
+        """
+        Args:
+            path: SQLite database file, created if it does not exist
+            mmap_size: Bytes of the database file that are memory-mapped for reads
+        """
+        self.path = str(path)
+        self.mmap_size = mmap_size
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(bodies)")]
+        if "version" not in columns:
+            # stores written before the consensus version was kept
+            connection.execute("ALTER TABLE bodies ADD COLUMN version TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def route(path: str, accept: str) -> Union[StoreRoute, None]:
+        """
+        The kind of stored response and its block id for a request path, None if the path is not stored
+        """
+        for kind, pattern in _ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if accept == "application/octet-stream" and kind == "blocks":
+                return StoreRoute("blocks_ssz", match.group(1))
+            if accept == "application/json":
+                return StoreRoute(kind, match.group(1))
+        return None
+
+    @staticmethod
+    def _key(identifier) -> Union[str, None]:
+        if is_root(identifier):
+            return identifier.lower()
+        if identifier == "genesis":
+            return _slot_key(0)
+        slot = as_slot(identifier)
+        return None if slot is None else _slot_key(slot)
+
+    def get(self, kind: str, identifier) -> Union[bytes, None]:
+        """
+        The stored body for a root or slot, None if it has not been stored.
+        SSZ blocks are returned as SSZBytes with the consensus version they were stored with
+        """
+        key = self._key(identifier)
+        row = (
+            self._connection()
+            .execute(
+                "SELECT body, version FROM keys JOIN bodies ON bodies.id = keys.body_id"
+                " WHERE keys.kind = ? AND keys.key = ?",
+                (kind, key),
+            )
+            .fetchone()
+        )
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if kind == "blocks_ssz":
+            return SSZBytes(row[0], row[1])
+        return row[0]
+
+    def unverified_slot(
+        self, kind: str, identifier, body: bytes, finalized_slot: int
+    ) -> Union[int, None]:
+        """
+        The finalized slot of a block requested by root, whose canonical root has to be passed to put
+        before the block is also stored under its slot. None when no check is needed
+        """
+        if not is_root(identifier) or kind not in ("blocks", "blocks_ssz"):
+            return None
+        slot, _, _ = self._slot_and_root(kind, body)
+        return slot if slot <= finalized_slot else None
+
+    def put(
+        self,
+        kind: str,
+        identifier,
+        body: bytes,
+        finalized_slot: int,
+        canonical_root: Union[str, None] = None,
+    ):
+        """
+        Store a response body under the identifier it was requested with.
+        Headers are only stored once their slot is finalized, before that their canonical flag can change.
+        The root found in the body is added as an extra key, and the slot once it is finalized and the block is
+        known to be canonical: headers carry a canonical flag, blocks requested by root are compared with
+        canonical_root. An orphaned block at a finalized slot is kept under its root only.
+        Args:
+            kind: Element of [blocks, blocks_ssz, headers, attestations]
+            identifier: Root or slot the response was requested for
+            body: Raw response body, for SSZ blocks the SSZBytes whose version is stored alongside
+            finalized_slot: Latest slot known to be finalized
+            canonical_root: Root of the canonical block at the slot given by unverified_slot
+        """
+        slot, root, canonical = self._slot_and_root(kind, body)
+        if kind == "headers" and slot > finalized_slot:
+            # the canonical flag of a header changes with reorgs until its slot is finalized
+            return
+        keys = {self._key(identifier)}
+        if root is not None:
+            keys.add(root.lower())
+        if canonical is None and canonical_root is not None and is_root(identifier):
+            canonical = canonical_root.lower() == identifier.lower()
+        if slot is not None and slot <= finalized_slot and canonical:
+            keys.add(_slot_key(slot))
+        keys.discard(None)
+        if keys:
+            self._insert(kind, sorted(keys), body, getattr(body, "version", None))
+
+    def _insert(self, kind: str, keys: List[str], body: bytes, version):
+        connection = self._connection()
+        marks = ", ".join("?" * len(keys))
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # a body already stored under one of the keys is reused instead of written again
+                row = connection.execute(
+                    f"SELECT body_id FROM keys WHERE kind = ? AND key IN ({marks})",
+                    (kind, *keys),
+                ).fetchone()
+                if row is None:
+                    body_id = connection.execute(
+                        "INSERT INTO bodies (kind, body, version) VALUES (?, ?, ?)",
+                        (kind, bytes(body), version),
+                    ).lastrowid
+                    self.writes += 1
+                else:
+                    body_id = row[0]
+                connection.executemany(
+                    "INSERT OR IGNORE INTO keys (kind, key, body_id) VALUES (?, ?, ?)",
+                    [(kind, key, body_id) for key in keys],
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _slot_and_root(kind: str, body: bytes):
+        # slot, root and canonical flag found in a body, None where the body does not say
+        if kind == "blocks_ssz":
+            return signed_beacon_block_slot(body), None, None
+        if kind == "blocks":
+            data = json.loads(body)["data"]
+            return int(data["message"]["slot"]), None, None
+        if kind == "headers":
+            data = json.loads(body)["data"]
+            slot = int(data["header"]["message"]["slot"])
+            return slot, data["root"], data.get("canonical", False)
+        return None, None, None
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,127 @@
+"""
+Incremental decoding of the `{"data": [...]}` envelope used by the beacon api.
+Items of the data array are produced as soon as their bytes have arrived
+so memory is bounded by the chunk size and a single item instead of the whole response.
+"""
+import codecs
+import json
+import re
+from typing import Iterable, Iterator, List
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NEED_MORE = object()
+
+
+class JSONArrayStream:
+    """
+    Push parser yielding the elements of the array stored under `key` in a top level json object.
+    Other top level keys are parsed and discarded.
+    """
+
+    def __init__(self, key: str = "data"):
+        self.key = key
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._state = "start"
+
+    def feed(self, chunk: bytes) -> List:
+        """
+        Add the next chunk of the response body and return the items it completed
+        """
+        self._append(self._utf8.decode(chunk))
+        return self._parse(final=False)
+
+    def close(self) -> List:
+        """
+        Signal the end of the body and return any remaining items
+        """
+        self._append(self._utf8.decode(b"", final=True))
+        items = self._parse(final=True)
+        assert self._state == "end", "response body ended before the json was complete"
+        return items
+
+    def _append(self, text: str):
+        # drop everything already consumed so the buffer never holds more than one chunk and one partial item
+        consumed = self._position
+        self._buffer = self._buffer[consumed:] + text
+        self._position = 0
+
+    def _skip_whitespace(self) -> bool:
+        self._position = _WHITESPACE.match(self._buffer, self._position).end()
+        return self._position < len(self._buffer)
+
+    def _decode(self, final: bool):
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _NEED_MORE
+        # a number or literal that touches the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final:
+            return _NEED_MORE
+        self._position = end
+        return value
+
+    def _expect(self, characters: str) -> str:
+        character = self._buffer[self._position]
+        assert character in characters, f"unexpected {character!r} in json stream"
+        self._position += 1
+        return character
+
+    def _parse(self, final: bool) -> List:
+        items = []
+        while self._state != "end" and self._skip_whitespace():
+            if self._state == "start":
+                self._expect("{")
+                self._state = "key"
+            elif self._state == "key":
+                if self._buffer[self._position] in ",}":
+                    if self._expect(",}") == "}":
+                        self._state = "end"
+                    continue
+                start = self._position
+                key = self._decode(final)
+                if key is _NEED_MORE:
+                    break
+                if not self._skip_whitespace():
+                    self._position = start
+                    break
+                self._expect(":")
+                if key == self.key:
+                    if not self._skip_whitespace():
+                        self._position = start
+                        break
+                    self._expect("[")
+                    self._state = "array"
+                else:
+                    self._state = "value"
+            elif self._state == "value":
+                if self._decode(final) is _NEED_MORE:
+                    break
+                self._state = "key"
+            elif self._state == "array":
+                if self._buffer[self._position] in ",]":
+                    if self._expect(",]") == "]":
+                        self._state = "key"
+                    continue
+                item = self._decode(final)
+                if item is _NEED_MORE:
+                    break
+                items.append(item)
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "data") -> Iterator:
+    """
+    Yield the elements of the array under `key` from an iterable of response body chunks
+    Args:
+        chunks: Byte chunks of the json document, e.g. response.iter_content(chunk_size)
+        key: Top level key holding the array
+    """
+    stream = JSONArrayStream(key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
@@ -0,0 +1,147 @@
+"""
+Execution payload transactions held as one contiguous buffer and an array of offsets into it.
+A transaction is a memoryview over the buffer, so reading one copies nothing, and counts and sizes
+come from the offsets alone. Decoded from SSZ the buffer is the response body itself.
+"""
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterator, List, Union
+
+BYTES_PER_LENGTH_OFFSET = 4
+
+
+def _offset_table(data) -> array:
+    # SSZ offsets are little endian uint32
+    table = array("I")
+    assert table.itemsize == BYTES_PER_LENGTH_OFFSET
+    table.frombytes(data)
+    if sys.byteorder == "big":
+        table.byteswap()
+    return table
+
+
+@dataclass(slots=True, frozen=True)
+class TransactionSummary:
+    count: int
+    size: int  # total bytes of every transaction
+    largest: int  # bytes of the largest transaction
+
+
+class TransactionList:
+    """
+    Sequence of transactions where item i is a memoryview of the bytes of transaction i
+    """
+
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: Union[bytes, memoryview], offsets: array):
+        """
+        Args:
+            buffer: Bytes of every transaction back to back
+            offsets: Start of every transaction in buffer followed by the end of the last one
+        """
+        assert len(offsets) > 0 and offsets[-1] == len(buffer), "invalid offsets"
+        self.buffer = memoryview(buffer)
+        self.offsets = offsets
+
+    @classmethod
+    def from_hex(cls, transactions: List[str]) -> "TransactionList":
+        """
+        Build from the 0x prefixed hex strings of the json api
+        """
+        sizes = [(len(transaction) - 2) >> 1 for transaction in transactions]
+        offsets = array("Q", accumulate(sizes, initial=0))
+        buffer = bytes.fromhex(
+            "".join([transaction[2:] for transaction in transactions])
+        )
+        return cls(buffer, offsets)
+
+    @classmethod
+    def from_ssz(cls, view: memoryview) -> "TransactionList":
+        """
+        Wrap the SSZ encoding of List[Transaction] without copying it, the result keeps view alive
+        """
+        if len(view) == 0:
+            return cls(b"", array("Q", [0]))
+        first = int.from_bytes(view[:BYTES_PER_LENGTH_OFFSET], "little")
+        assert first % BYTES_PER_LENGTH_OFFSET == 0, "invalid transaction offset"
+        offsets = array("Q", (offset - first for offset in _offset_table(view[:first])))
+        offsets.append(len(view) - first)
+        assert all(
+            start <= end for start, end in zip(offsets, offsets[1:])
+        ), "invalid transaction offset"
+        return cls(view[first:], offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> memoryview:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+        return self.buffer[start:end]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        buffer = self.buffer
+        offsets = self.offsets
+        return (buffer[start:end] for start, end in zip(offsets, offsets[1:]))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TransactionList):
+            return NotImplemented
+        return self.offsets == other.offsets and self.buffer == other.buffer
+
+    def __repr__(self) -> str:
+        return f"TransactionList(count={len(self)}, size={self.size})"
+
+    @property
+    def size(self) -> int:
+        return self.offsets[-1]
+
+    def sizes(self) -> List[int]:
+        """
+        Bytes of every transaction
+        """
+        offsets = self.offsets
+        return [end - start for start, end in zip(offsets, offsets[1:])]
+
+    def summary(self) -> TransactionSummary:
+        return TransactionSummary(
+            count=len(self), size=self.size, largest=max(self.sizes(), default=0)
+        )
+
+    def hex(self) -> List[str]:
+        """
+        The 0x prefixed hex strings of the json api
+        """
+        return ["0x" + transaction.hex() for transaction in self]
+
+    def to_ssz(self) -> bytes:
+        """
+        SSZ encoding of the list, an offset table followed by the buffer
+        """
+        first = len(self) * BYTES_PER_LENGTH_OFFSET
+        table = array("I", (first + offset for offset in self.offsets[:-1]))
+        if sys.byteorder == "big":
+            table.byteswap()
+        return table.tobytes() + self.buffer.tobytes()
+
+
+def summarize_transactions(
+    transactions: Union[List[str], TransactionList]
+) -> TransactionSummary:
+    """
+    Count and size of a payload's transactions, from the hex strings of the json api without decoding them
+    or from a TransactionList
+    """
+    if isinstance(transactions, TransactionList):
+        return transactions.summary()
+    sizes = [(len(transaction) - 2) >> 1 for transaction in transactions]
+    return TransactionSummary(
+        count=len(sizes), size=sum(sizes), largest=max(sizes, default=0)
+    )
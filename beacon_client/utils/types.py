@@ -1,8 +1,8 @@
 from typing import NewType, Union, List
 from enum import Enum
 from dataclasses import dataclass
-from bitstring import BitArray
 from multiaddr import Multiaddr
+from .bitfields import Bitlist, Bitvector
 
 
 # CONSTANTS
@@ -19,13 +19,17 @@ INACTIVITY_SCORE_BIAS = 4
 INACTIVITY_SCORE_RECOVERY_RATE = 16
 EPOCHS_PER_SYNC_COMMITTEE_PERIOD = 2**8
 SYNC_COMMITTEE_SIZE = 2**9
+JUSTIFICATION_BITS_LENGTH = 4
+ATTESTATION_SUBNET_COUNT = 64
 
 # Gwei Parameters
 MIN_DEPOSIT_AMOUNT = 10**9
 MAX_EFFECTIVE_BALANCE = 32 * 10**9
+MAX_EFFECTIVE_BALANCE_ELECTRA = 2048 * 10**9
 EFFECTIVE_BALANCE_INCREMENT = 10**9
 
 # Time Parameters
+SECONDS_PER_SLOT = 12
 MIN_ATTESTATION_INCLUSION_DELAY = 1
 SLOTS_PER_EPOCH = 32
 MIN_SEED_LOOKAHEAD = 1
@@ -71,6 +75,10 @@ SYNC_REWARD_WEIGHT = 2
 PROPOSER_WEIGHT = 8
 WEIGHT_DENOMINATOR = 64
 
+# Domain Types
+DOMAIN_BEACON_PROPOSER = "0x00000000"
+DOMAIN_BEACON_ATTESTER = "0x01000000"
+
 # SIMPLE TYPES
 Slot = NewType("Slot", int)
 Epoch = NewType("Epoch", int)
@@ -82,7 +90,7 @@ Finalized = "finalized"
 StateId = Union[Slot, Root, Head, Genesis, Justified, Finalized]
 BlockId = Union[Slot, Root, Head, Genesis, Finalized]
 PeerId = NewType("PeerId", str)
-ParticipationFlags = NewType("ParticipationFlags", BitArray)
+ParticipationFlags = NewType("ParticipationFlags", int)
 
 
 CommitteeIndex = NewType("CommitteeIndex", int)
@@ -101,6 +109,11 @@ Hash32 = NewType("Hash32", str)
 ChainId = NewType("ChainId", int)
 ExecutionAddress = NewType("ExecutionAddress", str)
 Enr = NewType("Enr", str)
+Transaction = NewType("Transaction", str)  # opaque bytes, typed by the execution layer
+# Bitvector[N] fields, decoded with the N of the spec instead of every bit of their bytes
+JustificationBits = NewType("JustificationBits", Bitvector)
+SyncCommitteeBits = NewType("SyncCommitteeBits", Bitvector)
+AttestationSubnets = NewType("AttestationSubnets", Bitvector)
 
 
 class ValidatorStatus(Enum):
@@ -149,32 +162,33 @@ class HealthStatus:
 
 
 # COMPLEX TYPES
-@dataclass
+# every type is slotted, types whose fields are all hashable are also frozen
+@dataclass(frozen=True, slots=True)
 class Fork:
     previous_version: Version
     current_version: Version
     epoch: Epoch  # Epoch of latest fork
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ForkData:
     current_version: Version
     genesis_validators_root: Root
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DepositContract:
     chain_id: ChainId
     address: ExecutionAddress
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Checkpoint:
     epoch: Epoch
     root: Root
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Validator:
     pubkey: BLSPubkey
     withdrawal_credentials: Bytes32  # Commitment to pubkey for withdrawals
@@ -187,7 +201,7 @@ class Validator:
     withdrawable_epoch: Epoch
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttestationData:
     slot: Slot
     index: CommitteeIndex
@@ -198,42 +212,42 @@ class AttestationData:
     target: Checkpoint
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexedAttestation:
     attesting_indices: List[ValidatorIndex]
     data: AttestationData
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PendingAttestation:
-    aggregation_bits: BitArray
+    aggregation_bits: Bitlist
     data: AttestationData
     inclusion_delay: Slot
     proposer_index: ValidatorIndex
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Eth1Data:
     deposit_root: Root
     deposit_count: int
     block_hash: Bytes32
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoricalBatch:
     block_roots: List[Root]
     state_roots: List[Root]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DepositMessage:
     pubkey: BLSPubkey
     withdrawal_credentials: Bytes32
     amount: Gwei
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DepositData:
     pubkey: BLSPubkey
     withdrawal_credentials: Bytes32
@@ -241,7 +255,7 @@ class DepositData:
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BeaconBlockHeader:
     slot: Slot
     proposer_index: ValidatorIndex
@@ -250,68 +264,68 @@ class BeaconBlockHeader:
     body_root: Root
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SigningData:
     object_root: Root
     domain: Domain
 
 
-@dataclass
+@dataclass(slots=True)
 class AttesterSlashing:
     attestation_1: IndexedAttestation
     attestation_2: IndexedAttestation
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Attestation:
-    aggregation_bits: BitArray
+    aggregation_bits: Bitlist
     data: AttestationData
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(slots=True)
 class Deposit:
     proof: List[Bytes32]  # Merkle path to deposit root
     data: DepositData
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VoluntaryExit:
     epoch: Epoch  # Earliest epoch when voluntary exit can be processed
     validator_index: ValidatorIndex
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SignedBeaconBlockHeader:
     message: BeaconBlockHeader
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ProposerSlashing:
     signed_header_1: SignedBeaconBlockHeader
     signed_header_2: SignedBeaconBlockHeader
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SignedVoluntaryExit:
     message: VoluntaryExit
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncCommittee:
     pubkeys: List[BLSPubkey]
     aggregate_pubkey: BLSPubkey
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SyncAggregate:
-    sync_committee_bits: BitArray
+    sync_committee_bits: SyncCommitteeBits
     sync_committee_signature: BLSSignature
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPayload:
     parent_hash: Hash32
     fee_recipient: ExecutionAddress
@@ -327,10 +341,11 @@ class ExecutionPayload:
     base_fee_per_gas: Wei
     # Extra payload fields
     block_hash: Hash32
-    transactions: List  # transaction not defined in the spec
+    # a utils.transactions.TransactionList when decoded with binary_transactions
+    transactions: List[Transaction]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExecutionPayloadHeader:
     parent_hash: Hash32
     fee_recipient: ExecutionAddress
@@ -349,7 +364,7 @@ class ExecutionPayloadHeader:
     transactions_root: Root
 
 
-@dataclass
+@dataclass(slots=True)
 class BeaconBlockBody:
     randao_reveal: BLSSignature
     eth1_data: Eth1Data  # Eth1 data vote
@@ -365,7 +380,7 @@ class BeaconBlockBody:
     execution_payload: ExecutionPayload  # [New in Bellatrix]
 
 
-@dataclass
+@dataclass(slots=True)
 class BeaconBlock:
     slot: Slot
     proposer_index: ValidatorIndex
@@ -374,7 +389,7 @@ class BeaconBlock:
     body: BeaconBlockBody
 
 
-@dataclass
+@dataclass(slots=True)
 class BeaconState:
     # Versioning
     genesis_time: int
@@ -401,7 +416,7 @@ class BeaconState:
     previous_epoch_participation: List[ParticipationFlags]  # [Modified in Altair]
     current_epoch_participation: List[ParticipationFlags]  # [Modified in Altair]
     # Finality
-    justification_bits: BitArray  # Bit set for every recent justified epoch
+    justification_bits: JustificationBits  # Bit set for every recent justified epoch
     previous_justified_checkpoint: Checkpoint
     current_justified_checkpoint: Checkpoint
     finalized_checkpoint: Checkpoint
@@ -414,27 +429,27 @@ class BeaconState:
     latest_execution_payload_header: ExecutionPayloadHeader  # [New in Bellatrix]
 
 
-@dataclass
+@dataclass(slots=True)
 class SignedBeaconBlock:
     message: BeaconBlock
     signature: BLSSignature
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GenesisDetails:
     genesis_fork_version: Version
     genesis_time: int
     genesis_validators_root: Root
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FinalityCheckpoints:
     previous_justified: Checkpoint
     current_justified: Checkpoint
     finalized: Checkpoint
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ValidatorSummary:
     index: ValidatorIndex
     balance: Gwei
@@ -442,45 +457,45 @@ class ValidatorSummary:
     validator: Validator
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BalanceSummary:
     index: ValidatorIndex
     balance: Gwei
 
 
-@dataclass
+@dataclass(slots=True)
 class CommitteeSummary:
     index: CommitteeIndex
     slot: Slot
     validators: List[ValidatorIndex]
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncCommitteeSummary:
     validators: List[ValidatorIndex]
     validator_aggregates: List[List[ValidatorIndex]]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BeaconHeaderSummary:
     root: Root
     canonical: bool
     header: SignedBeaconBlockHeader
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PeerDescriptor:
     state: PeerState
     direction: ConnectionOrientation
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MetaData:
     seq_number: int
-    attnets: BitArray
+    attnets: AttestationSubnets
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkIdentity:
     peer_id: PeerId
     enr: Enr
@@ -489,7 +504,7 @@ class NetworkIdentity:
     metadata: MetaData
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PeerDescription:
     peer_id: PeerId
     enr: Enr
@@ -498,7 +513,7 @@ class PeerDescription:
     direction: ConnectionOrientation
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PeerSummary:
     disconnected: int
     connecting: int
@@ -506,14 +521,14 @@ class PeerSummary:
     disconnecting: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SyncStatus:
     head_slot: Slot
     sync_distance: int
     is_syncing: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StreamedHead:
     slot: Slot
     block: Root
@@ -524,16 +539,28 @@ class StreamedHead:
     execution_optimistic: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StreamedBlock:
     slot: Slot
     block: Root
     execution_optimistic: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StreamedCheckpoint:
     block: Root
     state: Root
     epoch: Epoch
     execution_optimistic: bool
+
+
+@dataclass(frozen=True, slots=True)
+class StreamedChainReorg:
+    slot: Slot
+    depth: int
+    old_head_block: Root
+    new_head_block: Root
+    old_head_state: Root
+    new_head_state: Root
+    epoch: Epoch
+    execution_optimistic: bool
@@ -0,0 +1,85 @@
+"""
+Attestation events per second through AttestationAggregator against decoding every event with parse_attestation.
+Events mimic a mainnet slot: 64 committees of ~440 validators, each validator's vote seen several times
+as single attestations and as parts of aggregates.
+
+    python benchmarks/bench_aggregation.py --slots 4
+"""
+import argparse
+import json
+import random
+import time
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.utils.aggregation import AttestationAggregator
+
+ROOT = "0x" + "ab" * 32
+COMMITTEES = 64
+COMMITTEE_SIZE = 440
+
+
+def _bitlist(participants, size=COMMITTEE_SIZE):
+    bits = 1 << size
+    for participant in participants:
+        bits |= 1 << participant
+    return "0x" + bits.to_bytes((size + 8) // 8, "little").hex()
+
+
+def slot_events(slot, aggregates_per_committee=16, rng=random.Random(0)):
+    events = []
+    for index in range(COMMITTEES):
+        data = {
+            "slot": str(slot),
+            "index": str(index),
+            "beacon_block_root": ROOT,
+            "source": {"epoch": "1", "root": ROOT},
+            "target": {"epoch": "2", "root": ROOT},
+        }
+        bitfields = [[member] for member in range(COMMITTEE_SIZE)]
+        bitfields += [
+            rng.sample(range(COMMITTEE_SIZE), COMMITTEE_SIZE // 2)
+            for _ in range(aggregates_per_committee)
+        ]
+        for participants in bitfields:
+            events.append(
+                json.dumps(
+                    {
+                        "aggregation_bits": _bitlist(participants),
+                        "data": data,
+                        "signature": "0x" + "00" * 96,
+                    }
+                )
+            )
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=4)
+    args = parser.parse_args()
+    events = [event for slot in range(args.slots) for event in slot_events(slot)]
+    print(f"{len(events):,} events over {args.slots} slots")
+
+    start = time.perf_counter()
+    for event in events:
+        BeaconChainAPI.parse_attestation(event)
+    elapsed = time.perf_counter() - start
+    print(f"{'parse_attestation':<24} {len(events) / elapsed:12,.0f} events/s")
+
+    start = time.perf_counter()
+    aggregator = AttestationAggregator()
+    summaries = []
+    for event in events:
+        summaries.extend(aggregator.add(event))
+    summaries.extend(aggregator.flush())
+    elapsed = time.perf_counter() - start
+    print(f"{'AttestationAggregator':<24} {len(events) / elapsed:12,.0f} events/s")
+    for summary in summaries[:1]:
+        print(
+            f"slot {summary.slot}: {len(summary.committees)} committees, "
+            f"{summary.unique} unique, {summary.redundant} redundant"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Parsing, popcount and union of mainnet sized aggregation bits with the Bitlist type against bitstring.BitArray.
+
+    python benchmarks/bench_bitfields.py --count 20000
+"""
+import argparse
+import random
+import time
+from functools import reduce
+
+from bitstring import BitArray
+
+from beacon_client.utils.bitfields import Bitlist
+
+COMMITTEE_SIZE = 440
+
+
+def bitlists(count, rng=random.Random(0)):
+    values = []
+    for _ in range(count):
+        bits = 1 << COMMITTEE_SIZE | rng.getrandbits(COMMITTEE_SIZE)
+        values.append("0x" + bits.to_bytes(COMMITTEE_SIZE // 8 + 1, "little").hex())
+    return values
+
+
+def _report(name, count, elapsed):
+    print(f"{name:<28} {count / elapsed:14,.0f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+    values = bitlists(args.count)
+
+    for name, parse in [("BitArray", BitArray), ("Bitlist", Bitlist.from_hex)]:
+        start = time.perf_counter()
+        parsed = [parse(value) for value in values]
+        _report(f"{name} parse", len(values), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for field in parsed:
+            field.count(1)
+        _report(f"{name} popcount", len(parsed), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        reduce(lambda a, b: a | b, parsed)
+        _report(f"{name} union", len(parsed), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    Bitlist.union(parsed)
+    _report("Bitlist.union", len(parsed), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
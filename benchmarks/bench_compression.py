@@ -0,0 +1,77 @@
+"""
+Time to fetch a validator set and a mainnet sized block with and without gzip.
+The stand-in node answers over loopback, so the time a link of each bandwidth would add is
+modelled from the bytes actually received: local wall time + wire bytes / bandwidth.
+
+    python benchmarks/bench_compression.py --validators 100000 --requests 20 --bandwidth 10 100 1000
+"""
+import argparse
+import gzip
+import json
+import time
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+
+from bench_lazy import BLOCK_PATH, mainnet_block
+from bench_parsing import validator_summaries
+
+VALIDATORS_PATH = "/eth/v1/beacon/states/head/validators"
+
+
+def _fetch(node, compression, fetch, requests):
+    # best of the requests so the first connection does not count
+    client = BeaconChainAPI(node.url, compression=compression)
+    best = float("inf")
+    for _ in range(requests):
+        start = time.perf_counter()
+        fetch(client)
+        best = min(best, time.perf_counter() - start)
+    transfer = client.transfer
+    return best, transfer.wire_bytes // requests, transfer.decompress / requests
+
+
+def _report(name, seconds, wire_bytes, decompress, bandwidths):
+    modelled = "  ".join(
+        f"{mbit:>5g}Mbit/s {(seconds + wire_bytes * 8 / (mbit * 1e6)) * 1000:9.1f}ms"
+        for mbit in bandwidths
+    )
+    print(
+        f"{name:<22} {wire_bytes / 1e6:8.2f}MB  local {seconds * 1000:7.1f}ms  "
+        f"decompress {decompress * 1000:6.1f}ms  {modelled}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validators", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument(
+        "--bandwidth", type=float, nargs="+", default=[10, 100, 1000], help="Mbit/s"
+    )
+    args = parser.parse_args()
+
+    routes = {
+        VALIDATORS_PATH: json.dumps(
+            {"data": validator_summaries(args.validators)}
+        ).encode(),
+        BLOCK_PATH: json.dumps({"data": mainnet_block()}).encode(),
+    }
+    cases = {
+        "validators": lambda client: client.get_validators_from_state(
+            "head", active=True
+        ),
+        "block": lambda client: client.get_block_from_block_id("head"),
+    }
+    with StandInNode(routes, compress=True) as node:
+        for name, fetch in cases.items():
+            for compression, encoding in [(False, "identity"), (True, "gzip")]:
+                result = _fetch(node, compression, fetch, args.requests)
+                _report(f"{name} {encoding}", *result, args.bandwidth)
+    for path, body in routes.items():
+        ratio = len(body) / len(gzip.compress(body))
+        print(f"gzip ratio {path:<40} {ratio:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Slots per second and peak memory of building block and attestation tables by looping over
+get_block_from_block_id and get_attestations_from_block_id into lists of dataclasses,
+against export_slots writing the same range to npy and, when pyarrow is installed, Parquet.
+
+    python benchmarks/bench_export.py --slots 400 --concurrency 16
+"""
+import argparse
+import copy
+import json
+import tempfile
+import time
+import tracemalloc
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.export import export_slots, pyarrow
+from beacon_client.testing import StandInNode
+from beacon_client.utils.errors import BeaconNodeError
+
+from bench_lazy import mainnet_block
+
+
+def _routes(slots, transactions):
+    block = mainnet_block(transactions=transactions)
+    attestations = json.dumps({"data": block["message"]["body"]["attestations"]})
+    routes = {}
+    for slot in range(slots):
+        # every tenth slot is skipped
+        if slot % 10 == 9:
+            continue
+        data = copy.copy(block)
+        data["message"] = {**block["message"], "slot": str(slot)}
+        routes[f"/eth/v2/beacon/blocks/{slot}"] = json.dumps({"data": data}).encode()
+        routes[f"/eth/v1/beacon/blocks/{slot}/attestations"] = attestations.encode()
+    return routes
+
+
+def dataclass_loop(client, slots):
+    blocks, attestations = [], []
+    for slot in range(slots):
+        try:
+            blocks.append(client.get_block_from_block_id(slot))
+        except BeaconNodeError:
+            continue
+        attestations.extend(client.get_attestations_from_block_id(slot))
+    return len(blocks)
+
+
+def _measure(name, fn, slots):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    # traced in a second run since tracemalloc slows allocation heavy code down
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24} {slots / elapsed:10,.1f} slots/s  peak {peak / 1e6:8.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=400)
+    parser.add_argument("--transactions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--row-group-size", type=int, default=16384)
+    args = parser.parse_args()
+
+    formats = ["npy"] if pyarrow is None else ["npy", "parquet"]
+    with StandInNode(_routes(args.slots, args.transactions)) as node:
+        client = BeaconChainAPI(node.url, pool_maxsize=args.concurrency)
+        _measure(
+            "dataclass loop", lambda: dataclass_loop(client, args.slots), args.slots
+        )
+        for file_format in formats:
+            with tempfile.TemporaryDirectory() as directory:
+                _measure(
+                    f"export_slots {file_format}",
+                    lambda: export_slots(
+                        client,
+                        0,
+                        args.slots,
+                        directory,
+                        file_format=file_format,
+                        row_group_size=args.row_group_size,
+                        concurrency=args.concurrency,
+                    ),
+                    args.slots,
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Time to fetch a block and read its slot and proposer with eager against lazy decoding, for json and ssz.
+The fixture block is padded to mainnet size: 128 attestations and a few hundred transactions.
+
+    python benchmarks/bench_lazy.py --requests 200 --transactions 300
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from pathlib import Path
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.ssz import (
+    decode_signed_beacon_block,
+    encode_signed_beacon_block,
+)
+from beacon_client.utils.types import SignedBeaconBlock
+
+BLOCK_FIXTURE = Path(__file__).parent.parent / "tests" / "fixtures" / "block.json"
+BLOCK_PATH = "/eth/v2/beacon/blocks/head"
+
+
+def mainnet_block(attestations=128, transactions=300, rng=random.Random(0)):
+    with open(BLOCK_FIXTURE) as f:
+        data = json.load(f)["data"]
+    body = data["message"]["body"]
+    body["attestations"] = [
+        copy.deepcopy(body["attestations"][i % len(body["attestations"])])
+        for i in range(attestations)
+    ]
+    body["execution_payload"]["transactions"] = [
+        "0x" + rng.randbytes(rng.randint(100, 1000)).hex() for _ in range(transactions)
+    ]
+    return data
+
+
+def _best(fn, requests, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / requests
+
+
+def _report(name, seconds):
+    print(f"{name:<36} {seconds * 1e6:10.1f}us per block")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=300)
+    args = parser.parse_args()
+
+    data = mainnet_block(transactions=args.transactions)
+    block = parse_json(data, SignedBeaconBlock)
+    body = json.dumps({"version": "bellatrix", "data": data}).encode()
+    encoded = encode_signed_beacon_block(block)
+    print(f"block: {len(body):,} json bytes, {len(encoded):,} ssz bytes")
+
+    for lazy in [False, True]:
+        name = "lazy" if lazy else "eager"
+
+        def decode_json():
+            decoded = parse_json(data, SignedBeaconBlock, lazy=lazy)
+            return decoded.message.slot, decoded.message.proposer_index
+
+        def decode_ssz():
+            decoded = decode_signed_beacon_block(encoded, lazy=lazy)
+            return decoded.message.slot, decoded.message.proposer_index
+
+        _report(f"{name} json decode", _best(decode_json, args.requests))
+        _report(f"{name} ssz decode", _best(decode_ssz, args.requests))
+
+    json_node = StandInNode({BLOCK_PATH: body})
+    ssz_node = StandInNode(
+        {BLOCK_PATH: encoded}, content_type="application/octet-stream"
+    )
+    with json_node, ssz_node:
+        json_client = BeaconChainAPI(json_node.url)
+        ssz_client = BeaconChainAPI(ssz_node.url)
+        for lazy in [False, True]:
+            name = "lazy" if lazy else "eager"
+
+            def fetch_json():
+                fetched = json_client.get_block_from_block_id("head", lazy=lazy)
+                return fetched.message.slot, fetched.message.proposer_index
+
+            def fetch_ssz():
+                raw = ssz_client.get_block_from_block_id("head", response_type="ssz")
+                fetched = decode_signed_beacon_block(raw, lazy=lazy)
+                return fetched.message.slot, fetched.message.proposer_index
+
+            _report(f"{name} json fetch + read", _best(fetch_json, args.requests))
+            _report(f"{name} ssz fetch + read", _best(fetch_ssz, args.requests))
+
+
+if __name__ == "__main__":
+    main()
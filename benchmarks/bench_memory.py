@@ -0,0 +1,81 @@
+"""
+Bytes held per parsed ValidatorSummary and Attestation.
+"plain" rebuilds every response type as an ordinary @dataclass with a per-instance __dict__
+so it shows the footprint before the types in beacon_client.utils.types were slotted.
+
+    python benchmarks/bench_memory.py --count 100000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import fields, is_dataclass, make_dataclass
+from pathlib import Path
+from typing import List, get_args, get_origin, get_type_hints
+
+from bench_parsing import validator_summaries
+
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import Attestation, ValidatorSummary
+
+BLOCK_FIXTURE = Path(__file__).parent.parent / "tests" / "fixtures" / "block.json"
+
+_plain = {}
+
+
+def plain(data_class):
+    """
+    Copy of data_class (and every dataclass it references) as a plain, dict backed dataclass
+    """
+    if data_class not in _plain:
+        hints = get_type_hints(data_class)
+        _plain[data_class] = make_dataclass(
+            data_class.__name__,
+            [
+                (field.name, _plain_type(hints[field.name]))
+                for field in fields(data_class)
+            ],
+        )
+    return _plain[data_class]
+
+
+def _plain_type(field_type):
+    if is_dataclass(field_type):
+        return plain(field_type)
+    if get_origin(field_type) is list and get_args(field_type):
+        return List[_plain_type(get_args(field_type)[0])]
+    return field_type
+
+
+def bytes_per_object(data, data_class) -> float:
+    gc.collect()
+    tracemalloc.start()
+    parsed = parse_json(data, data_class)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # the list holding the objects is not part of their cost
+    return (size - 8 * len(parsed)) / len(parsed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with open(BLOCK_FIXTURE) as f:
+        attestations = json.load(f)["data"]["message"]["body"]["attestations"]
+    cases = [
+        (ValidatorSummary, validator_summaries(args.count)),
+        (Attestation, attestations * (args.count // len(attestations))),
+    ]
+    for data_class, data in cases:
+        before = bytes_per_object(data, plain(data_class))
+        after = bytes_per_object(data, data_class)
+        print(
+            f"{data_class.__name__:<18} plain {before:8.0f} B  "
+            f"slotted {after:8.0f} B  ({after / before:6.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Throughput of parse_json (compiled per-dataclass decoders) against the previous dacite based decoding.
+
+    python benchmarks/bench_parsing.py --validators 100000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from dacite import Config, from_dict
+from multiaddr import Multiaddr
+
+from beacon_client.utils.bitfields import Bitlist, Bitvector
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import (
+    BeaconBlock,
+    BeaconBlockBody,
+    BeaconBlockHeader,
+    ChainId,
+    CommitteeIndex,
+    ConnectionOrientation,
+    Epoch,
+    Eth1Data,
+    Gwei,
+    PeerState,
+    SignedBeaconBlock,
+    SignedBeaconBlockHeader,
+    Slot,
+    Validator,
+    ValidatorIndex,
+    ValidatorStatus,
+    ValidatorSummary,
+    Wei,
+)
+
+BLOCK_FIXTURE = Path(__file__).parent.parent / "tests" / "fixtures" / "block.json"
+
+# the type hooks and per element Config construction used by parse_json before it was compiled
+DaciteSimpleHooks = {
+    Gwei: lambda x: Gwei(int(x)),
+    Wei: lambda x: Wei(int(x)),
+    ValidatorIndex: lambda x: ValidatorIndex(int(x)),
+    CommitteeIndex: lambda x: CommitteeIndex(int(x)),
+    Slot: lambda x: Slot(int(x)),
+    Epoch: lambda x: Epoch(int(x)),
+    ChainId: lambda x: ChainId(int(x)),
+    int: int,
+    Bitlist: Bitlist.from_hex,
+    Bitvector: Bitvector.from_hex,
+    Multiaddr: Multiaddr,
+    ValidatorStatus: ValidatorStatus,
+    PeerState: PeerState,
+    ConnectionOrientation: ConnectionOrientation,
+}
+
+
+def _nested_hook(beacon_class, sub_classes={}):
+    return lambda x: from_dict(
+        data_class=beacon_class,
+        data=x,
+        config=Config(type_hooks={**DaciteSimpleHooks, **sub_classes}),
+    )
+
+
+DaciteHooks = {
+    **DaciteSimpleHooks,
+    Validator: _nested_hook(Validator),
+    SignedBeaconBlockHeader: _nested_hook(
+        SignedBeaconBlockHeader, {BeaconBlockHeader: _nested_hook(BeaconBlockHeader)}
+    ),
+    BeaconBlock: _nested_hook(
+        BeaconBlock,
+        {
+            BeaconBlockBody: _nested_hook(
+                BeaconBlockBody, {Eth1Data: _nested_hook(Eth1Data)}
+            )
+        },
+    ),
+}
+
+
+def parse_json_dacite(data, data_class):
+    if isinstance(data, list):
+        return [
+            from_dict(
+                data_class=data_class, data=d, config=Config(type_hooks=DaciteHooks)
+            )
+            for d in data
+        ]
+    return from_dict(
+        data_class=data_class, data=data, config=Config(type_hooks=DaciteHooks)
+    )
+
+
+def validator_summaries(count):
+    return [
+        {
+            "index": str(i),
+            "balance": str(32_000_000_000 + i),
+            "status": "active_ongoing",
+            "validator": {
+                "pubkey": "0x" + f"{i:096x}",
+                "withdrawal_credentials": "0x" + f"{i:064x}",
+                "effective_balance": "32000000000",
+                "slashed": False,
+                "activation_eligibility_epoch": "0",
+                "activation_epoch": "0",
+                "exit_epoch": "18446744073709551615",
+                "withdrawable_epoch": "18446744073709551615",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _throughput(name, fn, data, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<44} {count / best:12,.0f} objects/s  ({best * 1000:8.2f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validators", type=int, default=100_000)
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(BLOCK_FIXTURE) as f:
+        blocks = [json.load(f)["data"]] * args.blocks
+    validators = validator_summaries(args.validators)
+
+    assert parse_json(blocks, SignedBeaconBlock) == parse_json_dacite(
+        blocks, SignedBeaconBlock
+    )
+    for name, fn in [("dacite", parse_json_dacite), ("compiled", parse_json)]:
+        _throughput(
+            f"{name} SignedBeaconBlock",
+            lambda data: fn(data, SignedBeaconBlock),
+            blocks,
+            args.blocks,
+            args.repeat,
+        )
+        _throughput(
+            f"{name} ValidatorSummary",
+            lambda data: fn(data, ValidatorSummary),
+            validators,
+            args.validators,
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares per-request latency of a fresh connection per request (module level requests.get)
+against the pooled keep-alive session owned by BeaconChainAPI.
+
+    python benchmarks/bench_session.py --requests 2000 --latency 0.0005
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.parse
+
+import requests
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+
+HEADER_PATH = "/eth/v1/beacon/headers/head"
+HEADER_BODY = json.dumps(
+    {
+        "data": {
+            "root": "0x" + "ab" * 32,
+            "canonical": True,
+            "header": {
+                "message": {
+                    "slot": "4733490",
+                    "proposer_index": "123456",
+                    "parent_root": "0x" + "cd" * 32,
+                    "state_root": "0x" + "ef" * 32,
+                    "body_root": "0x" + "01" * 32,
+                },
+                "signature": "0x" + "23" * 96,
+            },
+        }
+    }
+).encode()
+
+
+def _timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name, samples, connections):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1e6
+    p99 = samples[int(len(samples) * 0.99) - 1] * 1e6
+    print(f"{name:<28} p50 {p50:8.1f}us  p99 {p99:8.1f}us  connections {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with StandInNode({HEADER_PATH: HEADER_BODY}, latency=args.latency) as node:
+        url = urllib.parse.urljoin(node.url, HEADER_PATH)
+        samples = _timed(
+            lambda: requests.get(url, headers={"Accept": "application/json"}).json(),
+            args.requests,
+        )
+        _report("requests.get per call", samples, node.connections)
+
+        node.connections = 0
+        with BeaconChainAPI(node.url) as client:
+            samples = _timed(lambda: client._query_url(HEADER_PATH), args.requests)
+        _report("BeaconChainAPI pooled", samples, node.connections)
+
+
+if __name__ == "__main__":
+    main()
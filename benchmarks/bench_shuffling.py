@@ -0,0 +1,45 @@
+"""
+Time to compute the committees of an epoch locally, vectorized shuffle against the spec's
+one index at a time compute_shuffled_index (measured on a sample and extrapolated).
+
+    python benchmarks/bench_shuffling.py --validators 900000
+"""
+import argparse
+import time
+from hashlib import sha256
+
+import numpy as np
+
+from beacon_client.utils.shuffling import (
+    compute_committees,
+    compute_shuffled_index,
+    shuffled_indices,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validators", type=int, default=900_000)
+    parser.add_argument("--sample", type=int, default=2000)
+    args = parser.parse_args()
+    seed = sha256(b"seed").digest()
+
+    start = time.perf_counter()
+    shuffled_indices(args.validators, seed)
+    vectorized = time.perf_counter() - start
+    print(f"{'vectorized shuffle':<28} {vectorized:10.3f}s")
+
+    start = time.perf_counter()
+    for index in range(args.sample):
+        compute_shuffled_index(index, args.validators, seed)
+    scalar = (time.perf_counter() - start) * args.validators / args.sample
+    print(f"{'compute_shuffled_index':<28} {scalar:10.3f}s (extrapolated)")
+
+    start = time.perf_counter()
+    committees = compute_committees(np.arange(args.validators), seed, 1000)
+    elapsed = time.perf_counter() - start
+    print(f"{'compute_committees':<28} {elapsed:10.3f}s  {len(committees)} committees")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Peak RSS of decoding a large validators response in one piece (get_validators_from_state)
+against incremental decoding (iter_validators_from_state).
+Each mode runs in its own process so the peaks do not mix.
+
+    python benchmarks/bench_streaming.py --validators 500000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from bench_parsing import validator_summaries
+from beacon_client.testing import StandInNode
+
+PATH = "/eth/v1/beacon/states/head/validators"
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM starts fresh after exec, ru_maxrss is inherited from the forking parent on linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode: str, url: str, chunk_size: int):
+    from beacon_client.api import BeaconChainAPI
+
+    client = BeaconChainAPI(url)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "list":
+        count = len(client.get_validators_from_state("head", active=True))
+    else:
+        count = sum(
+            1
+            for _ in client.iter_validators_from_state(
+                "head", active=True, chunk_size=chunk_size
+            )
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {"count": count, "seconds": elapsed, "peak_mb": _peak_rss_mb() - baseline}
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validators", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=2**16)
+    parser.add_argument("--child", choices=["list", "stream"])
+    parser.add_argument("--url")
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.url, args.chunk_size)
+
+    body = json.dumps({"data": validator_summaries(args.validators)}).encode()
+    print(f"response size {len(body) / 2**20:.1f} MiB")
+    with StandInNode({PATH: body}) as node:
+        for mode in ["list", "stream"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    mode,
+                    "--url",
+                    node.url,
+                    "--chunk-size",
+                    str(args.chunk_size),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={**os.environ},
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{mode:<8} {result['count']:>9} validators  {result['seconds']:6.2f}s  "
+                f"peak rss +{result['peak_mb']:8.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
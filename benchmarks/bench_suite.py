@@ -0,0 +1,268 @@
+"""
+Offline benchmark suite over mainnet sized responses. For every endpoint it measures parse throughput
+through parse_json, peak and retained memory of one parse (tracemalloc), and end-to-end latency of the
+client method against an in-process StandInNode. SSE bursts are measured as events/s through iter_events.
+
+Fixtures are read from --fixtures when present (one file per case, e.g. responses recorded from a node)
+and generated deterministically otherwise, --save-fixtures writes the generated ones for reuse.
+Results are written as json with --output. With --baseline the run is compared against an earlier output
+and the exit status is 1 when any metric is worse by more than --threshold (a fraction).
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --baseline results.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict
+
+from bench_aggregation import slot_events
+from bench_lazy import mainnet_block
+from bench_parsing import validator_summaries
+
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import (
+    Attestation,
+    CommitteeSummary,
+    SignedBeaconBlock,
+    ValidatorSummary,
+    SLOTS_PER_EPOCH,
+)
+
+# True where a larger value is better
+METRICS = {
+    "parse_per_s": True,
+    "peak_bytes": False,
+    "retained_bytes": False,
+    "e2e_p50_ms": False,
+    "e2e_p99_ms": False,
+    "events_per_s": True,
+}
+
+
+@dataclass
+class Case:
+    name: str
+    path: str
+    data_class: type
+    call: Callable[[BeaconChainAPI], object]
+
+
+CASES = [
+    Case(
+        "block",
+        "/eth/v2/beacon/blocks/head",
+        SignedBeaconBlock,
+        lambda client: client.get_block_from_block_id("head"),
+    ),
+    Case(
+        "validators",
+        "/eth/v1/beacon/states/head/validators",
+        ValidatorSummary,
+        lambda client: client.get_validators_from_state("head", active=True),
+    ),
+    Case(
+        "committees",
+        "/eth/v1/beacon/states/head/committees",
+        CommitteeSummary,
+        lambda client: client.get_committees_from_state("head"),
+    ),
+    Case(
+        "attestations",
+        "/eth/v1/beacon/pool/attestations",
+        Attestation,
+        lambda client: client.get_pool_attestations(),
+    ),
+]
+
+
+def committees(validators: int, per_slot: int = 64) -> list:
+    per_committee = validators // (SLOTS_PER_EPOCH * per_slot)
+    return [
+        {
+            "index": str(index),
+            "slot": str(slot),
+            "validators": [
+                str((slot * per_slot + index) * per_committee + i)
+                for i in range(per_committee)
+            ],
+        }
+        for slot in range(SLOTS_PER_EPOCH)
+        for index in range(per_slot)
+    ]
+
+
+def generate(args) -> Dict[str, str]:
+    events = slot_events(0, aggregates_per_committee=4)[: args.events]
+    return {
+        "block": json.dumps({"version": "bellatrix", "data": mainnet_block()}),
+        "validators": json.dumps({"data": validator_summaries(args.validators)}),
+        "committees": json.dumps({"data": committees(args.validators)}),
+        "attestations": json.dumps(
+            {"data": [json.loads(event) for event in events[: args.attestations]]}
+        ),
+        "events": "".join(f"event: attestation\ndata: {event}\n\n" for event in events),
+    }
+
+
+def load_fixtures(args) -> Dict[str, bytes]:
+    names = [case.name for case in CASES] + ["events"]
+    directory = Path(args.fixtures) if args.fixtures else None
+    if directory is not None and all((directory / name).exists() for name in names):
+        return {name: (directory / name).read_bytes() for name in names}
+    fixtures = {name: body.encode() for name, body in generate(args).items()}
+    if args.save_fixtures:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, body in fixtures.items():
+            (directory / name).write_bytes(body)
+    return fixtures
+
+
+def _count(value) -> int:
+    return len(value) if isinstance(value, list) else 1
+
+
+def measure_parse(case: Case, body: bytes, repeat: int) -> dict:
+    data = json.loads(body)["data"]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = parse_json(data, case.data_class)
+        best = min(best, time.perf_counter() - start)
+    count = _count(value)
+    del value
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = parse_json(data, case.data_class)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert _count(value) == count
+    return {
+        "objects": count,
+        "parse_per_s": count / best,
+        "peak_bytes": peak - before,
+        "retained_bytes": current - before,
+    }
+
+
+def measure_latency(case: Case, client: BeaconChainAPI, requests: int) -> dict:
+    case.call(client)
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        case.call(client)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "e2e_p50_ms": statistics.median(samples) * 1000,
+        "e2e_p99_ms": samples[max(0, int(len(samples) * 0.99) - 1)] * 1000,
+    }
+
+
+def measure_events(url: str, count: int) -> dict:
+    client = BeaconChainAPI(url)
+    start = time.perf_counter()
+    with client.iter_events(attestation=True, initial_backoff=0.01) as stream:
+        received = 0
+        for _ in stream:
+            received += 1
+            if received == count:
+                break
+    elapsed = time.perf_counter() - start
+    client.close()
+    return {"events": received, "events_per_s": received / elapsed}
+
+
+def run(args) -> dict:
+    fixtures = load_fixtures(args)
+    results = {}
+    routes = {case.path: fixtures[case.name] for case in CASES}
+    with StandInNode(routes) as node:
+        client = BeaconChainAPI(node.url)
+        for case in CASES:
+            body = fixtures[case.name]
+            result = {"response_bytes": len(body)}
+            result.update(measure_parse(case, body, args.repeat))
+            result.update(measure_latency(case, client, args.requests))
+            results[case.name] = result
+        client.close()
+    events = fixtures["events"]
+    with StandInNode(
+        {"/eth/v1/events": events}, content_type="text/event-stream"
+    ) as node:
+        count = events.count(b"\n\n")
+        results["events"] = {"response_bytes": len(events)}
+        results["events"].update(measure_events(node.url, count))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Metrics that are worse than the baseline by more than threshold, as (case, metric, baseline, current)
+    """
+    regressions = []
+    for name, metrics in results["cases"].items():
+        previous = baseline["cases"].get(name, {})
+        for metric, higher_is_better in METRICS.items():
+            if metric not in metrics or not previous.get(metric):
+                continue
+            change = (metrics[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((name, metric, previous[metric], metrics[metric]))
+    return regressions
+
+
+def report(results: dict):
+    for name, metrics in results["cases"].items():
+        values = "  ".join(
+            f"{metric} {metrics[metric]:,.1f}"
+            for metric in METRICS
+            if metric in metrics
+        )
+        print(f"{name:<14} {values}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validators", type=int, default=100_000)
+    parser.add_argument("--attestations", type=int, default=1024)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--fixtures", help="directory of recorded responses")
+    parser.add_argument("--save-fixtures", action="store_true")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--baseline", help="results json of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    assert not args.save_fixtures or args.fixtures, "--save-fixtures needs --fixtures"
+
+    results = run(args)
+    report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, previous, current in regressions:
+            print(f"REGRESSION {name} {metric}: {previous:,.1f} -> {current:,.1f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from beacon_client.utils.aggregation import (
+    AttestationAggregator,
+    aggregate_attestations,
+)
+from beacon_client.utils.bitfields import Bitlist
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import Attestation
+from sseclient import Event
+import json
+
+ROOT = "0x" + "ab" * 32
+OTHER_ROOT = "0x" + "cd" * 32
+
+
+def bitlist(size, participants):
+    bits = 1 << size
+    for participant in participants:
+        bits |= 1 << participant
+    return "0x" + bits.to_bytes((size + 8) // 8, "little").hex()
+
+
+def attestation(slot, index, participants, size=10, head=ROOT):
+    return json.dumps(
+        {
+            "aggregation_bits": bitlist(size, participants),
+            "data": {
+                "slot": str(slot),
+                "index": str(index),
+                "beacon_block_root": head,
+                "source": {"epoch": "1", "root": ROOT},
+                "target": {"epoch": "2", "root": ROOT},
+            },
+            "signature": "0x00",
+        }
+    )
+
+
+class TestAttestationAggregator:
+    def test_bitlist_matches_parsed_attestation(self):
+        event = attestation(5, 0, [0, 3, 9])
+        aggregator = AttestationAggregator()
+        aggregator.add(event)
+        (summary,) = aggregator.flush()
+        (committee,) = summary.committees
+        parsed = parse_json(json.loads(event), Attestation)
+        assert committee.aggregation_bits == parsed.aggregation_bits
+        assert (committee.committee_size, committee.participants) == (10, 3)
+
+    def test_union_and_redundancy(self):
+        aggregator = AttestationAggregator()
+        for event in [
+            attestation(5, 0, [0, 1]),
+            attestation(5, 0, [1, 2]),
+            attestation(5, 0, [0, 1, 2]),
+            attestation(5, 0, [2]),
+            attestation(5, 1, [4]),
+            attestation(5, 1, [5], head=OTHER_ROOT),
+        ]:
+            assert aggregator.add(event) == []
+        (summary,) = aggregator.flush()
+        first, second = summary.committees
+        counts = (first.index, first.participants, first.unique, first.redundant)
+        assert counts == (0, 3, 2, 2)
+        assert first.aggregation_bits == Bitlist.from_hex("0x0704")
+        assert (second.participants, len(second.votes)) == (2, 2)
+        assert sorted(second.votes.values()) == [1, 1]
+        assert (summary.unique, summary.redundant) == (4, 2)
+
+    def test_slots_are_emitted_after_lag(self):
+        aggregator = AttestationAggregator(slot_lag=1)
+        assert aggregator.add(attestation(5, 0, [0])) == []
+        assert aggregator.add(attestation(6, 0, [0])) == []
+        completed = aggregator.add(attestation(7, 0, [0]))
+        assert [summary.slot for summary in completed] == [5]
+        assert aggregator.add(attestation(5, 0, [1])) == []
+        assert aggregator.late == 1
+        assert [summary.slot for summary in aggregator.flush()] == [6, 7]
+
+    def test_aggregate_events(self):
+        events = [
+            Event(event="attestation", data=attestation(slot, 0, [slot % 10]))
+            for slot in range(4)
+        ] + [Event(event="head", data="{}")]
+        summaries = list(aggregate_attestations(events))
+        assert [summary.slot for summary in summaries] == [0, 1, 2, 3]
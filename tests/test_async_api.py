@@ -0,0 +1,81 @@
+from beacon_client.async_api import AsyncBeaconChainAPI, _encode_params
+from beacon_client.async_endpoints import iter_sse
+from beacon_client.testing import StandInNode
+from beacon_client.utils.types import GenesisDetails, Root, Version, StreamedBlock
+import asyncio
+import json
+
+
+async def _lines(raw: bytes):
+    for line in raw.splitlines(keepends=True):
+        yield line
+
+
+async def _collect(aiter):
+    return [item async for item in aiter]
+
+
+class TestAsyncBeaconChainAPI:
+    def test_genesis(self):
+        async def query():
+            async with AsyncBeaconChainAPI("http://localhost:5052") as client:
+                return await client.get_genesis()
+
+        expected = GenesisDetails(
+            genesis_fork_version=Version("0x00000000"),
+            genesis_time=1606824023,
+            genesis_validators_root=Root(
+                "0x4b363db94e286120d76eb905340fdd4e54bfe9f06bf33ff6cf5ad27f511bfe95"
+            ),
+        )
+        assert asyncio.run(query()) == expected
+
+    def test_stream_events_event_data(self):
+        async def first_event():
+            async with AsyncBeaconChainAPI("http://localhost:5052") as client:
+                async for event in client.stream_events(attestation=True):
+                    return event
+
+        event = asyncio.run(first_event())
+        assert event.event == "attestation"
+        assert "aggregation_bits" in json.loads(event.data)
+
+    def test_encode_params(self):
+        params = {"status": ["active", "exited"], "id": None, "slot": 5}
+        assert _encode_params(params) == [
+            ("status", "active"),
+            ("status", "exited"),
+            ("slot", "5"),
+        ]
+
+    def test_iter_sse(self):
+        raw = (
+            b": keep-alive\n\n"
+            b'event: head\ndata: {"slot": "1"}\nid: 7\n\n'
+            b'event: block\r\ndata: {"slot":\r\ndata: "2"}\r\n\r\n'
+        )
+        events = asyncio.run(_collect(iter_sse(_lines(raw))))
+        assert [event.event for event in events] == ["head", "block"]
+        assert events[0].id == "7"
+        assert json.loads(events[1].data) == {"slot": "2"}
+
+    def test_iter_events_reconnects(self):
+        block = {"slot": "10", "block": "0x" + "ab" * 32, "execution_optimistic": False}
+        body = f"id: 1\nevent: block\ndata: {json.dumps(block)}\n\n".encode()
+
+        async def first_events(url):
+            async with AsyncBeaconChainAPI(url) as client:
+                stream = client.iter_events(block=True, initial_backoff=0.01)
+                events = []
+                async for event in stream:
+                    events.append(event)
+                    if len(events) == 3:
+                        break
+                return events, stream
+
+        routes = {"/eth/v1/events": body}
+        with StandInNode(routes, content_type="text/event-stream") as node:
+            events, stream = asyncio.run(first_events(node.url))
+        assert all(isinstance(event, StreamedBlock) for event in events)
+        assert stream.reconnects >= 2
+        assert node.request_headers[1]["Last-Event-ID"] == "1"
@@ -1,4 +1,9 @@
 from beacon_client.api import BeaconChainAPI
+from beacon_client.beacon_endpoints import BeaconEndpoints
+from beacon_client.utils.bitfields import Bitlist
+from beacon_client.utils.errors import BeaconNodeError
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.ssz import SSZBytes, encode_signed_beacon_block
 from beacon_client.utils.types import (
     GenesisDetails,
     FinalityCheckpoints,
@@ -24,9 +29,14 @@ from beacon_client.utils.types import (
     Slot,
     BLSSignature,
     Hash32,
+    SignedBeaconBlock,
 )
-from bitstring import BitArray
+from pathlib import Path
+import copy
+import json
 import pytest
+import random
+import time
 
 
 slow_test = pytest.mark.skipif(
@@ -582,7 +592,7 @@ class TestBeaconEndpoints:
 
     def test_get_attestations_from_block_id(self):
         expected = Attestation(
-            aggregation_bits=BitArray(
+            aggregation_bits=Bitlist.from_hex(
                 "0xffffffffffffffffffffffffffffffffffffffffffffffffffff0f"
             ),
             signature=BLSSignature(
@@ -634,3 +644,141 @@ class TestBeaconEndpoints:
         assert execution_payload.parent_hash == Hash32(
             "0x43cb018dafa0df9d9e255cede9e0d7d99bb27962a51a2e14615338d340c273ed"
         )
+
+
+class FakeBlockNode(BeaconEndpoints):
+    """
+    Serves the fixture block for every slot except the skipped ones
+    """
+
+    def __init__(self, skipped, failing=(), forks={}):
+        with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+            self.block = json.load(f)
+        self.skipped = skipped
+        self.failing = failing
+        # slot -> Eth-Consensus-Version of ssz responses, bellatrix for the others
+        self.forks = forks
+        self.requested = []
+
+    def _query_url(self, path, stream=False, headers={}, params=None):
+        slot = int(path.rsplit("/", 1)[1])
+        self.requested.append(slot)
+        time.sleep(random.random() / 1000)
+        if slot in self.skipped:
+            raise BeaconNodeError(404, "NOT_FOUND: beacon block")
+        if slot in self.failing:
+            raise BeaconNodeError(500, "Internal server error")
+        block = copy.deepcopy(self.block)
+        block["data"]["message"]["slot"] = str(slot)
+        if headers.get("Accept") == "application/octet-stream":
+            encoded = encode_signed_beacon_block(
+                parse_json(block["data"], SignedBeaconBlock)
+            )
+            return SSZBytes(encoded, self.forks.get(slot, "bellatrix"))
+        return block
+
+
+class TestBlocksInRange:
+    def test_get_blocks_in_range_ordered_with_gaps(self):
+        client = FakeBlockNode(skipped={3, 4, 9})
+        blocks = list(client.get_blocks_in_range(0, 12, concurrency=4))
+        assert [block.message.slot for block in blocks] == [0, 1, 2, 5, 6, 7, 8, 10, 11]
+        assert sorted(client.requested) == list(range(12))
+
+    def test_get_blocks_in_range_ssz(self):
+        client = FakeBlockNode(skipped={1})
+        json_blocks = list(client.get_blocks_in_range(0, 4))
+        ssz_blocks = list(client.get_blocks_in_range(0, 4, response_type="ssz"))
+        assert ssz_blocks == json_blocks
+
+    def test_get_blocks_in_range_ssz_falls_back_to_json(self):
+        client = FakeBlockNode(skipped=set(), forks={2: "capella"})
+        json_blocks = list(client.get_blocks_in_range(0, 4))
+        client.requested.clear()
+        ssz_blocks = list(client.get_blocks_in_range(0, 4, response_type="ssz"))
+        assert ssz_blocks == json_blocks
+        assert sorted(client.requested) == [0, 1, 2, 2, 3]
+
+    def test_get_blocks_in_range_undecoded(self):
+        client = FakeBlockNode(skipped={1})
+        blocks = list(client.get_blocks_in_range(0, 3, decode=False))
+        assert [block["message"]["slot"] for block in blocks] == ["0", "2"]
+
+    def test_get_blocks_in_range_bounded_window(self):
+        client = FakeBlockNode(skipped=set())
+        blocks = client.get_blocks_in_range(0, 10_000, concurrency=2)
+        assert next(blocks).message.slot == 0
+        blocks.close()
+        assert len(client.requested) <= 6
+
+    def test_get_blocks_in_range_raises_other_errors(self):
+        client = FakeBlockNode(skipped=set(), failing={2})
+        with pytest.raises(BeaconNodeError):
+            list(client.get_blocks_in_range(0, 3))
+
+
+class FakeBalanceNode(BeaconEndpoints):
+    """
+    Answers balance queries for whichever ids are asked for, optionally without the POST form
+    """
+
+    def __init__(self, post_supported):
+        self.post_supported = post_supported
+        self._post_unsupported = set()
+        self.gets = []
+        self.posts = []
+
+    @staticmethod
+    def _balances(ids):
+        return {"data": [{"index": i, "balance": "32000000000"} for i in ids]}
+
+    def _query_url(self, path, stream=False, headers={}, params=None):
+        self.gets.append(params["id"])
+        return self._balances(params["id"])
+
+    def _iter_data(self, path, data_class, params, chunk_size):
+        self.gets.append(params["id"])
+        yield from parse_json(self._balances(params["id"])["data"], data_class)
+
+    def _post_url(self, path, body):
+        self.posts.append(body)
+        if not self.post_supported:
+            raise BeaconNodeError(405, "Method Not Allowed")
+        return self._balances(body)
+
+
+class TestValidatorBatches:
+    validators = list(range(40_000))
+
+    def test_short_list_is_one_get(self, monkeypatch):
+        # a single batch is fetched on the calling thread
+        monkeypatch.setattr("beacon_client.beacon_endpoints.ThreadPoolExecutor", None)
+        client = FakeBalanceNode(post_supported=True)
+        balances = client.get_validators_balances_from_state("head", [1, 2, 3])
+        assert [balance.index for balance in balances] == [1, 2, 3]
+        assert client.gets == [["1", "2", "3"]] and client.posts == []
+
+    def test_long_list_uses_post(self):
+        client = FakeBalanceNode(post_supported=True)
+        balances = client.get_validators_balances_from_state("head", self.validators)
+        assert [balance.index for balance in balances] == self.validators
+        assert len(client.posts) == 1 and client.gets == []
+
+    def test_falls_back_to_batched_gets(self):
+        client = FakeBalanceNode(post_supported=False)
+        balances = client.get_validators_balances_from_state("head", self.validators)
+        assert [balance.index for balance in balances] == self.validators
+        assert len(client.gets) > 1
+        assert all(len("&id=".join(ids)) < 4096 for ids in client.gets)
+        # the missing POST form is remembered
+        client.get_validators_balances_from_state("head", self.validators)
+        assert len(client.posts) == 1
+
+    def test_streams_batches_in_turn(self):
+        client = FakeBalanceNode(post_supported=True)
+        balances = client.iter_validators_balances_from_state("head", self.validators)
+        assert next(balances).index == 0
+        assert len(client.gets) == 1
+        assert [balance.index for balance in balances] == self.validators[1:]
+        assert len(client.gets) > 1 and client.posts == []
+        assert all(len("&id=".join(ids)) < 4096 for ids in client.gets)
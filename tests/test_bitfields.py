@@ -0,0 +1,64 @@
+from beacon_client.utils.bitfields import Bitlist, Bitvector
+import pytest
+
+
+class TestBitlist:
+    def test_length_bit_is_stripped(self):
+        bits = Bitlist.from_hex("0x0b")
+        assert len(bits) == 3
+        assert list(bits) == [True, True, False]
+        assert bits.count() == 2
+        assert bits.count(False) == 1
+        assert bits.hex() == "0x0b"
+
+    def test_empty_and_byte_boundary(self):
+        assert len(Bitlist.from_hex("0x01")) == 0
+        bits = Bitlist.from_hex("0xff01")
+        assert (len(bits), bits.count()) == (8, 8)
+        assert bits.to_bytes() == bytes.fromhex("ff01")
+
+    def test_missing_length_bit(self):
+        with pytest.raises(AssertionError):
+            Bitlist.from_hex("0x00")
+
+    def test_indices(self):
+        bits = Bitlist.from_hex(
+            "0x" + (1 << 20 | 1 << 17 | 1 << 9 | 1).to_bytes(3, "little").hex()
+        )
+        assert bits.indices() == [0, 9, 17]
+        assert bits[9] and bits[-3] and not bits[1]
+        with pytest.raises(IndexError):
+            bits[20]
+
+    def test_union_and_intersection(self):
+        first = Bitlist.from_hex("0x13")
+        second = Bitlist.from_hex("0x16")
+        assert first | second == Bitlist.from_hex("0x17")
+        assert first & second == Bitlist.from_hex("0x12")
+        assert Bitlist.union([first, second, Bitlist.from_hex("0x18")]).indices() == [
+            0,
+            1,
+            2,
+            3,
+        ]
+        assert Bitlist.intersection([first, second]).indices() == [1]
+        with pytest.raises(ValueError):
+            first | Bitlist.from_hex("0x03")
+
+    def test_hashable(self):
+        assert len({Bitlist.from_hex("0x13"), Bitlist.from_hex("0x13")}) == 1
+        assert Bitlist.from_hex("0x03") != Bitvector.from_hex("0x01")
+
+
+class TestBitvector:
+    def test_round_trip(self):
+        bits = Bitvector.from_hex("0x0f00")
+        assert len(bits) == 16
+        assert bits.indices() == [0, 1, 2, 3]
+        assert bits.hex() == "0x0f00"
+
+    def test_length(self):
+        bits = Bitvector.from_bytes(b"\x05", 4)
+        assert (len(bits), bits.indices()) == (4, [0, 2])
+        with pytest.raises(AssertionError):
+            Bitvector.from_bytes(b"\x05\x00", 4)
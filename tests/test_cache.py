@@ -0,0 +1,146 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.async_api import AsyncBeaconChainAPI
+from beacon_client.utils.cache import ResponseCache, approximate_size
+from beacon_client.utils.types import SignedBeaconBlock
+from pathlib import Path
+import asyncio
+import json
+import pytest
+
+ROOT = "0x" + "ab" * 32
+
+with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+    BLOCK = json.load(f)
+
+CHECKPOINTS = {
+    "data": {
+        "previous_justified": {"epoch": "99", "root": ROOT},
+        "current_justified": {"epoch": "100", "root": ROOT},
+        "finalized": {"epoch": "99", "root": ROOT},
+    }
+}
+
+
+def header(slot):
+    message = {
+        "slot": str(slot),
+        "proposer_index": "1",
+        "parent_root": ROOT,
+        "state_root": ROOT,
+        "body_root": ROOT,
+    }
+    signed = {"message": message, "signature": "0x" + "00" * 96}
+    return {"data": {"root": ROOT, "canonical": True, "header": signed}}
+
+
+class RecordingClient(BeaconChainAPI):
+    def __init__(self, cache, header_slot=0):
+        super().__init__("http://localhost:5052", cache=cache)
+        self.paths = []
+        self.header_slot = header_slot
+
+    def _query_url(self, path, stream=False, headers={}, params=None):
+        self.paths.append(path)
+        if path.endswith("finality_checkpoints"):
+            return CHECKPOINTS
+        if "/headers/" in path:
+            return header(self.header_slot)
+        return BLOCK
+
+
+class AsyncRecordingClient(AsyncBeaconChainAPI):
+    def __init__(self, cache, header_slot):
+        super().__init__("http://localhost:5052", cache=cache)
+        self.header_slot = header_slot
+
+    async def _query_url(self, path, stream=False, headers={}, params=None):
+        if path.endswith("finality_checkpoints"):
+            return CHECKPOINTS
+        return header(self.header_slot)
+
+
+class TestResponseCache:
+    def test_root_addressed_block_is_cached(self):
+        client = RecordingClient(ResponseCache())
+        first = client.get_block_from_block_id(ROOT)
+        second = client.get_block_from_block_id(ROOT)
+        assert first is second
+        assert client.paths == [f"/eth/v2/beacon/blocks/{ROOT}"]
+        assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+    def test_lazy_block_is_not_decoded_when_cached(self):
+        client = RecordingClient(ResponseCache())
+        block = client.get_block_from_block_id(ROOT, lazy=True)
+        assert client.cache.size > len(json.dumps(BLOCK["data"]))
+        with pytest.raises(AttributeError):
+            vars(SignedBeaconBlock)["message"].__get__(block)
+
+    def test_head_is_never_cached(self):
+        client = RecordingClient(ResponseCache())
+        client.get_block_from_block_id("head")
+        client.get_block_from_block_id("head")
+        assert len(client.paths) == 2
+        assert len(client.cache) == 0
+
+    def test_finalized_slots_only(self):
+        client = RecordingClient(ResponseCache())
+        finalized_slot = 99 * 32
+        client.get_block_from_block_id(finalized_slot)
+        client.get_block_from_block_id(finalized_slot)
+        client.get_block_from_block_id(finalized_slot + 1)
+        client.get_block_from_block_id(finalized_slot + 1)
+        blocks = [path for path in client.paths if "blocks" in path]
+        expected = [finalized_slot, finalized_slot + 1, finalized_slot + 1]
+        assert blocks == [f"/eth/v2/beacon/blocks/{slot}" for slot in expected]
+        # finality is looked up once per slot at most
+        assert sum("finality" in path for path in client.paths) == 1
+
+    def test_header_by_root_is_cached_once_finalized(self):
+        finalized_slot = 99 * 32
+        client = RecordingClient(ResponseCache(), header_slot=finalized_slot + 1)
+        # the canonical flag can still change with a reorg
+        client.get_headers_from_block_id(ROOT)
+        client.get_headers_from_block_id(ROOT)
+        assert len(client.cache) == 0
+        client.header_slot = finalized_slot
+        client.get_headers_from_block_id(ROOT)
+        assert client.get_headers_from_block_id(ROOT).header.message.slot == (
+            finalized_slot
+        )
+        headers = [path for path in client.paths if "headers" in path]
+        assert len(headers) == 3
+
+    @pytest.mark.parametrize("offset, cached", [(0, 1), (1, 0)])
+    def test_async_header_by_root(self, offset, cached):
+        async def fetch():
+            client = AsyncRecordingClient(ResponseCache(), 99 * 32 + offset)
+            await client.get_headers_from_block_id(ROOT)
+            return len(client.cache)
+
+        assert asyncio.run(fetch()) == cached
+
+    def test_arguments_are_part_of_the_key(self):
+        client = RecordingClient(ResponseCache())
+        client.get_block_from_block_id(ROOT)
+        client.get_block_from_block_id(ROOT, response_type="ssz")
+        assert len(client.cache) == 2
+
+    def test_disabled_by_default(self):
+        client = RecordingClient(None)
+        client.get_block_from_block_id(ROOT)
+        client.get_block_from_block_id(ROOT)
+        assert len(client.paths) == 2
+
+    def test_lru_eviction_by_size(self):
+        cache = ResponseCache(max_bytes=3 * approximate_size("x" * 1000))
+        for key in range(4):
+            cache.put(key, "x" * 1000)
+        assert cache.get(0) is None
+        assert cache.get(3) is not None
+        assert cache.evictions == 1
+        assert cache.size <= cache.max_bytes
+
+    def test_approximate_size_grows_with_content(self):
+        small = approximate_size([{"a": "x" * 10}] * 10)
+        large = approximate_size([{"a": "x" * 10}] * 10_000)
+        assert large > 500 * small
@@ -0,0 +1,69 @@
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import ValidatorSummary, ValidatorStatus
+import pytest
+
+np = pytest.importorskip("numpy")
+from beacon_client.utils.columnar import ValidatorColumns  # noqa: E402
+
+FAR_FUTURE_EPOCH = str(2**64 - 1)
+
+
+def _validator(index, balance, status, exit_epoch=FAR_FUTURE_EPOCH):
+    return {
+        "index": str(index),
+        "balance": str(balance),
+        "status": status,
+        "validator": {
+            "pubkey": "0x" + f"{index:02x}" * 47 + "00",
+            "withdrawal_credentials": "0x01" + f"{index:062x}",
+            "effective_balance": "32000000000",
+            "slashed": status == "active_slashed",
+            "activation_eligibility_epoch": "0",
+            "activation_epoch": str(index),
+            "exit_epoch": exit_epoch,
+            "withdrawable_epoch": FAR_FUTURE_EPOCH,
+        },
+    }
+
+
+DATA = [
+    _validator(0, 32_000_000_000, "active_ongoing"),
+    _validator(1, 31_000_000_000, "active_ongoing"),
+    _validator(2, 31_500_000_000, "active_exiting", exit_epoch="10"),
+    _validator(3, 16_000_000_000, "active_slashed"),
+    _validator(4, 32_000_000_000, "pending_queued"),
+]
+
+
+class TestValidatorColumns:
+    columns = ValidatorColumns.from_json(DATA)
+
+    def test_rows_match_dataclasses(self):
+        assert self.columns.to_summaries() == parse_json(DATA, ValidatorSummary)
+
+    def test_dtypes(self):
+        assert self.columns.balance.dtype == np.uint64
+        assert self.columns.pubkey.dtype == np.dtype("S48")
+        assert self.columns.exit_epoch[0] == 2**64 - 1
+
+    def test_vectorized_filter(self):
+        columns = self.columns
+        active = columns.status_mask(ValidatorStatus.ActiveOngoing)
+        low = columns.filter(active & (columns.balance < 31_900_000_000))
+        assert low.index.tolist() == [1]
+        assert low.row(0).balance == 31_000_000_000
+
+    def test_is_active(self):
+        assert self.columns.is_active(3).tolist() == [True, True, True, True, False]
+        assert self.columns.is_active(10).tolist() == [True, True, False, True, True]
+
+    def test_position_of(self):
+        assert self.columns.position_of(3) == 3
+        with pytest.raises(KeyError):
+            self.columns.position_of(99)
+
+    def test_concat(self):
+        parts = [self.columns.filter(slice(0, 2)), self.columns.filter(slice(2, None))]
+        joined = ValidatorColumns.concat(parts)
+        assert joined.to_summaries() == self.columns.to_summaries()
+        assert len(ValidatorColumns.concat([])) == 0
@@ -0,0 +1,117 @@
+from beacon_client.beacon_endpoints import BeaconEndpoints
+from beacon_client.utils.committees import (
+    CommitteeAssignment,
+    CommitteeCache,
+    EpochCommittees,
+    decision_slot,
+)
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.types import CommitteeSummary, SLOTS_PER_EPOCH
+from beacon_client.validator_endpoints import ValidatorEndpoints
+import pytest
+
+ROOT = "0x" + "ab" * 32
+OTHER_ROOT = "0x" + "cd" * 32
+
+
+def committees_json(epoch, committees_per_slot=2, size=3, offset=0):
+    start = epoch * SLOTS_PER_EPOCH
+    data = []
+    validator = 0
+    for slot in range(start, start + SLOTS_PER_EPOCH):
+        for index in range(committees_per_slot):
+            validators = [str(v + offset) for v in range(validator, validator + size)]
+            validator += size
+            data.append(
+                {"index": str(index), "slot": str(slot), "validators": validators}
+            )
+    return data
+
+
+class FakeCommitteeNode(BeaconEndpoints, ValidatorEndpoints):
+    def __init__(self, finalized_slot=-1):
+        self.committee_cache = CommitteeCache(max_epochs=4)
+        self.dependent_roots = {}
+        self.committee_requests = []
+        self.duty_requests = []
+        self.finalized_slot = finalized_slot
+
+    def _is_immutable(self, slot):
+        return slot <= self.finalized_slot
+
+    def _query_url(self, path, stream=False, headers={}, params=None):
+        if path.startswith("/eth/v1/validator/duties/proposer/"):
+            epoch = int(path.rsplit("/", 1)[1])
+            self.duty_requests.append(epoch)
+            return {"dependent_root": self.dependent_roots.get(epoch, ROOT), "data": []}
+        epoch = params["epoch"]
+        self.committee_requests.append(epoch)
+        offset = 1 if self.dependent_roots.get(epoch - 1, ROOT) != ROOT else 0
+        return {"data": committees_json(epoch, offset=offset)}
+
+
+class TestEpochCommittees:
+    def test_lookups(self):
+        committees = EpochCommittees.from_json(committees_json(3), ROOT)
+        assert (committees.epoch, len(committees)) == (3, 2 * SLOTS_PER_EPOCH)
+        assert committees.assignment(7) == CommitteeAssignment(
+            slot=3 * SLOTS_PER_EPOCH + 1, index=0, position=1, committee_size=3
+        )
+        assert list(committees.committee(3 * SLOTS_PER_EPOCH + 1, 0)) == [6, 7, 8]
+        assert committees.assignment(10_000) is None and 10_000 not in committees
+        assert 7 in committees
+
+    def test_from_summaries_matches_json(self):
+        data = committees_json(1)
+        summaries = parse_json(data, CommitteeSummary)
+        from_json = EpochCommittees.from_json(data)
+        from_summaries = EpochCommittees.from_summaries(summaries[::-1])
+        assert from_json.members == from_summaries.members
+        assert from_json.assignment(100) == from_summaries.assignment(100)
+
+    def test_partial_epoch_is_rejected(self):
+        with pytest.raises(AssertionError):
+            EpochCommittees.from_json(committees_json(1)[:-1])
+
+
+class TestEpochCommitteeCache:
+    def test_cached_per_dependent_root(self):
+        client = FakeCommitteeNode()
+        first = client.get_epoch_committees(5)
+        assert client.get_epoch_committees(5) is first
+        assert client.committee_requests == [5]
+        assert client.committee_cache.hits == 1
+
+    def test_reorg_invalidates_only_affected_epoch(self):
+        client = FakeCommitteeNode()
+        fifth = client.get_epoch_committees(5)
+        sixth = client.get_epoch_committees(6)
+        client.dependent_roots[5] = OTHER_ROOT
+        reorged = client.get_epoch_committees(6)
+        assert reorged is not sixth and reorged.dependent_root == OTHER_ROOT
+        assert reorged.assignment(1).position == 0
+        assert client.get_epoch_committees(5) is fifth
+        assert client.committee_requests == [5, 6, 6]
+
+    def test_explicit_dependent_root_skips_lookup(self):
+        client = FakeCommitteeNode()
+        client.get_epoch_committees(5, dependent_root=OTHER_ROOT)
+        client.get_epoch_committees(5, dependent_root=OTHER_ROOT)
+        assert client.committee_requests == [5]
+
+    def test_finalized_dependent_root_is_not_checked_again(self):
+        client = FakeCommitteeNode(finalized_slot=decision_slot(5))
+        first = client.get_epoch_committees(5)
+        # one lookup for the root and no check after the fetch
+        assert client.duty_requests == [4]
+        client.dependent_roots[4] = OTHER_ROOT
+        assert client.get_epoch_committees(5) is first
+        assert client.duty_requests == [4]
+        assert client.committee_requests == [5]
+
+    def test_unfinalized_dependent_root_is_checked(self):
+        client = FakeCommitteeNode(finalized_slot=decision_slot(5) - 1)
+        client.get_epoch_committees(5)
+        client.get_epoch_committees(5)
+        assert client.duty_requests == [4, 4, 4]
+        assert client.committee_requests == [5]
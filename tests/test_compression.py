@@ -0,0 +1,157 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.async_api import AsyncBeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.compression import (
+    Decompressor,
+    TransferStats,
+    accept_encoding,
+    decode_body,
+    iter_decoded,
+)
+from beacon_client.utils.errors import BeaconNodeError
+from beacon_client.utils.instrumentation import Instrumentation
+import asyncio
+import gzip
+import json
+import pytest
+import zlib
+
+FAR_FUTURE_EPOCH = str(2**64 - 1)
+ROOT = "0x" + "ab" * 32
+GENESIS = json.dumps(
+    {
+        "data": {
+            "genesis_time": "1606824023",
+            "genesis_validators_root": ROOT,
+            "genesis_fork_version": "0x00000000",
+        }
+    }
+).encode()
+VALIDATORS = json.dumps(
+    {
+        "execution_optimistic": False,
+        "data": [
+            {
+                "index": str(index),
+                "balance": "32000000000",
+                "status": "active_ongoing",
+                "validator": {
+                    "pubkey": "0x" + f"{index:096x}",
+                    "withdrawal_credentials": "0x01" + f"{index:062x}",
+                    "effective_balance": "32000000000",
+                    "slashed": False,
+                    "activation_eligibility_epoch": "0",
+                    "activation_epoch": "0",
+                    "exit_epoch": FAR_FUTURE_EPOCH,
+                    "withdrawable_epoch": FAR_FUTURE_EPOCH,
+                },
+            }
+            for index in range(2000)
+        ],
+    }
+).encode()
+ROUTES = {
+    "/eth/v1/beacon/genesis": GENESIS,
+    "/eth/v1/beacon/states/head/validators": VALIDATORS,
+    "/eth/v1/beacon/states/head/root": (500, b'{"code":500,"message":"down"}'),
+}
+
+
+def _chunks(raw: bytes, size: int):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]  # noqa: E203
+
+
+class TestDecompressor:
+    @pytest.mark.parametrize(
+        "encoding, compress",
+        [
+            ("gzip", gzip.compress),
+            ("deflate", zlib.compress),
+            # deflate without the zlib header
+            ("deflate", lambda body: zlib.compress(body, wbits=-zlib.MAX_WBITS)),
+            ("identity", lambda body: body),
+            (None, lambda body: body),
+        ],
+    )
+    def test_round_trip(self, encoding, compress):
+        stats = TransferStats()
+        wire = compress(VALIDATORS)
+        chunks = iter_decoded(_chunks(wire, 1000), encoding, stats)
+        assert b"".join(chunks) == VALIDATORS
+        assert stats.responses == 1
+        assert stats.wire_bytes == len(wire)
+        assert stats.decoded_bytes == len(VALIDATORS)
+
+    def test_decode_body(self):
+        stats = TransferStats()
+        assert decode_body(gzip.compress(GENESIS), "gzip", stats) == GENESIS
+        assert stats.ratio > 1
+
+    def test_unsupported_encoding(self):
+        with pytest.raises(ValueError):
+            Decompressor("compress")
+
+    def test_accept_encoding(self):
+        assert accept_encoding(False) == "identity"
+        assert accept_encoding(True).endswith("gzip, deflate")
+
+
+class TestCompressedResponses:
+    def test_decompresses_and_counts_wire_bytes(self):
+        records = []
+        with StandInNode(ROUTES, compress=True) as node:
+            client = BeaconChainAPI(
+                node.url, instrumentation=Instrumentation(records.append)
+            )
+            validators = client.get_validators_from_state("head", active=True)
+        assert len(validators) == 2000
+        assert "gzip" in node.request_headers[0]["Accept-Encoding"]
+        wire = len(gzip.compress(VALIDATORS))
+        assert client.transfer.wire_bytes == wire
+        assert client.transfer.decoded_bytes == len(VALIDATORS)
+        assert client.transfer.decompress > 0
+        [record] = records
+        assert record.wire_bytes == wire
+        assert record.response_bytes == len(VALIDATORS)
+        assert record.decompress > 0
+
+    def test_streams_compressed_bodies(self):
+        with StandInNode(ROUTES, compress=True) as node:
+            client = BeaconChainAPI(node.url)
+            validators = list(client.iter_validators_from_state("head", active=True))
+        assert [validator.index for validator in validators] == list(range(2000))
+        assert client.transfer.wire_bytes == len(gzip.compress(VALIDATORS))
+
+    def test_compressed_error_body(self):
+        with StandInNode(ROUTES, compress=True) as node:
+            client = BeaconChainAPI(node.url)
+            with pytest.raises(BeaconNodeError, match="down"):
+                client.get_state_root("head")
+
+    def test_compression_off(self):
+        with StandInNode(ROUTES, compress=True) as node:
+            client = BeaconChainAPI(node.url, compression=False)
+            client.get_genesis()
+        assert node.request_headers[0]["Accept-Encoding"] == "identity"
+        assert client.transfer.wire_bytes == client.transfer.decoded_bytes
+
+    def test_async(self):
+        async def fetch(url):
+            async with AsyncBeaconChainAPI(url) as client:
+                genesis = await client.get_genesis()
+                validators = [
+                    validator
+                    async for validator in client.iter_validators_from_state(
+                        "head", active=True
+                    )
+                ]
+                return client.transfer, genesis, validators
+
+        with StandInNode(ROUTES, compress=True) as node:
+            transfer, genesis, validators = asyncio.run(fetch(node.url))
+        assert genesis.genesis_validators_root == ROOT
+        assert len(validators) == 2000
+        assert "gzip" in node.request_headers[0]["Accept-Encoding"]
+        assert transfer.responses == 2
+        wire = len(gzip.compress(GENESIS)) + len(gzip.compress(VALIDATORS))
+        assert transfer.wire_bytes == wire
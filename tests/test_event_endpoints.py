@@ -1,5 +1,59 @@
 from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.errors import BeaconNodeError
+from beacon_client.utils.events import EventStream
+from beacon_client.utils.types import (
+    StreamedHead,
+    StreamedBlock,
+    StreamedChainReorg,
+    SignedVoluntaryExit,
+)
+from itertools import islice
 import json
+import pytest
+import time
+
+ROOT = "0x" + "ab" * 32
+
+HEAD = {
+    "slot": "10",
+    "block": ROOT,
+    "state": ROOT,
+    "current_duty_dependent_root": ROOT,
+    "previous_duty_dependent_root": ROOT,
+    "epoch_transition": False,
+    "execution_optimistic": False,
+}
+BLOCK = {"slot": "10", "block": ROOT, "execution_optimistic": False}
+EXIT = {"message": {"epoch": "5", "validator_index": "7"}, "signature": "0x00"}
+REORG = {
+    "slot": "10",
+    "depth": "2",
+    "old_head_block": ROOT,
+    "new_head_block": ROOT,
+    "old_head_state": ROOT,
+    "new_head_state": ROOT,
+    "epoch": "0",
+    "execution_optimistic": False,
+}
+
+
+def sse(*events):
+    return "".join(
+        f"id: {event_id}\nevent: {topic}\ndata: {json.dumps(data)}\n\n"
+        for event_id, topic, data in events
+    ).encode()
+
+
+class FakeStream:
+    def __init__(self, body):
+        self.body = body
+
+    def __iter__(self):
+        return iter(self.body.splitlines(True))
+
+    def close(self):
+        pass
 
 
 class TestEventEndpoints:
@@ -14,3 +68,71 @@ class TestEventEndpoints:
         for event in self.client.stream_events(attestation=True):
             assert "aggregation_bits" in json.loads(event.data)
             break
+
+
+class TestEventStream:
+    body = sse(
+        ("1", "head", HEAD),
+        ("2", "block", BLOCK),
+        ("3", "voluntary_exit", EXIT),
+        ("4", "chain_reorg", REORG),
+    )
+
+    def test_typed_events_and_reconnect(self):
+        routes = {"/eth/v1/events": self.body}
+        with StandInNode(routes, content_type="text/event-stream") as node:
+            client = BeaconChainAPI(node.url)
+            with client.iter_events(
+                head=True,
+                block=True,
+                voluntary_exit=True,
+                chain_reorg=True,
+                initial_backoff=0.01,
+            ) as stream:
+                events = list(islice(stream, 6))
+        assert [type(event) for event in events] == [
+            StreamedHead,
+            StreamedBlock,
+            SignedVoluntaryExit,
+            StreamedChainReorg,
+            StreamedHead,
+            StreamedBlock,
+        ]
+        assert events[3].depth == 2
+        assert stream.reconnects >= 1
+        # the node closed the first response so the second request resumes after the last id
+        assert "Last-Event-ID" not in node.request_headers[0]
+        assert node.request_headers[1]["Last-Event-ID"] == "4"
+
+    def test_drops_when_full(self):
+        body = sse(*[(str(i), "block", BLOCK) for i in range(100)])
+        stream = EventStream(
+            lambda last_event_id: FakeStream(body),
+            queue_size=4,
+            drop_when_full=True,
+            initial_backoff=60,
+        )
+        with stream:
+            while stream.received < 100:
+                time.sleep(0.001)
+            events = list(islice(stream, 4))
+        assert len(events) == 4
+        assert stream.dropped == 96
+
+    def test_counts_undecodable_and_lagging_events(self):
+        body = sse(("1", "block", {"slot": "1"}), ("2", "block", BLOCK))
+        stream = EventStream(
+            lambda last_event_id: FakeStream(body), max_lag=0.0, initial_backoff=60
+        )
+        with stream:
+            assert next(iter(stream)) == StreamedBlock(10, ROOT, False)
+        assert (stream.dropped, stream.lagging) == (1, 1)
+
+    def test_rejected_request_is_raised(self):
+        def connect(last_event_id):
+            raise BeaconNodeError(400, "Invalid topic")
+
+        with EventStream(connect) as stream:
+            with pytest.raises(BeaconNodeError):
+                next(iter(stream))
+        assert stream.reconnects == 0
@@ -0,0 +1,133 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.bitfields import Bitlist
+from pathlib import Path
+import copy
+import json
+import pytest
+
+np = pytest.importorskip("numpy")
+from beacon_client.export import TABLES, export_slots, load_npy  # noqa: E402
+
+with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+    BLOCK = json.load(f)
+SKIPPED = {3, 7}
+SLOTS = 12
+
+
+def _routes(base_fee_per_gas=None, **payload_fields):
+    routes = {}
+    for slot in range(SLOTS):
+        if slot in SKIPPED:
+            continue
+        block = copy.deepcopy(BLOCK)
+        block["data"]["message"]["slot"] = str(slot)
+        payload = block["data"]["message"]["body"]["execution_payload"]
+        if base_fee_per_gas is not None:
+            payload["base_fee_per_gas"] = str(base_fee_per_gas)
+        payload.update(payload_fields)
+        routes[f"/eth/v2/beacon/blocks/{slot}"] = json.dumps(block).encode()
+    return routes
+
+
+def _export(tmp_path, base_fee_per_gas=None, payload_fields=None, **kwargs):
+    with StandInNode(_routes(base_fee_per_gas, **(payload_fields or {}))) as node:
+        client = BeaconChainAPI(node.url)
+        return export_slots(client, 0, SLOTS, tmp_path, **kwargs)
+
+
+class TestExport:
+    body = BLOCK["data"]["message"]["body"]
+    blocks = SLOTS - len(SKIPPED)
+
+    def test_npy(self, tmp_path):
+        stats = _export(tmp_path, file_format="npy", row_group_size=5, concurrency=3)
+        attestations = len(self.body["attestations"])
+        assert stats.slots == SLOTS
+        assert stats.blocks == self.blocks
+        assert stats.rows["attestations"] == self.blocks * attestations
+        assert stats.rows["voluntary_exits"] == self.blocks
+
+        blocks = load_npy(tmp_path, "blocks")
+        assert set(blocks) == set(TABLES["blocks"])
+        slots = [slot for slot in range(SLOTS) if slot not in SKIPPED]
+        assert blocks["slot"].tolist() == slots
+        assert blocks["attestations"].tolist() == [attestations] * self.blocks
+
+        rows = load_npy(tmp_path, "attestations")
+        first = self.body["attestations"][0]
+        bits = Bitlist.from_hex(first["aggregation_bits"])
+        assert rows["slot"][:attestations].tolist() == [0] * attestations
+        assert rows["participants"][0] == bits.count()
+        assert rows["target_epoch"][0] == int(first["data"]["target"]["epoch"])
+        target_root = bytes(rows["target_root"][0])
+        assert "0x" + target_root.hex() == first["data"]["target"]["root"]
+
+        payloads = load_npy(tmp_path, "execution_payloads")
+        payload = self.body["execution_payload"]
+        assert payloads["block_number"][0] == int(payload["block_number"])
+        length = payloads["extra_data_length"][0]
+        extra_data = bytes(payloads["extra_data"][0])[:length]
+        assert extra_data == bytes.fromhex(payload["extra_data"][2:])
+        assert payloads["base_fee_per_gas"][0] == payload["base_fee_per_gas"]
+
+    def test_parquet(self, tmp_path):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        stats = _export(tmp_path, file_format="parquet", row_group_size=8)
+        attestations = parquet.ParquetFile(tmp_path / "attestations.parquet")
+        rows = stats.rows["attestations"]
+        assert attestations.metadata.num_rows == rows
+        assert attestations.metadata.num_row_groups == (rows + 7) // 8
+        table = attestations.read()
+        first = self.body["attestations"][0]
+        bits = first["aggregation_bits"]
+        assert table.column("aggregation_bits")[0].as_py() == bytes.fromhex(bits[2:])
+        payloads = parquet.read_table(tmp_path / "execution_payloads.parquet")
+        base_fee = self.body["execution_payload"]["base_fee_per_gas"]
+        assert payloads.column("base_fee_per_gas")[0].as_py() == base_fee
+        sync = parquet.read_table(tmp_path / "sync_aggregates.parquet")
+        assert sync.column("slot").to_pylist()[:3] == [0, 1, 2]
+
+    def test_progress(self, tmp_path):
+        reports = []
+        _export(tmp_path, file_format="npy", progress=reports.append)
+        assert reports[-1].slots == SLOTS
+        assert reports[-1].slots_per_second > 0
+        assert "slots/s" in str(reports[-1])
+
+    def test_uint256_base_fee_npy(self, tmp_path):
+        base_fee = 2**256 - 1
+        _export(tmp_path, base_fee, file_format="npy")
+        column = load_npy(tmp_path, "execution_payloads")["base_fee_per_gas"]
+        assert column.tolist() == [str(base_fee)] * self.blocks
+
+    def test_uint256_base_fee_parquet(self, tmp_path):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        base_fee = 2**256 - 1
+        _export(tmp_path, base_fee, file_format="parquet")
+        table = parquet.read_table(tmp_path / "execution_payloads.parquet")
+        column = table.column("base_fee_per_gas").to_pylist()
+        assert column == [str(base_fee)] * self.blocks
+
+    # S dtypes drop trailing zero bytes when a value is read back
+    trailing_zeros = {
+        "block_hash": "0x" + "ab" * 31 + "00",
+        "fee_recipient": "0x" + "00" * 20,
+        "extra_data": "0x0102000000",
+    }
+
+    def test_trailing_zero_bytes_npy(self, tmp_path):
+        _export(tmp_path, payload_fields=self.trailing_zeros, file_format="npy")
+        payloads = load_npy(tmp_path, "execution_payloads")
+        block_hash = bytes(payloads["block_hash"][0])
+        assert "0x" + block_hash.hex() == self.trailing_zeros["block_hash"]
+        assert bytes(payloads["fee_recipient"][0]) == bytes(20)
+        length = payloads["extra_data_length"][0]
+        assert bytes(payloads["extra_data"][0])[:length] == b"\x01\x02\x00\x00\x00"
+
+    def test_trailing_zero_bytes_parquet(self, tmp_path):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        _export(tmp_path, payload_fields=self.trailing_zeros, file_format="parquet")
+        table = parquet.read_table(tmp_path / "execution_payloads.parquet")
+        for name, value in self.trailing_zeros.items():
+            assert table.column(name)[0].as_py() == bytes.fromhex(value[2:])
@@ -0,0 +1,143 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.async_api import AsyncBeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.cache import ResponseCache
+from beacon_client.utils.errors import BeaconNodeError
+from beacon_client.utils.instrumentation import (
+    Instrumentation,
+    PrometheusSink,
+    SpanSink,
+    endpoint_template,
+)
+import asyncio
+import json
+import pytest
+
+ROOT = "0x" + "ab" * 32
+GENESIS = json.dumps(
+    {
+        "data": {
+            "genesis_time": "1606824023",
+            "genesis_validators_root": ROOT,
+            "genesis_fork_version": "0x00000000",
+        }
+    }
+).encode()
+FORK = json.dumps(
+    {
+        "data": {
+            "previous_version": "0x00000000",
+            "current_version": "0x01000000",
+            "epoch": "10",
+        }
+    }
+).encode()
+ROUTES = {
+    "/eth/v1/beacon/genesis": GENESIS,
+    "/eth/v1/beacon/states/head/fork": FORK,
+    "/eth/v1/beacon/states/head/root": (500, b'{"code":500,"message":"down"}'),
+}
+
+
+def test_endpoint_template():
+    routes = {
+        "/eth/v1/beacon/states/head/validators?status=active": (
+            "/eth/v1/beacon/states/{state_id}/validators"
+        ),
+        f"/eth/v1/beacon/states/{ROOT}/validators/12": (
+            "/eth/v1/beacon/states/{state_id}/validators/{validator_id}"
+        ),
+        "/eth/v1/validator/duties/proposer/7": (
+            "/eth/v1/validator/duties/proposer/{epoch}"
+        ),
+        "/eth/v1/beacon/headers": "/eth/v1/beacon/headers",
+    }
+    for path, template in routes.items():
+        assert endpoint_template(path) == template
+
+
+class TestInstrumentation:
+    def test_not_wrapped_without_instrumentation(self):
+        client = BeaconChainAPI("http://localhost:5052", coalesce=False)
+        assert "get_genesis" not in vars(client)
+
+    def test_records_a_call(self):
+        records = []
+        with StandInNode(ROUTES) as node:
+            client = BeaconChainAPI(
+                node.url, instrumentation=Instrumentation(records.append)
+            )
+            fork = client.get_fork_from_state("head")
+        assert fork.epoch == 10
+        [record] = records
+        assert record.name == "get_fork_from_state"
+        assert record.endpoint == "/eth/v1/beacon/states/{state_id}/fork"
+        assert record.outcome == "ok"
+        assert record.status == 200
+        assert record.requests == 1
+        assert record.response_bytes == len(FORK)
+        assert record.time_to_first_byte > 0
+        assert record.json_decode > 0
+        assert record.dataclass_decode > 0
+        phases = record.time_to_first_byte + record.download + record.json_decode
+        assert phases + record.dataclass_decode <= record.duration
+
+    def test_outcomes(self):
+        records = []
+        with StandInNode(ROUTES) as node:
+            client = BeaconChainAPI(
+                node.url,
+                cache=ResponseCache(),
+                instrumentation=Instrumentation(records.append),
+            )
+            client.get_genesis()
+            client.get_genesis()
+            with pytest.raises(BeaconNodeError):
+                client.get_state_root("head")
+        assert [record.outcome for record in records] == ["ok", "cached", "http_error"]
+        assert records[2].status == 500
+        assert records[2].endpoint == "/eth/v1/beacon/states/{state_id}/root"
+
+    def test_prometheus_sink(self):
+        metrics = PrometheusSink()
+        with StandInNode(ROUTES) as node:
+            client = BeaconChainAPI(node.url, instrumentation=Instrumentation(metrics))
+            client.get_genesis()
+            client.get_genesis()
+        text = metrics.render()
+        labels = 'method="get_genesis",endpoint="/eth/v1/beacon/genesis"'
+        assert f'beacon_client_calls_total{{{labels},outcome="ok"}} 2' in text
+        size = 2 * len(GENESIS)
+        assert f"beacon_client_response_bytes_total{{{labels}}} {size}" in text
+        assert f'beacon_client_download_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert "# TYPE beacon_client_duration_seconds histogram" in text
+
+    def test_span_sink(self):
+        spans = []
+        with StandInNode(ROUTES) as node:
+            client = BeaconChainAPI(
+                node.url, instrumentation=Instrumentation(SpanSink(spans.append))
+            )
+            client.get_genesis()
+        [span] = spans
+        assert span.name == "get_genesis"
+        assert span.status == "OK"
+        assert span.attributes["http.route"] == "/eth/v1/beacon/genesis"
+        assert span.attributes["http.response.status_code"] == 200
+        assert span.end_time_unix_nano > span.start_time_unix_nano
+
+    def test_async(self):
+        records = []
+
+        async def fetch(url):
+            instrumentation = Instrumentation(records.append)
+            async with AsyncBeaconChainAPI(url, instrumentation=instrumentation) as c:
+                return await c.get_fork_from_state("head")
+
+        with StandInNode(ROUTES) as node:
+            fork = asyncio.run(fetch(node.url))
+        assert fork.epoch == 10
+        [record] = records
+        assert record.endpoint == "/eth/v1/beacon/states/{state_id}/fork"
+        assert record.response_bytes == len(FORK)
+        assert record.dataclass_decode > 0
@@ -0,0 +1,252 @@
+from beacon_client.utils.bitfields import Bitlist, Bitvector
+from beacon_client.utils.errors import MissingFieldError
+from beacon_client.utils.lazy import is_lazy
+from beacon_client.utils import parsing
+from beacon_client.utils.parsing import parse_json, get_decoder, TypeHooks
+from beacon_client.utils.types import (
+    SignedBeaconBlock,
+    Validator,
+    ValidatorSummary,
+    ValidatorStatus,
+    SyncCommitteeSummary,
+    NetworkIdentity,
+    BalanceSummary,
+    Gwei,
+    BeaconState,
+    JustificationBits,
+    SyncCommitteeBits,
+    ATTESTATION_SUBNET_COUNT,
+    SYNC_COMMITTEE_SIZE,
+)
+from dacite import from_dict, Config
+from multiaddr import Multiaddr
+from pathlib import Path
+import copy
+import dataclasses
+import json
+import pickle
+import pytest
+import sys
+import threading
+import typing
+
+VALIDATOR = {
+    "index": "1",
+    "balance": "32000000000",
+    "status": "active_ongoing",
+    "validator": {
+        "pubkey": "0xab",
+        "withdrawal_credentials": "0x01",
+        "effective_balance": "32000000000",
+        "slashed": False,
+        "activation_eligibility_epoch": "0",
+        "activation_epoch": "0",
+        "exit_epoch": "18446744073709551615",
+        "withdrawable_epoch": "18446744073709551615",
+    },
+}
+
+
+def _dacite(data, data_class):
+    return from_dict(
+        data_class=data_class, data=data, config=Config(type_hooks=TypeHooks)
+    )
+
+
+class TestParsing:
+    def test_block_matches_dacite(self):
+        with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+            data = json.load(f)["data"]
+        actual = parse_json(data, SignedBeaconBlock)
+        assert actual == _dacite(data, SignedBeaconBlock)
+        attestation = actual.message.body.attestations[0]
+        assert isinstance(attestation.aggregation_bits, Bitlist)
+        assert actual.message.body.execution_payload.base_fee_per_gas == 12345678901
+
+    def test_validator_summary(self):
+        (actual,) = parse_json([VALIDATOR], ValidatorSummary)
+        assert actual == _dacite(VALIDATOR, ValidatorSummary)
+        assert actual.status is ValidatorStatus.ActiveOngoing
+        assert actual.validator.exit_epoch == 2**64 - 1
+        assert isinstance(actual.balance, int)
+
+    def test_nested_lists(self):
+        data = {"validators": ["1", "2"], "validator_aggregates": [["1"], ["2", "3"]]}
+        actual = parse_json(data, SyncCommitteeSummary)
+        assert actual.validator_aggregates == [[1], [2, 3]]
+
+    def test_multiaddr(self):
+        address = "/ip4/7.7.7.7/tcp/4242"
+        data = {
+            "peer_id": "peer",
+            "enr": "enr",
+            "p2p_addresses": [address],
+            "discovery_addresses": [],
+            "metadata": {"seq_number": "1", "attnets": "0x0f00000000000000"},
+        }
+        actual = parse_json(data, NetworkIdentity)
+        assert actual.p2p_addresses == [Multiaddr(address)]
+        assert actual.metadata.attnets == Bitvector(0x0F, ATTESTATION_SUBNET_COUNT)
+
+    def test_bitvector_lengths(self):
+        @dataclasses.dataclass
+        class Bits:
+            justification_bits: JustificationBits
+            sync_committee_bits: SyncCommitteeBits
+
+        data = {"justification_bits": "0x0f", "sync_committee_bits": "0x" + "ff" * 64}
+        actual = parse_json(data, Bits)
+        assert len(actual.justification_bits) == 4
+        assert list(actual.justification_bits) == [True] * 4
+        assert len(actual.sync_committee_bits) == SYNC_COMMITTEE_SIZE
+        hints = typing.get_type_hints(BeaconState)
+        assert hints["justification_bits"] is JustificationBits
+        with pytest.raises(AssertionError):
+            parse_json({**data, "sync_committee_bits": "0xff"}, Bits)
+
+    def test_decoder_is_cached(self):
+        assert get_decoder(BalanceSummary) is get_decoder(BalanceSummary)
+
+    def test_custom_type_hooks(self):
+        hooks = {**TypeHooks, Gwei: lambda x: int(x) // 10**9}
+        actual = parse_json(
+            {"index": "1", "balance": "32000000000"}, BalanceSummary, hooks
+        )
+        assert actual.balance == 32
+
+    def test_equal_hooks_share_decoders(self):
+        hooks = {**TypeHooks}
+        assert get_decoder(BalanceSummary, hooks) is get_decoder(BalanceSummary)
+
+    def test_mutated_hooks_get_new_decoders(self):
+        hooks = {**TypeHooks}
+        balance = {"index": "1", "balance": "32000000000"}
+        assert parse_json(balance, BalanceSummary, hooks).balance == 32000000000
+        hooks[Gwei] = lambda x: int(x) // 10**9
+        assert parse_json(balance, BalanceSummary, hooks).balance == 32
+
+    def test_hook_sets_are_bounded(self):
+        for divisor in range(1, 200):
+            hooks = {**TypeHooks, Gwei: lambda x, divisor=divisor: int(x) // divisor}
+            get_decoder(BalanceSummary, hooks)
+        assert len(parsing._decoders) <= parsing._MAX_HOOK_SETS
+
+    def test_failed_build_raises_again(self):
+        @dataclasses.dataclass
+        class Unresolved:
+            value: "Undefined"  # noqa: F821
+
+        for _ in range(2):
+            with pytest.raises(NameError):
+                get_decoder(Unresolved)
+
+    def test_nested_type_hooks_deprecated(self):
+        with pytest.deprecated_call():
+            from beacon_client.utils.parsing import NestedTypeHooks
+        decode = NestedTypeHooks[Validator]
+        assert decode(VALIDATOR["validator"]) == _dacite(
+            VALIDATOR["validator"], Validator
+        )
+
+    def test_missing_field(self):
+        with pytest.raises(MissingFieldError, match="balance"):
+            parse_json({"index": "1"}, BalanceSummary)
+
+    def test_invalid_enum(self):
+        with pytest.raises(ValueError):
+            parse_json({**VALIDATOR, "status": "unknown"}, ValidatorSummary)
+
+    def test_slotted_decode_matches_constructor(self):
+        actual = parse_json(VALIDATOR, ValidatorSummary)
+        assert not hasattr(actual, "__dict__")
+        assert actual == ValidatorSummary(
+            index=1,
+            balance=32000000000,
+            status=ValidatorStatus.ActiveOngoing,
+            validator=actual.validator,
+        )
+        assert hash(actual) == hash(parse_json(VALIDATOR, ValidatorSummary))
+
+    def test_frozen(self):
+        actual = parse_json(VALIDATOR, ValidatorSummary)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            actual.balance = 0
+
+
+class TestLazyParsing:
+    @pytest.fixture
+    def data(self):
+        with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+            return json.load(f)["data"]
+
+    def test_matches_eager(self, data):
+        eager = parse_json(data, SignedBeaconBlock)
+        lazy = parse_json(data, SignedBeaconBlock, lazy=True)
+        assert is_lazy(lazy) and isinstance(lazy, SignedBeaconBlock)
+        assert lazy == eager and eager == lazy
+        assert repr(lazy) == repr(eager)
+        assert dataclasses.asdict(lazy) == dataclasses.asdict(eager)
+
+    def test_source_released_when_decoded(self, data):
+        lazy = parse_json(data, SignedBeaconBlock, lazy=True)
+        message = lazy.message
+        assert hasattr(lazy, "_source") and hasattr(message, "_source")
+        lazy.signature
+        assert not hasattr(lazy, "_source")
+        assert hasattr(message, "_source")
+
+    def test_fields_decode_on_access(self, data):
+        data = copy.deepcopy(data)
+        data["message"]["body"]["execution_payload"]["gas_used"] = "invalid"
+        lazy = parse_json(data, SignedBeaconBlock, lazy=True)
+        assert lazy.message.slot == 4733490
+        with pytest.raises(ValueError):
+            lazy.message.body.execution_payload.gas_used
+        assert lazy.message.body.execution_payload.gas_limit > 0
+
+    def test_missing_field_on_access(self):
+        lazy = parse_json({"index": "1"}, BalanceSummary, lazy=True)
+        assert lazy.index == 1
+        with pytest.raises(MissingFieldError, match="balance"):
+            lazy.balance
+
+    def test_frozen_and_hashable(self):
+        lazy = parse_json(VALIDATOR, ValidatorSummary, lazy=True)
+        assert hash(lazy) == hash(parse_json(VALIDATOR, ValidatorSummary))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            lazy.balance = 0
+        assert dataclasses.replace(lazy, balance=1).balance == 1
+        assert pickle.loads(pickle.dumps(lazy)) == lazy
+
+    def test_concurrent_access(self):
+        # threads reading the fields in different orders race to decode the last one and release the source
+        objects = [
+            parse_json(VALIDATOR, ValidatorSummary, lazy=True) for _ in range(5000)
+        ]
+        expected = parse_json(VALIDATOR, ValidatorSummary)
+        names = [field.name for field in dataclasses.fields(ValidatorSummary)]
+        errors = []
+
+        def read(order):
+            try:
+                for value in objects:
+                    for name in order:
+                        assert getattr(value, name) == getattr(expected, name)
+            except Exception as error:
+                errors.append(error)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=read, args=(names[i:] + names[:i],))
+                for i in range(len(names))
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert errors == []
+        assert not any(hasattr(value, "_source") for value in objects)
@@ -0,0 +1,153 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.pool import PooledBeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.instrumentation import Instrumentation
+from beacon_client.utils.types import HealthStatus
+import json
+import time
+
+HEADER_PATH = "/eth/v1/beacon/headers/head"
+
+
+def header(root_byte):
+    return json.dumps(
+        {
+            "data": {
+                "root": "0x" + root_byte * 32,
+                "canonical": True,
+                "header": {
+                    "message": {
+                        "slot": "1",
+                        "proposer_index": "1",
+                        "parent_root": "0x" + "00" * 32,
+                        "state_root": "0x" + "00" * 32,
+                        "body_root": "0x" + "00" * 32,
+                    },
+                    "signature": "0x" + "00" * 96,
+                },
+            }
+        }
+    ).encode()
+
+
+def routes(root_byte, health=200, sync_distance=0, header_status=200):
+    syncing = {
+        "data": {
+            "head_slot": "100",
+            "sync_distance": str(sync_distance),
+            "is_syncing": sync_distance > 0,
+        }
+    }
+    return {
+        "/eth/v1/node/health": (health, b""),
+        "/eth/v1/node/syncing": json.dumps(syncing).encode(),
+        HEADER_PATH: (header_status, header(root_byte)),
+    }
+
+
+def served_by(client):
+    return client.get_headers_from_block_id("head").root[2:4]
+
+
+class TestPooledBeaconChainAPI:
+    def test_routes_to_lowest_latency(self):
+        with StandInNode(routes("aa"), latency=0.02) as slow, StandInNode(
+            routes("bb")
+        ) as fast:
+            client = PooledBeaconChainAPI([slow.url, fast.url], health_interval=60)
+            try:
+                assert [node.url for node in client.ranked_nodes()] == [
+                    fast.url,
+                    slow.url,
+                ]
+                assert served_by(client) == "bb"
+            finally:
+                client.close()
+
+    def test_skips_unhealthy_and_syncing_nodes(self):
+        with StandInNode(routes("aa", health=503)) as starting, StandInNode(
+            routes("bb", sync_distance=10)
+        ) as syncing, StandInNode(routes("cc"), latency=0.01) as ready:
+            urls = [starting.url, syncing.url, ready.url]
+            client = PooledBeaconChainAPI(urls, health_interval=60)
+            try:
+                statuses = [node.status for node in client.nodes]
+                assert statuses == [
+                    HealthStatus.NotInitialized,
+                    HealthStatus.Syncing,
+                    HealthStatus.Ready,
+                ]
+                assert served_by(client) == "cc"
+            finally:
+                client.close()
+
+    def test_fails_over_on_server_error(self):
+        with StandInNode(routes("aa", header_status=500)) as broken, StandInNode(
+            routes("bb"), latency=0.01
+        ) as working:
+            client = PooledBeaconChainAPI([broken.url, working.url], health_interval=60)
+            try:
+                assert served_by(client) == "bb"
+                assert client.nodes[0].status == HealthStatus.Unknown
+                assert client.nodes[0].failures == 1
+            finally:
+                client.close()
+
+    def test_unreachable_node(self):
+        with StandInNode(routes("bb")) as working:
+            urls = ["http://127.0.0.1:1", working.url]
+            client = PooledBeaconChainAPI(urls, health_interval=60)
+            try:
+                assert client.nodes[0].status == HealthStatus.Unknown
+                assert served_by(client) == "bb"
+            finally:
+                client.close()
+
+    def test_hedges_after_p95(self):
+        with StandInNode(routes("aa")) as primary, StandInNode(
+            routes("bb"), latency=0.05
+        ) as secondary:
+            client = PooledBeaconChainAPI(
+                [primary.url, secondary.url],
+                health_interval=60,
+                hedge=True,
+                coalesce=False,
+            )
+            try:
+                # a few requests above p95 are hedged but the primary still answers first
+                for _ in range(30):
+                    assert served_by(client) == "aa"
+                hedged, wins = client.hedged, client.hedge_wins
+                assert wins == 0
+                primary.latency = 1.0
+                start = time.monotonic()
+                assert served_by(client) == "bb"
+                assert time.monotonic() - start < 0.5
+                assert (client.hedged, client.hedge_wins) == (hedged + 1, 1)
+            finally:
+                client.close()
+
+    def test_hedged_requests_are_instrumented(self):
+        records = []
+        with StandInNode(routes("aa")) as primary, StandInNode(routes("bb")) as other:
+            client = PooledBeaconChainAPI(
+                [primary.url, other.url],
+                health_interval=60,
+                hedge=True,
+                instrumentation=Instrumentation(records.append),
+            )
+            try:
+                client.get_headers_from_block_id("head")
+            finally:
+                client.close()
+        [record] = records
+        assert record.requests >= 1
+        assert record.status == 200
+
+    def test_close_closes_node_clients(self, monkeypatch):
+        closed = []
+        monkeypatch.setattr(BeaconChainAPI, "close", lambda api: closed.append(api))
+        with StandInNode(routes("aa")) as first, StandInNode(routes("bb")) as second:
+            client = PooledBeaconChainAPI([first.url, second.url], health_interval=60)
+            client.close()
+        assert closed == [node.client for node in client.nodes] + [client]
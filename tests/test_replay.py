@@ -0,0 +1,181 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import (
+    RecordedResponse,
+    Recording,
+    RecordingNode,
+    ReplayNode,
+    StandInNode,
+)
+from beacon_client.utils.errors import BeaconNodeError
+from beacon_client.utils.types import StreamedHead
+from itertools import islice
+import json
+import pytest
+import time
+
+ROOT = "0x" + "ab" * 32
+GENESIS = {
+    "data": {
+        "genesis_time": "1606824023",
+        "genesis_validators_root": ROOT,
+        "genesis_fork_version": "0x00000000",
+    }
+}
+HEAD = {
+    "slot": "10",
+    "block": ROOT,
+    "state": ROOT,
+    "current_duty_dependent_root": ROOT,
+    "previous_duty_dependent_root": ROOT,
+    "epoch_transition": False,
+    "execution_optimistic": False,
+}
+
+
+def head_events(count):
+    return "".join(
+        f"id: {i}\nevent: head\ndata: {json.dumps({**HEAD, 'slot': str(i)})}\n\n"
+        for i in range(count)
+    ).encode()
+
+
+def recorded(count, spacing):
+    recording = Recording()
+    for i in range(count):
+        recording.add_event(
+            "head", json.dumps({**HEAD, "slot": str(i)}), None, i * spacing
+        )
+    return recording
+
+
+class TestRecordAndReplay:
+    def test_records_responses_and_replays_them(self, tmp_path):
+        routes = {"/eth/v1/beacon/genesis": json.dumps(GENESIS).encode()}
+        with StandInNode(routes) as upstream, RecordingNode(upstream.url) as proxy:
+            genesis = BeaconChainAPI(proxy.url).get_genesis()
+        path = tmp_path / "recording.json"
+        proxy.recording.save(path)
+        with ReplayNode(Recording.load(path)) as node:
+            client = BeaconChainAPI(node.url)
+            assert client.get_genesis() == genesis
+            with pytest.raises(BeaconNodeError):
+                client.get_fork_from_state("head")
+        assert upstream.requests == 1
+
+    def test_records_events(self):
+        routes = {"/eth/v1/events": head_events(3)}
+        with StandInNode(routes, content_type="text/event-stream") as upstream:
+            with RecordingNode(upstream.url) as proxy:
+                client = BeaconChainAPI(proxy.url)
+                with client.iter_events(head=True, initial_backoff=0.01) as stream:
+                    events = list(islice(stream, 3))
+        assert [event.slot for event in events] == [0, 1, 2]
+        recording = proxy.recording
+        assert [event.id for event in recording.events[:3]] == ["0", "1", "2"]
+        assert json.loads(recording.events[0].data) == {**HEAD, "slot": "0"}
+
+    @pytest.mark.parametrize("version", ["bellatrix", "capella"])
+    def test_replays_ssz_block_headers(self, tmp_path, version):
+        block = bytes(range(256)) * 40
+        path = "/eth/v2/beacon/blocks/head"
+        with StandInNode(
+            {path: block},
+            content_type="application/octet-stream",
+            compress=True,
+            headers={"Eth-Consensus-Version": version},
+        ) as upstream, RecordingNode(upstream.url) as proxy:
+            recorded = BeaconChainAPI(proxy.url).get_block_from_block_id("head", "ssz")
+        assert recorded.version == version
+        proxy.recording.save(tmp_path / "recording.json")
+        with ReplayNode(Recording.load(tmp_path / "recording.json")) as node:
+            client = BeaconChainAPI(node.url)
+            replayed = client.get_block_from_block_id("head", "ssz")
+        assert replayed == block
+        assert replayed.version == version
+        # sent gzipped as it was recorded
+        assert client.transfer.wire_bytes < len(block)
+
+    def test_lookup_falls_back_to_path(self):
+        recording = Recording()
+        response = RecordedResponse(200, "application/json", b"{}")
+        recording.add_response("POST", "/a?b=1", b"[1]", response)
+        assert recording.lookup("POST", "/a?b=1", b"[2]") is response
+        assert recording.lookup("POST", "/a?b=2") is response
+        assert recording.lookup("GET", "/a") is None
+
+    def test_binary_bodies_survive_saving(self, tmp_path):
+        recording = Recording()
+        body = bytes(range(256))
+        recording.add_response(
+            "GET", "/ssz", b"", RecordedResponse(200, "application/octet-stream", body)
+        )
+        recording.save(tmp_path / "recording.json")
+        loaded = Recording.load(tmp_path / "recording.json")
+        assert loaded.lookup("GET", "/ssz").body == body
+
+
+class TestReplayNode:
+    def test_replays_events_at_speed(self):
+        with ReplayNode(recorded(5, 0.1), speed=2) as node:
+            client = BeaconChainAPI(node.url)
+            start = time.perf_counter()
+            with client.iter_events(head=True, initial_backoff=0.01) as stream:
+                events = list(islice(stream, 5))
+            elapsed = time.perf_counter() - start
+        assert all(isinstance(event, StreamedHead) for event in events)
+        assert [event.slot for event in events] == [0, 1, 2, 3, 4]
+        # 0.4s of recorded spacing at twice the pace
+        assert 0.18 < elapsed < 0.4
+
+    def test_resumes_after_last_event_id(self):
+        recording = recorded(4, 0)
+        with ReplayNode(recording, speed=float("inf")) as node:
+            client = BeaconChainAPI(node.url)
+            stream = client.stream_events(head=True)
+            assert [event.id for event in stream] == ["0", "1", "2", "3"]
+            client.session.headers["Last-Event-ID"] = "1"
+            assert [event.id for event in client.stream_events(head=True)] == [
+                "2",
+                "3",
+            ]
+            assert list(client.stream_events(block=True)) == []
+
+    def test_injects_errors(self):
+        recording = Recording()
+        recording.add_response(
+            "GET",
+            "/eth/v1/beacon/genesis",
+            b"",
+            RecordedResponse(200, "application/json", json.dumps(GENESIS).encode()),
+        )
+        with ReplayNode(recording, error_rate=1.0, error_status=500) as node:
+            client = BeaconChainAPI(node.url)
+            with pytest.raises(BeaconNodeError):
+                client.get_genesis()
+            node.error_rate = 0.0
+            assert client.get_genesis().genesis_fork_version == "0x00000000"
+        assert node.errors == 1
+
+    def test_caps_bandwidth(self):
+        recording = Recording()
+        body = json.dumps({"data": "0x" + "00" * 10_000}).encode()
+        recording.add_response(
+            "GET", "/big", b"", RecordedResponse(200, "application/json", body)
+        )
+        with ReplayNode(recording, bandwidth=100_000) as node:
+            client = BeaconChainAPI(node.url)
+            start = time.perf_counter()
+            response = client.session.get(node.url + "/big")
+            elapsed = time.perf_counter() - start
+        assert response.content == body
+        assert elapsed >= len(body) / 100_000 * 0.9
+
+    def test_latency_and_jitter(self):
+        recording = Recording()
+        with ReplayNode(recording, latency=0.05, jitter=0.05, seed=1) as node:
+            client = BeaconChainAPI(node.url)
+            start = time.perf_counter()
+            with pytest.raises(BeaconNodeError):
+                client.get_genesis()
+            elapsed = time.perf_counter() - start
+        assert 0.05 <= elapsed < 0.5
@@ -0,0 +1,154 @@
+from beacon_client.beacon_endpoints import BeaconEndpoints
+from beacon_client.config_endpoints import ConfigEndpoints
+from beacon_client.utils.committees import CommitteeCache
+from beacon_client.utils.errors import UnsupportedForkError
+from beacon_client.utils.types import (
+    SLOTS_PER_EPOCH,
+    MAX_EFFECTIVE_BALANCE,
+    MAX_EFFECTIVE_BALANCE_ELECTRA,
+)
+from beacon_client.validator_endpoints import ValidatorEndpoints
+from hashlib import sha256
+from pathlib import Path
+import json
+import pytest
+
+np = pytest.importorskip("numpy")
+from beacon_client.utils.shuffling import (  # noqa: E402
+    compute_shuffled_index,
+    fork_at_epoch,
+    shuffled_indices,
+)
+
+# committees, proposers and shuffled indices computed by the executable consensus spec (eth2spec 1.1.10,
+# altair mainnet) for the validators below. The electra proposers follow compute_proposer_index of the
+# electra spec, run on the same spec functions
+with open(Path(__file__).parent / "fixtures" / "shuffling.json") as f:
+    SPEC = json.load(f)
+FAR_FUTURE_EPOCH = str(2**64 - 1)
+EPOCH = SPEC["epoch"]
+MIX = SPEC["randao_mix"]
+ROOT = "0x" + "ab" * 32
+
+
+def _validator(index, electra=False):
+    # a few exited and not yet active validators and varied effective balances,
+    # from electra every third validator has a compounding balance above 32 ETH
+    activation = 20 if index % 17 == 0 else 0
+    exit_epoch = "5" if index % 23 == 0 else FAR_FUTURE_EPOCH
+    balance = MAX_EFFECTIVE_BALANCE - (index % 5) * 8 * 10**9
+    if electra and index % 3 == 0:
+        balance = MAX_EFFECTIVE_BALANCE_ELECTRA - index * 10**9
+    return {
+        "index": str(index),
+        "balance": str(balance),
+        "status": "active_ongoing",
+        "validator": {
+            "pubkey": "0x" + f"{index:096x}",
+            "withdrawal_credentials": "0x" + "00" * 32,
+            "effective_balance": str(balance),
+            "slashed": False,
+            "activation_eligibility_epoch": "0",
+            "activation_epoch": str(activation),
+            "exit_epoch": exit_epoch,
+            "withdrawable_epoch": FAR_FUTURE_EPOCH,
+        },
+    }
+
+
+class FakeShufflingNode(BeaconEndpoints, ValidatorEndpoints, ConfigEndpoints):
+    """
+    Answers with the responses recorded from the spec
+    """
+
+    def __init__(self, fork="altair"):
+        self.committee_cache = CommitteeCache()
+        self.cache = None
+        self._post_unsupported = set()
+        self.fork = fork
+        electra = fork == "electra"
+        self.validators = [_validator(index, electra) for index in range(700)]
+        self.proposers = SPEC["proposers"]["electra" if electra else "phase0"]
+        self.requested = []
+
+    def _is_immutable(self, identifier):
+        return False
+
+    def _query_url(self, path, stream=False, headers={}, params=None):
+        self.requested.append(path)
+        if path.endswith("/spec"):
+            spec = {"ALTAIR_FORK_EPOCH": "0", "BELLATRIX_FORK_EPOCH": FAR_FUTURE_EPOCH}
+            if self.fork == "electra":
+                spec.update(BELLATRIX_FORK_EPOCH="1", ELECTRA_FORK_EPOCH=str(EPOCH))
+            return {"data": spec}
+        if path.endswith("/randao"):
+            assert params["epoch"] == EPOCH - 2
+            return {"data": {"randao": MIX}}
+        if path.endswith("/validators"):
+            return {"data": self.validators}
+        if path.endswith("/committees"):
+            assert params["epoch"] == EPOCH
+            return {"data": SPEC["committees"]}
+        epoch = int(path.rsplit("/", 1)[1])
+        if epoch != EPOCH:
+            return {"dependent_root": ROOT, "data": []}
+        start = EPOCH * SLOTS_PER_EPOCH
+        duties = [
+            {"pubkey": "0x", "validator_index": str(index), "slot": str(start + offset)}
+            for offset, index in enumerate(self.proposers)
+        ]
+        return {"dependent_root": ROOT, "data": duties}
+
+
+class TestShuffling:
+    @pytest.mark.parametrize("count", [1, 2, 3, 255, 256, 257, 1000])
+    def test_vectorized_matches_spec(self, count):
+        seed = sha256(count.to_bytes(4, "little")).digest()
+        expected = SPEC["shuffled_index"][str(count)]
+        assert shuffled_indices(count, seed).tolist() == expected
+        assert [
+            compute_shuffled_index(i, count, seed) for i in range(count)
+        ] == expected
+
+    def test_matches_node(self):
+        client = FakeShufflingNode()
+        shuffling = client.compute_epoch_shuffling(EPOCH)
+        assert (
+            f"/eth/v1/beacon/states/{EPOCH * SLOTS_PER_EPOCH}/randao"
+            in client.requested
+        )
+        node = client.get_epoch_committees(EPOCH)
+        # the computed committees were cached under the same dependent root
+        assert node is shuffling.committees
+        client.committee_cache.invalidate(EPOCH)
+        node = client.get_epoch_committees(EPOCH)
+        assert node.members == shuffling.committees.members
+        assert node.starts == shuffling.committees.starts
+        duties = client.get_block_proposers_duties(EPOCH)["data"]
+        assert shuffling.proposers == [int(duty["validator_index"]) for duty in duties]
+        assert shuffling.proposer(EPOCH * SLOTS_PER_EPOCH + 3) == shuffling.proposers[3]
+        assert "/eth/v1/config/spec" in client.requested
+
+    def test_electra_proposers(self):
+        client = FakeShufflingNode("electra")
+        shuffling = client.compute_epoch_shuffling(EPOCH)
+        assert shuffling.proposers == SPEC["proposers"]["electra"]
+
+    def test_unsupported_fork(self):
+        client = FakeShufflingNode()
+        with pytest.raises(UnsupportedForkError):
+            client.compute_epoch_shuffling(EPOCH, fork="fulu")
+
+    def test_fork_at_epoch(self):
+        spec = {
+            "ALTAIR_FORK_EPOCH": "74240",
+            "BELLATRIX_FORK_EPOCH": "144896",
+            "CAPELLA_FORK_EPOCH": "194048",
+            "ELECTRA_FORK_EPOCH": FAR_FUTURE_EPOCH,
+        }
+        assert fork_at_epoch(spec, 0) == "phase0"
+        assert fork_at_epoch(spec, 144896) == "bellatrix"
+        assert fork_at_epoch(spec, 200000) == "capella"
+        # forks at the same epoch activate in fork order
+        devnet = {"DENEB_FORK_EPOCH": "0", "ELECTRA_FORK_EPOCH": "0"}
+        assert fork_at_epoch(devnet, 0) == "electra"
@@ -0,0 +1,167 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.async_api import AsyncBeaconChainAPI
+from beacon_client.utils.singleflight import AsyncSingleFlight, SingleFlight
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import time
+import pytest
+
+THREADS = 8
+
+HEADER = {
+    "data": {
+        "root": "0x" + "ab" * 32,
+        "canonical": True,
+        "header": {
+            "message": {
+                "slot": "1",
+                "proposer_index": "1",
+                "parent_root": "0x" + "00" * 32,
+                "state_root": "0x" + "00" * 32,
+                "body_root": "0x" + "00" * 32,
+            },
+            "signature": "0x" + "00" * 96,
+        },
+    }
+}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return json.loads(json.dumps(HEADER))
+
+
+class WaitingSession:
+    """
+    Holds the first request until every other thread waits for it
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        wait_for(lambda: self.client.inflight.deduplicated == THREADS - 1)
+        return FakeResponse()
+
+
+class ImmediateSession:
+    def __init__(self):
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse()
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_fetch(self):
+        flight = SingleFlight()
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            wait_for(lambda: flight.calls == THREADS)
+            return object()
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            results = list(pool.map(lambda _: flight.do("key", fetch), range(THREADS)))
+        assert len(fetches) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.deduplicated == THREADS - 1
+
+    def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        assert [flight.do("key", lambda: i) for i in range(3)] == [0, 1, 2]
+        assert flight.deduplicated == 0
+
+    def test_error_reaches_every_waiter(self):
+        flight = SingleFlight()
+
+        def fetch():
+            wait_for(lambda: flight.calls == 2)
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(2) as pool:
+            futures = [pool.submit(flight.do, "key", fetch) for _ in range(2)]
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_async(self):
+        flight = AsyncSingleFlight()
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.do("key", fetch) for _ in range(THREADS))
+            )
+
+        results = asyncio.run(run())
+        assert len(fetches) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.deduplicated == THREADS - 1
+
+
+class TestCoalescedClient:
+    def test_identical_requests_are_sent_once(self):
+        client = BeaconChainAPI("http://localhost:5052")
+        client.session = WaitingSession(client)
+        with ThreadPoolExecutor(THREADS) as pool:
+            headers = list(
+                pool.map(
+                    lambda _: client.get_headers_from_block_id("head"), range(THREADS)
+                )
+            )
+        assert len(client.session.urls) == 1
+        assert client.inflight.deduplicated == THREADS - 1
+        # the decoded header is shared, not only the response
+        assert all(header is headers[0] for header in headers)
+
+    def test_different_arguments_are_not_coalesced(self):
+        client = BeaconChainAPI("http://localhost:5052")
+        client.session = ImmediateSession()
+        client.get_headers_from_block_id("head")
+        client.get_headers_from_block_id("finalized")
+        assert len(client.session.urls) == 2
+        assert client.inflight.deduplicated == 0
+
+    def test_async_calls_share_the_decoded_result(self):
+        class Client(AsyncBeaconChainAPI):
+            fetches = 0
+
+            async def _fetch(self, path, stream, headers, params):
+                self.fetches += 1
+                await asyncio.sleep(0.01)
+                return json.loads(json.dumps(HEADER))
+
+        async def run():
+            client = Client("http://localhost:5052")
+            headers = await asyncio.gather(
+                *(client.get_headers_from_block_id("head") for _ in range(THREADS))
+            )
+            return client, headers
+
+        client, headers = asyncio.run(run())
+        assert client.fetches == 1
+        assert all(header is headers[0] for header in headers)
+
+    def test_disabled(self):
+        client = BeaconChainAPI("http://localhost:5052", coalesce=False)
+        assert client.inflight is None
@@ -0,0 +1,158 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.testing import StandInNode
+from beacon_client.utils.bitfields import Bitlist
+from beacon_client.utils.errors import UnsupportedForkError
+from beacon_client.utils.lazy import is_lazy
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.ssz import (
+    SSZBytes,
+    decode_signed_beacon_block,
+    encode_signed_beacon_block,
+    signed_beacon_block_slot,
+    AttestationSSZ,
+    CheckpointSSZ,
+)
+from beacon_client.utils.types import (
+    Attestation,
+    AttestationData,
+    Checkpoint,
+    SignedBeaconBlock,
+)
+from pathlib import Path
+import json
+import pytest
+
+FIXTURES = Path(__file__).parent / "fixtures"
+# block.json serialized by remerkleable, the SSZ implementation of the consensus specs,
+# with bellatrix container definitions copied from the spec
+BLOCK_SSZ = (FIXTURES / "block.ssz").read_bytes()
+
+
+@pytest.fixture
+def block():
+    with open(FIXTURES / "block.json") as f:
+        return parse_json(json.load(f)["data"], SignedBeaconBlock)
+
+
+class TestSSZ:
+    def test_round_trip_matches_json(self, block):
+        encoded = encode_signed_beacon_block(block)
+        assert isinstance(encoded, bytes)
+        assert decode_signed_beacon_block(encoded) == block
+
+    def test_decode_from_memoryview(self, block):
+        encoded = bytearray(encode_signed_beacon_block(block))
+        decoded = decode_signed_beacon_block(memoryview(encoded))
+        assert decoded.message.slot == block.message.slot
+        assert decoded.message.body.execution_payload.transactions == (
+            block.message.body.execution_payload.transactions
+        )
+
+    def test_ssz_is_smaller_than_json(self, block):
+        with open(Path(__file__).parent / "fixtures" / "block.json", "rb") as f:
+            assert len(encode_signed_beacon_block(block)) < len(f.read()) / 2
+
+    def test_truncated_block_fails(self, block):
+        encoded = encode_signed_beacon_block(block)
+        with pytest.raises(AssertionError):
+            decode_signed_beacon_block(encoded[:200])
+
+    def test_bitlist_requires_length_bit(self, block):
+        attestation = block.message.body.attestations[0]
+        encoded = bytearray(AttestationSSZ.encode(attestation))
+        encoded[-1] = 0
+        with pytest.raises(AssertionError):
+            AttestationSSZ.decode(memoryview(encoded))
+
+    def test_lazy_decode_matches_eager(self, block):
+        encoded = encode_signed_beacon_block(block)
+        lazy = decode_signed_beacon_block(encoded, lazy=True)
+        assert is_lazy(lazy) and is_lazy(lazy.message.body.attestations[0])
+        assert lazy.message.proposer_index == block.message.proposer_index
+        assert lazy == block
+
+
+class TestKnownAnswers:
+    def test_checkpoint(self):
+        encoded = bytes.fromhex("d141020000000000") + bytes(range(32))
+        checkpoint = Checkpoint(epoch=147921, root="0x" + bytes(range(32)).hex())
+        assert CheckpointSSZ.decode(memoryview(encoded)) == checkpoint
+        assert CheckpointSSZ.encode(checkpoint) == encoded
+
+    def test_attestation(self):
+        # offset of the bitlist after the 228 byte fixed part, then the bits 1, 0, 1 and the length bit
+        encoded = b"".join(
+            [
+                (228).to_bytes(4, "little"),
+                (1).to_bytes(8, "little"),
+                (2).to_bytes(8, "little"),
+                b"\x11" * 32,
+                (3).to_bytes(8, "little"),
+                b"\x22" * 32,
+                (4).to_bytes(8, "little"),
+                b"\x33" * 32,
+                b"\x44" * 96,
+                b"\x0d",
+            ]
+        )
+        attestation = Attestation(
+            aggregation_bits=Bitlist(0b101, 3),
+            data=AttestationData(
+                slot=1,
+                index=2,
+                beacon_block_root="0x" + "11" * 32,
+                source=Checkpoint(epoch=3, root="0x" + "22" * 32),
+                target=Checkpoint(epoch=4, root="0x" + "33" * 32),
+            ),
+            signature="0x" + "44" * 96,
+        )
+        decoded = AttestationSSZ.decode(memoryview(encoded))
+        assert decoded == attestation
+        # attestations are frozen so they can be used to deduplicate
+        assert {decoded, attestation} == {attestation}
+        assert AttestationSSZ.encode(attestation) == encoded
+
+    def test_first_offset_must_end_fixed_part(self, block):
+        attestation = block.message.body.attestations[0]
+        encoded = bytearray(AttestationSSZ.encode(attestation))
+        encoded[0] -= 1
+        with pytest.raises(AssertionError):
+            AttestationSSZ.decode(memoryview(encoded))
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_reference_block(self, block, lazy):
+        assert decode_signed_beacon_block(BLOCK_SSZ, lazy=lazy) == block
+        assert signed_beacon_block_slot(BLOCK_SSZ) == block.message.slot
+        assert encode_signed_beacon_block(block) == BLOCK_SSZ
+        binary = decode_signed_beacon_block(
+            BLOCK_SSZ, lazy=lazy, binary_transactions=True
+        )
+        transactions = binary.message.body.execution_payload.transactions
+        assert ["0x" + transaction.hex() for transaction in transactions] == (
+            block.message.body.execution_payload.transactions
+        )
+
+
+class TestForks:
+    def test_unsupported_fork(self):
+        with pytest.raises(UnsupportedForkError):
+            decode_signed_beacon_block(SSZBytes(BLOCK_SSZ, "capella"))
+        with pytest.raises(UnsupportedForkError):
+            decode_signed_beacon_block(BLOCK_SSZ, version="deneb")
+
+    def test_supported_fork(self, block):
+        assert decode_signed_beacon_block(SSZBytes(BLOCK_SSZ, "bellatrix")) == block
+        assert decode_signed_beacon_block(BLOCK_SSZ, version="BELLATRIX") == block
+
+    @pytest.mark.parametrize("version", ["bellatrix", "capella"])
+    def test_client_reads_version_header(self, version):
+        routes = {"/eth/v2/beacon/blocks/head": BLOCK_SSZ}
+        with StandInNode(
+            routes,
+            content_type="application/octet-stream",
+            headers={"Eth-Consensus-Version": version},
+        ) as node:
+            client = BeaconChainAPI(node.url)
+            raw = client.get_block_from_block_id("head", response_type="ssz")
+        assert raw == BLOCK_SSZ
+        assert raw.version == version
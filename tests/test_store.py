@@ -0,0 +1,197 @@
+from beacon_client.api import BeaconChainAPI
+from beacon_client.utils.ssz import (
+    decode_signed_beacon_block,
+    encode_signed_beacon_block,
+    signed_beacon_block_slot,
+)
+from beacon_client.utils.parsing import parse_json
+from beacon_client.utils.store import BlockStore
+from beacon_client.utils.types import SignedBeaconBlock
+from pathlib import Path
+import json
+import sqlite3
+
+ROOT = "0x" + "ab" * 32
+SLOT = 4733490
+
+with open(Path(__file__).parent / "fixtures" / "block.json", "rb") as f:
+    BLOCK = f.read()
+
+OTHER = "0x" + "cd" * 32
+SSZ_BLOCK = encode_signed_beacon_block(
+    parse_json(json.loads(BLOCK)["data"], SignedBeaconBlock)
+)
+
+
+def header(root, canonical):
+    message = {
+        "slot": str(SLOT),
+        "proposer_index": "1",
+        "parent_root": ROOT,
+        "state_root": ROOT,
+        "body_root": ROOT,
+    }
+    data = {
+        "root": root,
+        "canonical": canonical,
+        "header": {"message": message, "signature": "0x" + "00" * 96},
+    }
+    return json.dumps({"data": data}).encode()
+
+
+CHECKPOINTS = json.dumps(
+    {
+        "data": {
+            "previous_justified": {"epoch": "200000", "root": ROOT},
+            "current_justified": {"epoch": "200001", "root": ROOT},
+            "finalized": {"epoch": "200000", "root": ROOT},
+        }
+    }
+).encode()
+
+
+class FakeResponse:
+    def __init__(self, content, headers={}):
+        self.status_code = 200
+        self.content = content
+        self.headers = headers
+        self.text = content.decode(errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def request(self, method, url, headers={}, **kwargs):
+        self.urls.append(url)
+        if url.endswith("finality_checkpoints"):
+            return FakeResponse(CHECKPOINTS)
+        if headers.get("Accept") == "application/octet-stream":
+            return FakeResponse(SSZ_BLOCK, {"Eth-Consensus-Version": "bellatrix"})
+        return FakeResponse(BLOCK)
+
+
+def client_with_store(path):
+    client = BeaconChainAPI("http://localhost:5052", store=BlockStore(path))
+    client.session = FakeSession()
+    return client
+
+
+def block_requests(client):
+    return [url for url in client.session.urls if "blocks" in url]
+
+
+class TestBlockStore:
+    def test_route(self):
+        assert BlockStore.route(
+            f"/eth/v2/beacon/blocks/{ROOT}", "application/json"
+        ) == ("blocks", ROOT)
+        assert BlockStore.route(
+            "/eth/v2/beacon/blocks/5", "application/octet-stream"
+        ) == ("blocks_ssz", "5")
+        assert BlockStore.route(
+            "/eth/v1/beacon/blocks/5/attestations", "application/json"
+        ) == ("attestations", "5")
+        assert (
+            BlockStore.route("/eth/v1/beacon/blocks/5/root", "application/json") is None
+        )
+
+    def test_root_request_is_indexed_by_finalized_slot(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        assert store.unverified_slot("blocks", ROOT, BLOCK, SLOT) == SLOT
+        store.put("blocks", ROOT, BLOCK, finalized_slot=SLOT, canonical_root=ROOT)
+        assert store.get("blocks", ROOT.upper().replace("0X", "0x")) == BLOCK
+        assert store.get("blocks", SLOT) == BLOCK
+        assert store.get("blocks", str(SLOT)) == BLOCK
+
+    def test_unfinalized_slot_is_not_indexed(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        store.put("blocks", ROOT, BLOCK, finalized_slot=SLOT - 1)
+        assert store.get("blocks", ROOT) == BLOCK
+        assert store.get("blocks", SLOT) is None
+        assert (store.hits, store.misses, store.writes) == (1, 1, 1)
+
+    def test_orphan_is_not_indexed_by_slot(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        store.put("blocks", ROOT, BLOCK, finalized_slot=SLOT, canonical_root=OTHER)
+        assert store.get("blocks", ROOT) == BLOCK
+        assert store.get("blocks", SLOT) is None
+
+    def test_header_canonical_flag(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        store.put("headers", OTHER, header(OTHER, False), finalized_slot=SLOT)
+        assert store.get("headers", SLOT) is None
+        store.put("headers", ROOT, header(ROOT, True), finalized_slot=SLOT)
+        assert store.get("headers", SLOT) == header(ROOT, True)
+        assert store.get("headers", OTHER) == header(OTHER, False)
+
+    def test_unfinalized_header_is_not_stored(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        store.put("headers", ROOT, header(ROOT, True), finalized_slot=SLOT - 1)
+        assert store.get("headers", ROOT) is None
+        assert store.writes == 0
+
+    def test_genesis_is_stored_once(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        for _ in range(3):
+            if store.get("blocks", "genesis") is None:
+                store.put("blocks", "genesis", BLOCK, finalized_slot=SLOT)
+        assert (store.hits, store.writes) == (2, 1)
+        assert store.get("blocks", 0) == BLOCK
+
+    def test_existing_body_is_reused(self, tmp_path):
+        store = BlockStore(tmp_path / "store.db")
+        store.put("headers", ROOT, header(ROOT, True), finalized_slot=SLOT)
+        store.put("headers", SLOT, header(ROOT, True), finalized_slot=SLOT)
+        assert store.writes == 1
+
+    def test_ssz_slot(self):
+        block = parse_json(json.loads(BLOCK)["data"], SignedBeaconBlock)
+        encoded = encode_signed_beacon_block(block)
+        assert signed_beacon_block_slot(encoded) == SLOT
+        assert decode_signed_beacon_block(encoded).message.slot == SLOT
+
+    def test_store_without_versions_is_upgraded(self, tmp_path):
+        path = tmp_path / "store.db"
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE TABLE bodies (id INTEGER PRIMARY KEY, kind TEXT, body BLOB);"
+            "INSERT INTO bodies VALUES (1, 'blocks_ssz', x'00');"
+        )
+        connection.close()
+        store = BlockStore(path)
+        store._insert("blocks_ssz", ["slot:1"], b"\x01", "bellatrix")
+        assert store.get("blocks_ssz", 1).version == "bellatrix"
+
+
+class TestWriteThrough:
+    def test_finalized_block_is_served_from_disk(self, tmp_path):
+        client = client_with_store(tmp_path / "store.db")
+        first = client.get_block_from_block_id(SLOT)
+        second = client.get_block_from_block_id(SLOT)
+        assert first == second
+        assert len(block_requests(client)) == 1
+        # a new client reads the same file without asking the node
+        restarted = client_with_store(tmp_path / "store.db")
+        assert restarted.get_block_from_block_id(SLOT) == first
+        assert block_requests(restarted) == []
+
+    def test_ssz_block_keeps_its_version(self, tmp_path):
+        client = client_with_store(tmp_path / "store.db")
+        first = client.get_block_from_block_id(SLOT, response_type="ssz")
+        second = client.get_block_from_block_id(SLOT, response_type="ssz")
+        assert len(block_requests(client)) == 1
+        assert first == second
+        assert (first.version, second.version) == ("bellatrix", "bellatrix")
+        restarted = client_with_store(tmp_path / "store.db")
+        assert restarted.get_block_from_block_id(SLOT, "ssz").version == "bellatrix"
+
+    def test_head_is_never_stored(self, tmp_path):
+        client = client_with_store(tmp_path / "store.db")
+        client.get_block_from_block_id("head")
+        client.get_block_from_block_id("head")
+        assert len(block_requests(client)) == 2
+        assert client.store.writes == 0
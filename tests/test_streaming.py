@@ -0,0 +1,43 @@
+from beacon_client.utils.streaming import iter_json_array, JSONArrayStream
+import json
+import pytest
+
+DOCUMENT = {
+    "execution_optimistic": False,
+    "finalized": True,
+    "count": 12345,
+    "data": [
+        {"index": str(i), "name": "é€" * (i % 4), "values": [1, 2.5, None]}
+        for i in range(300)
+    ],
+    "trailer": {"nested": [1, {"data": []}]},
+}
+
+
+def _chunks(raw: bytes, size: int):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]  # noqa: E203
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096, 10**6])
+    def test_chunk_boundaries(self, size):
+        raw = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+        assert list(iter_json_array(_chunks(raw, size))) == DOCUMENT["data"]
+
+    def test_pretty_printed(self):
+        raw = json.dumps(DOCUMENT, indent=2).encode()
+        assert list(iter_json_array(_chunks(raw, 5))) == DOCUMENT["data"]
+
+    def test_empty_array(self):
+        assert list(iter_json_array([b'{"data": []}'])) == []
+
+    def test_items_arrive_before_the_end(self):
+        stream = JSONArrayStream()
+        assert stream.feed(b'{"data": [{"a": 1}, {"a"') == [{"a": 1}]
+        assert stream.feed(b": 2}]}") == [{"a": 2}]
+        assert stream.close() == []
+
+    def test_truncated_body(self):
+        raw = json.dumps(DOCUMENT).encode()
+        with pytest.raises((AssertionError, ValueError)):
+            list(iter_json_array([raw[:-20]]))
@@ -0,0 +1,63 @@
+from beacon_client.utils.parsing import parse_json, BinaryTransactionHooks
+from beacon_client.utils.ssz import (
+    decode_signed_beacon_block,
+    encode_signed_beacon_block,
+)
+from beacon_client.utils.transactions import (
+    TransactionList,
+    TransactionSummary,
+    summarize_transactions,
+)
+from beacon_client.utils.types import SignedBeaconBlock
+from pathlib import Path
+import json
+import pytest
+
+TRANSACTIONS = ["0x02f8", "0x", "0xabcdef"]
+
+
+@pytest.fixture
+def data():
+    with open(Path(__file__).parent / "fixtures" / "block.json") as f:
+        return json.load(f)["data"]
+
+
+class TestTransactionList:
+    def test_from_hex(self):
+        transactions = TransactionList.from_hex(TRANSACTIONS)
+        assert len(transactions) == 3
+        assert bytes(transactions[0]) == bytes.fromhex("02f8")
+        assert bytes(transactions[-1]) == bytes.fromhex("abcdef")
+        assert [len(t) for t in transactions] == transactions.sizes() == [2, 0, 3]
+        assert transactions.hex() == TRANSACTIONS
+
+    def test_ssz_round_trip_shares_buffer(self):
+        encoded = bytearray(TransactionList.from_hex(TRANSACTIONS).to_ssz())
+        transactions = TransactionList.from_ssz(memoryview(encoded))
+        assert transactions.hex() == TRANSACTIONS
+        encoded[-1] = 0
+        assert transactions.hex()[-1] == "0xabcd00"
+        assert len(TransactionList.from_ssz(memoryview(b""))) == 0
+
+    def test_summary(self):
+        expected = TransactionSummary(count=3, size=5, largest=3)
+        assert summarize_transactions(TRANSACTIONS) == expected
+        assert TransactionList.from_hex(TRANSACTIONS).summary() == expected
+
+
+class TestBinaryTransactions:
+    def test_json(self, data):
+        block = parse_json(data, SignedBeaconBlock, BinaryTransactionHooks)
+        transactions = block.message.body.execution_payload.transactions
+        expected = data["message"]["body"]["execution_payload"]["transactions"]
+        assert isinstance(transactions, TransactionList)
+        assert transactions.hex() == expected
+
+    def test_ssz_matches_json(self, data):
+        block = parse_json(data, SignedBeaconBlock, BinaryTransactionHooks)
+        encoded = encode_signed_beacon_block(block)
+        binary = decode_signed_beacon_block(encoded, binary_transactions=True)
+        transactions = binary.message.body.execution_payload.transactions
+        assert transactions == block.message.body.execution_payload.transactions
+        assert transactions.buffer.obj is encoded
+        assert encode_signed_beacon_block(binary) == encoded